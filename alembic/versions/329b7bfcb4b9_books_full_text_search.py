@@ -0,0 +1,58 @@
+"""Books full text search
+
+Revision ID: 329b7bfcb4b9
+Revises: cdb0061c6c97
+Create Date: 2026-10-17 10:12:40.118204
+
+Adding the stored generated column rewrites "books" under an exclusive
+lock (reads and writes wait), run it in a maintenance window.
+The index is built concurrently, it doesn't block writes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "329b7bfcb4b9"
+down_revision = "cdb0061c6c97"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "books",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A')"
+                " || setweight(to_tsvector('english', "
+                "coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_books_search_vector",
+            "books",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_books_search_vector",
+            table_name="books",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("books", "search_vector")
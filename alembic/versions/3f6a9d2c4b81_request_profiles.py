@@ -0,0 +1,49 @@
+"""Request profiles
+
+Revision ID: 3f6a9d2c4b81
+Revises: 8c3d1e7a9f20
+Create Date: 2026-10-17 19:32:08.640215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f6a9d2c4b81"
+down_revision = "8c3d1e7a9f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "profiler_config",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("remaining", sa.Integer(), nullable=False),
+        sa.Column("pattern", sa.String(), nullable=True),
+        sa.Column("token", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "request_profiles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("summary", sa.JSON(), nullable=False),
+        sa.Column("stacks", sa.JSON(), nullable=False),
+        sa.Column("queries", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_request_profiles_id"),
+        "request_profiles",
+        ["id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_request_profiles_id"), table_name="request_profiles"
+    )
+    op.drop_table("request_profiles")
+    op.drop_table("profiler_config")
@@ -0,0 +1,37 @@
+"""Books updated_at
+
+Revision ID: 5b8e0f3c6a1d
+Revises: a1f4c2d9b7e3
+Create Date: 2026-10-17 15:32:08.604112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b8e0f3c6a1d"
+down_revision = "a1f4c2d9b7e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing books get time of migration
+    op.add_column(
+        "books",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_books_updated_at"), "books", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_books_updated_at"), table_name="books")
+    op.drop_column("books", "updated_at")
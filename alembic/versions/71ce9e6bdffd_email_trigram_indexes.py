@@ -0,0 +1,57 @@
+"""Email trigram indexes
+
+Revision ID: 71ce9e6bdffd
+Revises: 329b7bfcb4b9
+Create Date: 2026-10-17 11:02:17.530914
+
+Indexes are built concurrently, they don't block writes. If a build
+fails it leaves an INVALID index, drop it and run the upgrade again.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "71ce9e6bdffd"
+down_revision = "329b7bfcb4b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_email_trgm",
+            "users",
+            ["email"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_authors_email_trgm",
+            "authors",
+            ["email"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_authors_email_trgm",
+            table_name="authors",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_email_trgm",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+    # extension is left, it can be used by other objects
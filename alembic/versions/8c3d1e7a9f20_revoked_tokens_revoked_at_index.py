@@ -0,0 +1,31 @@
+"""Revoked tokens revoked_at index
+
+Revision ID: 8c3d1e7a9f20
+Revises: 5b8e0f3c6a1d
+Create Date: 2026-10-17 18:05:12.417630
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8c3d1e7a9f20"
+down_revision = "5b8e0f3c6a1d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # refresh of revocation filters selects by revoked_at
+    op.create_index(
+        op.f("ix_revoked_tokens_revoked_at"),
+        "revoked_tokens",
+        ["revoked_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_revoked_tokens_revoked_at"), table_name="revoked_tokens"
+    )
@@ -0,0 +1,45 @@
+"""Revoked tokens
+
+Revision ID: a1f4c2d9b7e3
+Revises: e4c59ed96cee
+Create Date: 2026-10-17 14:21:40.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1f4c2d9b7e3"
+down_revision = "e4c59ed96cee"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("jti", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("jti"),
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_id"), "revoked_tokens", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_expires_at"),
+        "revoked_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_revoked_tokens_expires_at"), table_name="revoked_tokens"
+    )
+    op.drop_index(op.f("ix_revoked_tokens_id"), table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
@@ -0,0 +1,121 @@
+"""List access path indexes
+
+Revision ID: e4c59ed96cee
+Revises: 71ce9e6bdffd
+Create Date: 2026-10-17 11:48:05.264419
+
+Indexes are built concurrently, they don't block writes. If a build
+fails it leaves an INVALID index, drop it and run the upgrade again.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e4c59ed96cee"
+down_revision = "71ce9e6bdffd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        # books
+        op.create_index(
+            "ix_books_author_id_is_active_id",
+            "books",
+            ["author_id", "is_active", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_books_category_id_is_active_id",
+            "books",
+            ["category_id", "is_active", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_books_active_id",
+            "books",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+        )
+        # orders
+        op.create_index(
+            "ix_orders_customer_id_id",
+            "orders",
+            ["customer_id", sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_orders_not_complete_id",
+            "orders",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("complete IS false"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_orders_date_placed"),
+            "orders",
+            ["date_placed"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_orders_delivery_date"),
+            "orders",
+            ["delivery_date"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_orders_total_price"),
+            "orders",
+            ["total_price"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # order_items (foreign keys)
+        op.create_index(
+            op.f("ix_order_items_order_id"),
+            "order_items",
+            ["order_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_order_items_book_id"),
+            "order_items",
+            ["book_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    indexes = (
+        (op.f("ix_order_items_book_id"), "order_items"),
+        (op.f("ix_order_items_order_id"), "order_items"),
+        (op.f("ix_orders_total_price"), "orders"),
+        (op.f("ix_orders_delivery_date"), "orders"),
+        (op.f("ix_orders_date_placed"), "orders"),
+        ("ix_orders_not_complete_id", "orders"),
+        ("ix_orders_customer_id_id", "orders"),
+        ("ix_books_active_id", "books"),
+        ("ix_books_category_id_is_active_id", "books"),
+        ("ix_books_author_id_is_active_id", "books"),
+    )
+    with op.get_context().autocommit_block():
+        for index_name, table_name in indexes:
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+            )
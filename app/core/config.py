@@ -12,6 +12,38 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRES_MINUTES: int  # minutes
     JWT_ALGORITHM: str
 
+    # password hashing pool
+    PASSWORD_HASH_WORKERS: int = 4  # threads for bcrypt work
+    PASSWORD_HASH_MAX_PENDING: int = 64  # more waiting tasks > 503
+
+    # verified access token cache (per worker)
+    TOKEN_CACHE_SIZE: int = 10000  # tokens, 0 = cache is off
+    TOKEN_CACHE_TTL: int = 300  # seconds, token "exp" is respected too
+
+    # revoked tokens filter (per worker)
+    REVOCATION_FILTER_CAPACITY: int = 100000  # revoked not expired tokens
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001  # false positives > db query
+    REVOCATION_REFRESH_SECONDS: int = 5  # delay for other workers
+    REVOCATION_REFRESH_OVERLAP_SECONDS: int = 60  # late commits of revokes
+
+    # categories and authors in memory (per worker)
+    CATALOG_CACHE: bool = True
+    CATALOG_CACHE_TTL: int = 60  # seconds, max staleness if NOTIFY is lost
+    CATALOG_CACHE_LISTEN: bool = True  # LISTEN/NOTIFY between workers
+
+    # responses of public book endpoints (per worker)
+    RESPONSE_CACHE: bool = True
+    RESPONSE_CACHE_SIZE: int = 1000  # responses
+    RESPONSE_CACHE_TTL: int = 30  # seconds, max staleness if NOTIFY is lost
+    RESPONSE_CACHE_MAX_AGE: int = 0  # seconds for clients, 0 = revalidate
+
+    # incremental book export: books written by transactions older than
+    # this are missed (updated_at is time of transaction start)
+    EXPORT_MAX_TRANSACTION_SECONDS: int = 60
+
+    # read endpoints skip response_model validation, orjson if installed
+    FAST_JSON: bool = False
+
     # Postgress launch
     POSTGRES_SERVER: str
     POSTGRES_USER: str
@@ -24,6 +56,33 @@ class Settings(BaseSettings):
     TEST_POSTGRES_PASSWORD: str
     TEST_POSTGRES_DB: str
 
+    # database connection pool (per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    # seconds, -1 = never recycle. Use it instead of pre-ping if you turn
+    # pre-ping off (connections older than firewall/server timeouts)
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True  # extra round-trip on each checkout
+    DB_STATEMENT_TIMEOUT: int = 0  # milliseconds, 0 = no timeout
+
+    # queries of each request (Server-Timing header) and slow-query log
+    QUERY_STATS: bool = True
+    SLOW_QUERY_MS: float = 200  # milliseconds, 0 = slow-query log is off
+
+    # request metrics and GET /metrics for Prometheus (per worker)
+    METRICS: bool = True
+
+    # request profiling switched on by admins (shared by workers)
+    PROFILER: bool = True
+    PROFILER_INTERVAL_MS: float = 5  # milliseconds between stack samples
+    PROFILER_KEEP: int = 20  # last profiles kept for download
+
+    # startup
+    DB_CREATE_TABLES: bool = False  # create_all on startup (development)
+    DB_STARTUP_CHECK: bool = True  # check database connection on startup
+    DB_STARTUP_TIMEOUT: float = 5  # seconds
+
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
 
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
@@ -38,6 +97,24 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or  ''}",
         )
 
+    # async database (opt-in)
+    ASYNC_DATABASE: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[PostgresDsn] = None
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ):
+        if isinstance(v, str):
+            return v
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            user=values.get("POSTGRES_USER"),
+            password=values.get("POSTGRES_PASSWORD"),
+            host=values.get("POSTGRES_SERVER"),
+            path=f"/{values.get('POSTGRES_DB') or  ''}",
+        )
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,245 @@
+import time
+from bisect import bisect_left
+
+# upper bounds of histogram buckets (+Inf bucket is added)
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# methods used as label, others are counted as "OTHER"
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+# requests which didn't match any route share one label
+UNMATCHED_ROUTE = "unmatched"
+
+# ---------------------------------------------------------------------------------------
+# Histogram
+# ---------------------------------------------------------------------------------------
+
+
+class Histogram:
+    """
+    Counts of observed values per bucket, buckets are allocated once.
+    Counts are not cumulative, render makes them cumulative.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        # le is inclusive, so bucket is the first bound >= value
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    """
+    Metrics of one method and route template.
+    """
+
+    __slots__ = ("method", "route", "statuses", "latency", "size")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        # status code > number of responses
+        self.statuses = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+
+
+# Metrics are changed only by the event loop thread of the worker
+# (middleware and async /metrics endpoint), so they need no locks.
+# (method, endpoint) > RouteMetrics
+_series = {}
+# endpoint function > route template, e.g. "/api/v1/books/{book_id}"
+_templates = {}
+_state = {"in_flight": 0}
+
+# ---------------------------------------------------------------------------------------
+# get_route_metrics
+# ---------------------------------------------------------------------------------------
+
+
+def route_template(scope: dict) -> str:
+    """
+    Function returns route template of the request, so all books
+    share "/books/{book_id}" instead of a label per id.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    template = _templates.get(endpoint)
+    if template is None:
+        app = scope.get("app")
+        for route in getattr(app, "routes", ()):
+            if getattr(route, "endpoint", None) is not None:
+                _templates.setdefault(route.endpoint, route.path)
+        template = _templates.setdefault(endpoint, UNMATCHED_ROUTE)
+    return template
+
+
+def get_route_metrics(scope: dict) -> RouteMetrics:
+    method = scope["method"] if scope["method"] in METHODS else "OTHER"
+    key = (method, scope.get("endpoint"))
+    series = _series.get(key)
+    if series is None:
+        series = _series[key] = RouteMetrics(method, route_template(scope))
+    return series
+
+
+def clear():
+    """
+    Function drops all collected metrics (tests).
+    """
+    _series.clear()
+    _templates.clear()
+    _state["in_flight"] = 0
+
+
+# ---------------------------------------------------------------------------------------
+# MetricsMiddleware
+# ---------------------------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware which records number of requests per status,
+    latency and response size histograms and in-flight requests.
+    Labels are method and route template, they are known only after
+    routing, so series are found when the response is done.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # status code, body size
+        response = [500, 0]
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                response[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                response[1] += len(message.get("body", b""))
+            await send(message)
+
+        _state["in_flight"] += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _state["in_flight"] -= 1
+            series = get_route_metrics(scope)
+            status = response[0]
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.latency.observe(time.perf_counter() - start)
+            series.size.observe(response[1])
+
+
+# ---------------------------------------------------------------------------------------
+# render
+# ---------------------------------------------------------------------------------------
+
+
+def escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+def format_metric(name: str, kind: str, description: str, samples):
+    """
+    Function returns lines of one metric in Prometheus text format.
+    samples is a list of (labels dict, value).
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(labels)} {value}")
+    return lines
+
+
+def format_histogram(name: str, description: str, histograms):
+    """
+    histograms is a list of (labels dict, Histogram).
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms:
+        total = 0
+        bounds = [*histogram.bounds, "+Inf"]
+        for bound, count in zip(bounds, histogram.counts):
+            total += count
+            bucket_labels = format_labels({**labels, "le": bound})
+            lines.append(f"{name}_bucket{bucket_labels} {total}")
+        lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {total}")
+    return lines
+
+
+def render_http_metrics():
+    """
+    Function returns lines of request metrics of the worker.
+    """
+    series = sorted(
+        _series.values(), key=lambda item: (item.route, item.method)
+    )
+    labels = [{"method": item.method, "route": item.route} for item in series]
+
+    lines = format_metric(
+        "http_requests_total",
+        "counter",
+        "Requests by method, route template and status code.",
+        [
+            ({**label, "status": status}, count)
+            for label, item in zip(labels, series)
+            for status, count in sorted(item.statuses.items())
+        ],
+    )
+    lines += format_histogram(
+        "http_request_duration_seconds",
+        "Time until the whole response was sent.",
+        [(label, item.latency) for label, item in zip(labels, series)],
+    )
+    lines += format_histogram(
+        "http_response_size_bytes",
+        "Size of response bodies.",
+        [(label, item.size) for label, item in zip(labels, series)],
+    )
+    lines += format_metric(
+        "http_requests_in_flight",
+        "gauge",
+        "Requests being handled right now.",
+        [({}, _state["in_flight"])],
+    )
+    return lines
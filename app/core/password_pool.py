@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.core import settings, security
+
+# bcrypt releases the GIL while hashing, so threads are enough here
+# and password work can't take all the threads of request workers
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password",
+)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "pending": 0,
+    "completed": 0,
+    "rejected": 0,
+}
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns metrics of the password pool:
+    * workers... number of threads in pool
+    * max_pending... backpressure limit
+    * pending... tasks in queue or in work right now (queue depth)
+    * completed... finished tasks
+    * rejected... tasks refused with 503 because pool was full
+    """
+    with _stats_lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+            **_stats,
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# submit
+# ---------------------------------------------------------------------------------------
+
+
+def _task_done(future: Future):
+    with _stats_lock:
+        _stats["pending"] -= 1
+        _stats["completed"] += 1
+
+
+def submit(func, *args) -> Future:
+    """
+    Function to put password work into pool.
+    If too many tasks are already waiting raises 503,
+    so a burst of logins doesn't pile up.
+    """
+    with _stats_lock:
+        if _stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        _stats["pending"] += 1
+
+    try:
+        future = password_executor.submit(func, *args)
+    except RuntimeError:
+        # pool is shut down, task was not queued
+        with _stats_lock:
+            _stats["pending"] -= 1
+        raise
+    future.add_done_callback(_task_done)
+    return future
+
+
+# ---------------------------------------------------------------------------------------
+# get_hashed_password
+# ---------------------------------------------------------------------------------------
+
+
+def get_hashed_password(password: str):
+    """
+    Function to get password and return hashed password.
+    Hashing is done inside password pool.
+    """
+    return submit(security.get_hashed_password, password).result()
+
+
+async def get_hashed_password_async(password: str):
+    """
+    Async variant of get_hashed_password, doesn't block event loop.
+    """
+    future = submit(security.get_hashed_password, password)
+    return await asyncio.wrap_future(future)
+
+
+# ---------------------------------------------------------------------------------------
+# verify_password
+# ---------------------------------------------------------------------------------------
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    """
+    Function to get password from login form and matching with
+    password in database.
+    Verifying is done inside password pool.
+    """
+    return submit(
+        security.verify_password, plain_password, hashed_password
+    ).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """
+    Async variant of verify_password, doesn't block event loop.
+    """
+    future = submit(security.verify_password, plain_password, hashed_password)
+    return await asyncio.wrap_future(future)
@@ -0,0 +1,476 @@
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import Context, ContextVar
+from fnmatch import fnmatchcase
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import settings
+from app.database import query_stats
+from app.models import profile_m
+
+# header of requests which are profiled by token
+PROFILE_HEADER = b"x-profile"
+# frames checked for request context at the bottom of a worker thread
+CONTEXT_FRAMES = 8
+# modules of a worker thread waiting for a task
+IDLE = ("queue", "threading")
+# queries kept in one profile
+MAX_QUERIES = 1000
+# the only row of profiler_config table
+CONFIG_ID = 1
+# postgres channel which tells other workers that profiling was changed
+NOTIFY_CHANNEL = "profiler"
+
+# profile of the request handled in this context (and its threads)
+_active = ContextVar("profile", default=None)
+_lock = threading.Lock()
+# copy of profiler_config row (updated by NOTIFY of other workers),
+# profiling is off while "remaining" is 0, so a disabled profiler
+# costs one dict lookup per request
+_config = {
+    "remaining": 0,
+    "pattern": None,
+    "token": None,
+    "running": False,
+}
+
+# ---------------------------------------------------------------------------------------
+# Profile
+# ---------------------------------------------------------------------------------------
+
+
+class Profile:
+    """
+    Sampled Python stacks and SQL statements of one request.
+    """
+
+    def __init__(self, scope: dict, interval_ms: float):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.endpoint = None
+        self.status = None
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.interval_ms = interval_ms
+        # stack (tuple of frame names, the outermost first) > samples
+        self.stacks = Counter()
+        # (statement, elapsed_ms, parameter shapes)
+        self.queries = []
+        self.done = threading.Event()
+        # frame of the middleware in event loop thread and the thread
+        self.frame = None
+        self.loop_thread = None
+
+    def summary(self):
+        return {
+            "method": self.method,
+            "path": self.path,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "interval_ms": self.interval_ms,
+            "samples": sum(self.stacks.values()),
+            "queries": len(self.queries),
+            "query_time_ms": round(
+                sum(elapsed_ms for _, elapsed_ms, _ in self.queries), 3
+            ),
+        }
+
+    def to_dict(self):
+        return {
+            **self.summary(),
+            "stacks": [
+                {"stack": list(stack), "samples": samples}
+                for stack, samples in self.stacks.most_common()
+            ],
+            "queries": [
+                {
+                    "statement": statement,
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "parameters": parameters,
+                }
+                for statement, elapsed_ms, parameters in self.queries
+            ],
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# sample
+# ---------------------------------------------------------------------------------------
+
+
+def frame_label_text(text: str) -> str:
+    # ";" separates frames in folded format
+    return " ".join(text.split()).replace(";", ",")[:200]
+
+
+def folded(profile: dict) -> str:
+    """
+    Returns profile (of get_profile) in folded stacks format of flame
+    graph tools (flamegraph.pl, speedscope, inferno), weights in
+    microseconds. Python frames are under "python" (sampled time),
+    statements are under "sql" (measured database time, which is also
+    a part of python stacks waiting in execute).
+    """
+    lines = []
+    interval_us = round(profile["interval_ms"] * 1000)
+    for stack in profile["stacks"]:
+        lines.append(
+            f"python;{';'.join(stack['stack'])} "
+            f"{stack['samples'] * interval_us}"
+        )
+    queries = Counter()
+    for query in profile["queries"]:
+        queries[frame_label_text(query["statement"])] += round(
+            query["elapsed_ms"] * 1000
+        )
+    for statement, elapsed_us in queries.most_common():
+        lines.append(f"sql;{statement} {elapsed_us}")
+    return "\n".join(lines) + "\n"
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+def request_stack(profile: Profile, thread_id: int, frame):
+    """
+    Function returns frames of the thread which run the request,
+    the outermost first, or None if the thread runs something else.
+    * event loop thread... frames above the profiler middleware
+    * worker threads (sync endpoints and dependencies)... frames above
+    the one which runs code in context of the request
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+
+    if thread_id == profile.loop_thread:
+        for index, frame in enumerate(frames):
+            if frame is profile.frame:
+                return frames[index + 1 :]
+        return None
+
+    for index, frame in enumerate(frames[:CONTEXT_FRAMES]):
+        for value in frame.f_locals.values():
+            if isinstance(value, Context) and value.get(_active) is profile:
+                stack = frames[index + 1 :]
+                # idle worker keeps context of its last task while
+                # it waits for the next one
+                if stack and stack[0].f_globals.get("__name__") in IDLE:
+                    return None
+                return stack
+    return None
+
+
+def sample(profile: Profile):
+    """
+    Function adds stacks of threads which run the request
+    to the profile every interval until the request is done.
+    """
+    interval = profile.interval_ms / 1000
+    this_thread = threading.get_ident()
+    while not profile.done.wait(interval):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == this_thread:
+                continue
+            stack = request_stack(profile, thread_id, frame)
+            # request could end while stacks were walked
+            if stack and not profile.done.is_set():
+                profile.stacks[tuple(map(frame_label, stack))] += 1
+
+
+def record_query(statement, parameters, executemany, elapsed_ms):
+    profile = _active.get()
+    if profile is None or len(profile.queries) >= MAX_QUERIES:
+        return
+    profile.queries.append(
+        (
+            statement,
+            elapsed_ms,
+            query_stats.parameter_shapes(parameters, executemany),
+        )
+    )
+
+
+query_stats.add_listener(record_query)
+
+# ---------------------------------------------------------------------------------------
+# enable / disable
+# ---------------------------------------------------------------------------------------
+
+
+def save_config(db: Session, remaining: int, pattern: str, token: str):
+    """
+    Function saves profiling for all workers. NOTIFY is sent inside
+    the committed transaction (other workers load the row again).
+    """
+    db.merge(
+        profile_m.ProfilerConfig(
+            id=CONFIG_ID, remaining=remaining, pattern=pattern, token=token
+        )
+    )
+    if settings.CATALOG_CACHE_LISTEN:
+        db.execute(
+            text("SELECT pg_notify(:channel, '')"),
+            {"channel": NOTIFY_CHANNEL},
+        )
+    db.commit()
+    with _lock:
+        _config.update(
+            {"remaining": remaining, "pattern": pattern, "token": token}
+        )
+
+
+def load_config(db: Session):
+    """
+    Function copies profiling saved by any worker to this worker.
+    """
+    config = db.get(profile_m.ProfilerConfig, CONFIG_ID)
+    with _lock:
+        if config is None:
+            _config.update({"remaining": 0, "pattern": None, "token": None})
+        else:
+            _config.update(
+                {
+                    "remaining": config.remaining,
+                    "pattern": config.pattern,
+                    "token": config.token,
+                }
+            )
+
+
+def enable(db: Session, pattern: str | None, requests: int):
+    """
+    Function turns profiling on for the next requests of all workers.
+    Profiled are requests which match pattern ("PUT /api/v1/orders/*")
+    or have X-Profile header with the returned token.
+    """
+    save_config(db, requests, pattern, secrets.token_urlsafe(16))
+    return get_config()
+
+
+def disable(db: Session):
+    save_config(db, 0, None, None)
+
+
+def get_config():
+    with _lock:
+        return {
+            "remaining": _config["remaining"],
+            "pattern": _config["pattern"],
+            "token": _config["token"],
+            "header": PROFILE_HEADER.decode(),
+            "interval_ms": settings.PROFILER_INTERVAL_MS,
+        }
+
+
+def claim(db: Session, token: str) -> bool:
+    """
+    Function takes one of the remaining requests of all workers.
+    Returns False if they were taken by other workers or profiling
+    was changed.
+    """
+    ProfilerConfig = profile_m.ProfilerConfig
+    claimed = (
+        db.query(ProfilerConfig)
+        .filter(
+            ProfilerConfig.id == CONFIG_ID,
+            ProfilerConfig.token == token,
+            ProfilerConfig.remaining > 0,
+        )
+        .update(
+            {ProfilerConfig.remaining: ProfilerConfig.remaining - 1},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    with _lock:
+        if _config["token"] == token:
+            # this worker has seen all changes of the row but claims
+            # of other workers, so its count is never lower
+            _config["remaining"] = (
+                max(_config["remaining"] - 1, 0) if claimed else 0
+            )
+    return bool(claimed)
+
+
+# ---------------------------------------------------------------------------------------
+# get_profiles
+# ---------------------------------------------------------------------------------------
+
+
+def save(db: Session, profile: Profile):
+    """
+    Function saves the profile for all workers, only the last
+    PROFILER_KEEP profiles are kept.
+    """
+    data = profile.to_dict()
+    db.add(
+        profile_m.RequestProfile(
+            summary=profile.summary(),
+            stacks=data["stacks"],
+            queries=data["queries"],
+        )
+    )
+    db.flush()
+    RequestProfile = profile_m.RequestProfile
+    oldest_kept = (
+        db.query(RequestProfile.id)
+        .order_by(RequestProfile.id.desc())
+        .offset(settings.PROFILER_KEEP - 1)
+        .limit(1)
+        .scalar()
+    )
+    if oldest_kept is not None:
+        db.query(RequestProfile).filter(
+            RequestProfile.id < oldest_kept
+        ).delete(synchronize_session=False)
+    db.commit()
+
+
+def get_profiles(db: Session):
+    RequestProfile = profile_m.RequestProfile
+    rows = (
+        db.query(RequestProfile.id, RequestProfile.summary)
+        .order_by(RequestProfile.id.desc())
+        .limit(settings.PROFILER_KEEP)
+    )
+    return [{"id": profile_id, **summary} for profile_id, summary in rows]
+
+
+def get_profile(db: Session, profile_id: int) -> dict | None:
+    profile = db.get(profile_m.RequestProfile, profile_id)
+    if profile is None:
+        return None
+    return {
+        "id": profile.id,
+        **profile.summary,
+        "stacks": profile.stacks,
+        "queries": profile.queries,
+    }
+
+
+def clear(db: Session):
+    disable(db)
+    db.query(profile_m.RequestProfile).delete(synchronize_session=False)
+    db.commit()
+
+
+# ---------------------------------------------------------------------------------------
+# ProfilerMiddleware
+# ---------------------------------------------------------------------------------------
+
+
+def select_request(scope: dict) -> str | None:
+    """
+    Function checks if the request is profiled by this worker and
+    returns token of the profiling. One request is profiled at a time.
+    """
+    if scope["type"] != "http":
+        return None
+    with _lock:
+        if _config["remaining"] <= 0 or _config["running"]:
+            return None
+        token = _config["token"]
+        pattern = _config["pattern"]
+        selected = any(
+            name == PROFILE_HEADER
+            and secrets.compare_digest(value, token.encode())
+            for name, value in scope["headers"]
+        ) or (
+            pattern is not None
+            and fnmatchcase(f"{scope['method']} {scope['path']}", pattern)
+        )
+        if not selected:
+            return None
+        _config["running"] = True
+        return token
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware which profiles requests selected by an admin.
+    A thread samples stacks of the event loop and worker threads
+    which run the request, statements are timed by engine events.
+    Profiling and profiles are kept in database, so they are shared
+    by all workers. When profiling is off requests pass through
+    untouched.
+
+    session_factory returns a context manager with a session
+    (e.g. SessionLocal).
+    """
+
+    def __init__(self, app, session_factory):
+        self.app = app
+        self.session_factory = session_factory
+
+    def claim(self, token: str) -> bool:
+        with self.session_factory() as db:
+            return claim(db, token)
+
+    def finish(self, profile: Profile, sampler: threading.Thread):
+        try:
+            sampler.join()
+            with self.session_factory() as db:
+                save(db, profile)
+        finally:
+            with _lock:
+                _config["running"] = False
+
+    async def should_profile(self, scope: dict) -> bool:
+        token = select_request(scope)
+        if token is None:
+            return False
+        claimed = False
+        try:
+            claimed = await run_in_threadpool(self.claim, token)
+        finally:
+            if not claimed:
+                with _lock:
+                    _config["running"] = False
+        return claimed
+
+    async def __call__(self, scope, receive, send):
+        if not _config["remaining"] or not await self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope, settings.PROFILER_INTERVAL_MS)
+        profile.frame = sys._getframe()
+        profile.loop_thread = threading.get_ident()
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        token = _active.set(profile)
+        sampler = threading.Thread(
+            target=sample, args=(profile,), name="profiler", daemon=True
+        )
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            # sampler stops after its current sample
+            profile.done.set()
+            _active.reset(token)
+            endpoint = scope.get("endpoint")
+            profile.endpoint = getattr(endpoint, "__name__", None)
+            # sampler is joined and profile is saved in a worker thread,
+            # event loop serves other requests meanwhile
+            await run_in_threadpool(self.finish, profile, sampler)
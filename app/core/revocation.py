@@ -0,0 +1,279 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.models import user_m
+
+# ---------------------------------------------------------------------------------------
+# BloomFilter
+# ---------------------------------------------------------------------------------------
+
+
+class BloomFilter:
+    """
+    Compact set of strings.
+    "in" never misses an added item, but it can say True for an item
+    which wasn't added (with false_positive_rate probability).
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def _positions(self, item: str):
+        # double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def new_filter():
+    return BloomFilter(
+        capacity=settings.REVOCATION_FILTER_CAPACITY,
+        false_positive_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    )
+
+
+# state of the worker: filter of revoked jti and database time
+# of the last refresh (None > all not expired tokens are loaded)
+_lock = threading.Lock()
+_state = {
+    "filter": new_filter(),
+    "loaded_at": None,
+    "refreshed_at": float("-inf"),
+}
+_stats = {
+    "checks": 0,
+    "filter_hits": 0,
+    "false_positives": 0,
+    "refreshes": 0,
+}
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns metrics of the revocation filter:
+    * capacity, size_bytes, hashes, added... state of the filter
+    * checks... tokens checked
+    * filter_hits... checks which needed a database query
+    * false_positives... filter hits of not revoked tokens
+    * refreshes... loads of new revoked tokens from database
+    """
+    with _lock:
+        revocation_filter = _state["filter"]
+        return {
+            "capacity": settings.REVOCATION_FILTER_CAPACITY,
+            "size_bytes": len(revocation_filter.bits),
+            "hashes": revocation_filter.hashes,
+            "added": revocation_filter.count,
+            **_stats,
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# refresh
+# ---------------------------------------------------------------------------------------
+
+
+def start_refresh(force: bool):
+    """
+    Function returns (rebuild, loaded_at) if it's time to refresh,
+    otherwise None.
+    """
+    now = time.monotonic()
+    with _lock:
+        if not force and (
+            now - _state["refreshed_at"] < settings.REVOCATION_REFRESH_SECONDS
+        ):
+            return None
+        _state["refreshed_at"] = now
+        rebuild = _state["filter"].count >= settings.REVOCATION_FILTER_CAPACITY
+        return rebuild, None if rebuild else _state["loaded_at"]
+
+
+def revoked_since(loaded_at: datetime | None, db_now: datetime):
+    """
+    Function returns query of jti of not expired tokens revoked since
+    loaded_at, or all of them if loaded_at is None.
+    """
+    query = select(user_m.RevokedToken.jti).filter(
+        user_m.RevokedToken.expires_at > db_now
+    )
+    if loaded_at is not None:
+        query = query.filter(
+            user_m.RevokedToken.revoked_at
+            >= loaded_at
+            - timedelta(seconds=settings.REVOCATION_REFRESH_OVERLAP_SECONDS)
+        )
+    return query
+
+
+def finish_refresh(jtis: list, rebuild: bool, db_now: datetime):
+    with _lock:
+        if rebuild:
+            _state["filter"] = new_filter()
+        revocation_filter = _state["filter"]
+        for jti in jtis:
+            # tokens of the overlap are loaded again, count only new ones
+            # (a false positive is already checked in database)
+            if jti not in revocation_filter:
+                revocation_filter.add(jti)
+        _state["loaded_at"] = db_now
+        _stats["refreshes"] += 1
+
+
+# times of database, clocks of workers can differ
+DB_NOW = select(func.timezone("utc", func.now()))
+
+
+def refresh(db: Session, force: bool = False):
+    """
+    Function adds tokens revoked since the last refresh to the filter.
+    Runs not often than REVOCATION_REFRESH_SECONDS, so tokens revoked
+    by other workers are rejected after this delay.
+    Rows are selected by revoked_at, not by id: ids are taken at insert
+    but rows are visible in commit order, so a row with lower id can
+    appear later. REVOCATION_REFRESH_OVERLAP_SECONDS of the previous
+    refresh are loaded again for such late commits.
+    If filter is full it is rebuilt from not expired tokens.
+    """
+    started = start_refresh(force)
+    if started is None:
+        return
+    rebuild, loaded_at = started
+    db_now = db.scalar(DB_NOW)
+    jtis = db.execute(revoked_since(loaded_at, db_now)).scalars().all()
+    finish_refresh(jtis, rebuild, db_now)
+
+
+async def refresh_async(db: AsyncSession, force: bool = False):
+    """
+    Async variant of refresh.
+    """
+    started = start_refresh(force)
+    if started is None:
+        return
+    rebuild, loaded_at = started
+    db_now = await db.scalar(DB_NOW)
+    result = await db.execute(revoked_since(loaded_at, db_now))
+    finish_refresh(result.scalars().all(), rebuild, db_now)
+
+
+# ---------------------------------------------------------------------------------------
+# is_revoked
+# ---------------------------------------------------------------------------------------
+
+
+def filter_hit(jti: str) -> bool:
+    """
+    Function returns True if token may be revoked (database is asked).
+    """
+    with _lock:
+        _stats["checks"] += 1
+        if jti not in _state["filter"]:
+            return False
+        _stats["filter_hits"] += 1
+        return True
+
+
+def revoked_query(jti: str):
+    return select(
+        select(user_m.RevokedToken.id)
+        .filter(user_m.RevokedToken.jti == jti)
+        .exists()
+    )
+
+
+def count_false_positive(revoked: bool):
+    if not revoked:
+        with _lock:
+            _stats["false_positives"] += 1
+
+
+def is_revoked(jti: str | None, db: Session):
+    """
+    Function checks if token was revoked.
+    Usually it is only a lookup in the filter, database is asked only
+    when filter says that token may be revoked.
+    Tokens without jti (issued before revocation) can't be revoked.
+    """
+    if jti is None:
+        return False
+
+    refresh(db)
+    if not filter_hit(jti):
+        return False
+    revoked = db.scalar(revoked_query(jti))
+    count_false_positive(revoked)
+    return revoked
+
+
+async def is_revoked_async(jti: str | None, db: AsyncSession):
+    """
+    Async variant of is_revoked.
+    """
+    if jti is None:
+        return False
+
+    await refresh_async(db)
+    if not filter_hit(jti):
+        return False
+    revoked = await db.scalar(revoked_query(jti))
+    count_false_positive(revoked)
+    return revoked
+
+
+# ---------------------------------------------------------------------------------------
+# revoke
+# ---------------------------------------------------------------------------------------
+
+
+def revoke(jti: str, expires_at: datetime, db: Session):
+    """
+    Function saves token as revoked, the caller commits (so tokens
+    of one logout are revoked together or not at all).
+    It is added to the filter of this worker at once (if the commit
+    fails it's only a false positive), other workers get it on their
+    next refresh.
+    """
+    db.execute(
+        insert(user_m.RevokedToken)
+        .values(
+            jti=jti,
+            expires_at=expires_at,
+            revoked_at=func.timezone("utc", func.now()),
+        )
+        .on_conflict_do_nothing(index_elements=["jti"])
+    )
+    with _lock:
+        _state["filter"].add(jti)
@@ -1,11 +1,16 @@
+from uuid import uuid4
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from fastapi import HTTPException, status, Security
+from fastapi import Depends, HTTPException, status, Security
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.schemas import auth_s
 from app.core import settings
+from app.core import token_cache, revocation
+from app.database.dependb import get_async_db, get_db
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -68,6 +73,8 @@ def encode_token(data: dict, type: str):
             "exp": expire,
             "scope": type,
             "iat": datetime.utcnow(),
+            # id of token to revoke it
+            "jti": uuid4().hex,
         }
     )
     return jwt.encode(
@@ -89,7 +96,13 @@ def decode_access_token(access_token: str):
         *decoding.
         *velidating it (expired or not).
     If token is  valid returns decoded data.
+    Already verified tokens are taken from token cache.
     """
+    # token was verified before and not expired yet
+    token_data = token_cache.get_token_data(access_token)
+    if token_data is not None:
+        return token_data
+
     try:
         # decode token
         payload = jwt.decode(
@@ -118,6 +131,7 @@ def decode_access_token(access_token: str):
         email: str = payload.get("email")
         id: int = payload.get("id")
         role: str = payload.get("role")
+        jti: str = payload.get("jti")
 
         # check if data exist
         if email is None or id is None or role is None:
@@ -132,7 +146,9 @@ def decode_access_token(access_token: str):
             id=id,
             email=email,
             role=role,
+            jti=jti,
         )
+        token_cache.add_token_data(access_token, token_data, payload["exp"])
         return token_data
 
     except JWTError:
@@ -201,6 +217,48 @@ def decode_refresh_token(
         )
 
 
+# ---------------------------------------------------------------------------------------
+# get_token_claims
+# ---------------------------------------------------------------------------------------
+
+
+def get_token_claims(token: str):
+    """
+    Function returns claims of a token without verifying it.
+    Use it only for tokens which were already decoded.
+    """
+    return jwt.get_unverified_claims(token)
+
+
+# ---------------------------------------------------------------------------------------
+# check_not_revoked
+# ---------------------------------------------------------------------------------------
+
+
+def revoked_exception():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def check_not_revoked(jti: str | None, db: Session):
+    """
+    Function raises 401 if token was revoked (user logged out).
+    """
+    if revocation.is_revoked(jti, db):
+        raise revoked_exception()
+
+
+async def check_not_revoked_async(jti: str | None, db: AsyncSession):
+    """
+    Async variant of check_not_revoked.
+    """
+    if await revocation.is_revoked_async(jti, db):
+        raise revoked_exception()
+
+
 # ---------------------------------------------------------------------------------------
 # auth_access_wrapper
 # ---------------------------------------------------------------------------------------
@@ -208,14 +266,32 @@ def decode_refresh_token(
 
 def auth_access_wrapper(
     credentials: HTTPAuthorizationCredentials = Security(HTTPBearer()),
+    db: Session = Depends(get_db),
 ):
     """
     Function to get access to all endpoints.
     Decodes access token.
-    If token is valid returns token data.
+    If token is valid and not revoked returns token data.
+    """
+    token = credentials.credentials
+    token_data = decode_access_token(token)
+    check_not_revoked(token_data.jti, db)
+    return token_data
+
+
+async def auth_access_wrapper_async(
+    credentials: HTTPAuthorizationCredentials = Security(HTTPBearer()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Variant of auth_access_wrapper for async endpoints,
+    revocation is checked with the async session of the request
+    (no sync session and no worker thread).
     """
     token = credentials.credentials
-    return decode_access_token(token)
+    token_data = decode_access_token(token)
+    await check_not_revoked_async(token_data.jti, db)
+    return token_data
 
 
 # ---------------------------------------------------------------------------------------
@@ -225,14 +301,17 @@ def auth_access_wrapper(
 
 def auth_refresh_wrapper(
     credentials: HTTPAuthorizationCredentials = Security(HTTPBearer()),
+    db: Session = Depends(get_db),
 ):
     """
     Function to get access to one endpoint to refresh access token.
     Decodes refresh token.
-    If token is valid returns token data.
+    If token is valid and not revoked returns token data.
     """
     token = credentials.credentials
-    return decode_refresh_token(token)
+    email = decode_refresh_token(token)
+    check_not_revoked(get_token_claims(token).get("jti"), db)
+    return email
 
 
 # ---------------------------------------------------------------------------------------
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core import settings
+
+# verified access tokens of the worker: digest > (token data, expire time)
+# least recently used token is the first one
+_tokens = OrderedDict()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+}
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns metrics of the verified token cache:
+    * max_size, ttl_seconds... settings of the cache
+    * size... tokens in cache right now
+    * hits... requests which skipped token decoding
+    * misses... requests which decoded token
+    * evictions... tokens removed because cache was full
+    """
+    with _stats_lock:
+        return {
+            "max_size": settings.TOKEN_CACHE_SIZE,
+            "ttl_seconds": settings.TOKEN_CACHE_TTL,
+            "size": len(_tokens),
+            **_stats,
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# get_token_data
+# ---------------------------------------------------------------------------------------
+
+
+def token_digest(token: str) -> bytes:
+    """
+    Function returns key of the token in cache,
+    so tokens themselves are not kept in memory.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_token_data(token: str):
+    """
+    Function returns data of already verified token.
+    If token is not in cache or expired returns None.
+    """
+    digest = token_digest(token)
+    with _stats_lock:
+        cached = _tokens.get(digest)
+        if cached is None or cached[1] <= time.time():
+            if cached is not None:
+                del _tokens[digest]
+            _stats["misses"] += 1
+            return None
+        _tokens.move_to_end(digest)
+        _stats["hits"] += 1
+        return cached[0]
+
+
+# ---------------------------------------------------------------------------------------
+# add_token_data
+# ---------------------------------------------------------------------------------------
+
+
+def add_token_data(token: str, token_data, expire: float):
+    """
+    Function puts data of verified token into cache.
+    Token is kept until its "exp" but not longer than TOKEN_CACHE_TTL.
+    """
+    if settings.TOKEN_CACHE_SIZE <= 0:
+        return
+    expire = min(expire, time.time() + settings.TOKEN_CACHE_TTL)
+    digest = token_digest(token)
+    with _stats_lock:
+        _tokens[digest] = (token_data, expire)
+        _tokens.move_to_end(digest)
+        while len(_tokens) > settings.TOKEN_CACHE_SIZE:
+            _tokens.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+# ---------------------------------------------------------------------------------------
+# clear
+# ---------------------------------------------------------------------------------------
+
+
+def clear():
+    """
+    Function removes all tokens from cache.
+    """
+    with _stats_lock:
+        _tokens.clear()
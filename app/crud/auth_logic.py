@@ -1,9 +1,11 @@
+from datetime import datetime
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 
 from app.models import user_m
-from app.core import security
+from app.core import security, password_pool, revocation
 
 
 # ---------------------------------------------------------------------------------------
@@ -11,13 +13,12 @@ from app.core import security
 # ---------------------------------------------------------------------------------------
 
 
-def create_user(
+def check_new_user(
     schema: BaseModel,
     db: Session,
 ):
     """
-    This function creating a user.
-    All steps described.
+    This function checks that user can be created.
     """
     user = (
         db.query(user_m.User)
@@ -38,11 +39,18 @@ def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Passwords do not match",
         )
+
+
+def save_user(
+    schema: BaseModel,
+    hashed_password: str,
+    db: Session,
+):
     # creating
     new_user = user_m.User(
         fullname=schema.fullname,
         email=EmailStr(schema.email.lower()),
-        password=security.get_hashed_password(schema.password),
+        password=hashed_password,
     )
 
     db.add(new_user)
@@ -51,26 +59,54 @@ def create_user(
     return new_user
 
 
+def create_user(
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    This function creating a user.
+    All steps described.
+    """
+    check_new_user(schema=schema, db=db)
+    return save_user(
+        schema=schema,
+        hashed_password=password_pool.get_hashed_password(schema.password),
+        db=db,
+    )
+
+
+async def create_user_async(
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    Async variant of create_user.
+    Password is hashed in password pool without holding a thread
+    of the threadpool, database work runs in the threadpool.
+    """
+    await run_in_threadpool(check_new_user, schema=schema, db=db)
+    hashed_password = await password_pool.get_hashed_password_async(
+        schema.password
+    )
+    return await run_in_threadpool(
+        save_user, schema=schema, hashed_password=hashed_password, db=db
+    )
+
+
 # ---------------------------------------------------------------------------------------
 # verify_login
 # ---------------------------------------------------------------------------------------
 
+enter_exception_detail = "Incorrect email or password"
 
-def verify_login(
+
+def get_login_user(
     schema: BaseModel,
     db: Session,
 ):
     """
-    This function to verify a login.
-    If user is exist and passwords is matching we return access token
-    and refresh token to access to endpoinds.
-    All steps described.
+    This function returns user of the login form.
     """
-    enter_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Incorrect email or password",
-    )
-
     user = (
         db.query(user_m.User)
         .filter(user_m.User.email == EmailStr(schema.email.lower()))
@@ -79,11 +115,27 @@ def verify_login(
 
     # user existence check
     if not user:
-        raise enter_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=enter_exception_detail,
+        )
+    return user
 
+
+def login_tokens(
+    user: user_m.User,
+    password_matches: bool,
+):
+    """
+    This function returns access token and refresh token
+    if password is matching.
+    """
     # Check if the password is valid
-    if not security.verify_password(schema.password, user.password):
-        raise enter_exception
+    if not password_matches:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=enter_exception_detail,
+        )
 
     # payload data for access token
     access_data = {
@@ -106,3 +158,79 @@ def verify_login(
         "refresh_token": refresh_token,
         "token_type": "bearer",
     }
+
+
+def verify_login(
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    This function to verify a login.
+    If user is exist and passwords is matching we return access token
+    and refresh token to access to endpoinds.
+    All steps described.
+    """
+    user = get_login_user(schema=schema, db=db)
+    return login_tokens(
+        user=user,
+        password_matches=password_pool.verify_password(
+            schema.password, user.password
+        ),
+    )
+
+
+async def verify_login_async(
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    Async variant of verify_login.
+    Password is verified in password pool without holding a thread
+    of the threadpool, database work runs in the threadpool.
+    """
+    user = await run_in_threadpool(get_login_user, schema=schema, db=db)
+    return login_tokens(
+        user=user,
+        password_matches=await password_pool.verify_password_async(
+            schema.password, user.password
+        ),
+    )
+
+
+# ---------------------------------------------------------------------------------------
+# logout
+# ---------------------------------------------------------------------------------------
+
+
+def logout(
+    access_token: str,
+    refresh_token: str | None,
+    db: Session,
+):
+    """
+    This function revokes access token (already verified)
+    and refresh token if it is entered.
+    Revoked tokens are rejected until they expire.
+    """
+    tokens = [access_token]
+    if refresh_token is not None:
+        # only user's own valid refresh token can be revoked
+        email = security.decode_refresh_token(refresh_token)
+        if email != security.get_token_claims(access_token)["email"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Refresh token belongs to another user",
+            )
+        tokens.append(refresh_token)
+
+    for token in tokens:
+        claims = security.get_token_claims(token)
+        # tokens issued before revocation have no id
+        if claims.get("jti") is not None:
+            revocation.revoke(
+                jti=claims["jti"],
+                expires_at=datetime.utcfromtimestamp(claims["exp"]),
+                db=db,
+            )
+    # both tokens are revoked by one transaction
+    db.commit()
@@ -1,10 +1,60 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from pydantic import BaseModel
 from fastapi.encoders import jsonable_encoder
 
 from app.database.db import Base
-from app.models import store_m
+from app.models import store_m, order_m
+from app.crud import catalog_cache, pagination
+
+# ---------------------------------------------------------------------------------------
+# related_load_options
+# ---------------------------------------------------------------------------------------
+
+
+def related_load_options(item_model: Base):
+    """
+    This function returns loader options for relationships which are
+    shown by response schemas of the item model.
+    Single related objects are joined in the same query,
+    lists of related objects are loaded by one extra "IN" query.
+    Call it only after a query was created (all mappers are configured).
+    """
+    if item_model is store_m.Book:
+        return [
+            joinedload(store_m.Book.author),
+            joinedload(store_m.Book.category),
+        ]
+    if item_model is store_m.Author or item_model is store_m.Category:
+        return [selectinload(item_model.books)]
+    if item_model is order_m.Order:
+        return [
+            joinedload(order_m.Order.customer),
+            selectinload(order_m.Order.order_items),
+        ]
+    return []
+
+
+# ---------------------------------------------------------------------------------------
+# contains_pattern
+# ---------------------------------------------------------------------------------------
+
+# escape character for LIKE patterns
+LIKE_ESCAPE = "/"
+
+
+def contains_pattern(text: str):
+    """
+    This function returns LIKE pattern which matches text anywhere.
+    Wildcards inside entered text are escaped, so they are found as is.
+    Use it with ilike(..., escape=LIKE_ESCAPE), trigram index supports it.
+    """
+    for char in (LIKE_ESCAPE, "%", "_"):
+        text = text.replace(char, LIKE_ESCAPE + char)
+    return f"%{text}%"
+
 
 # ---------------------------------------------------------------------------------------
 # create_item
@@ -35,7 +85,7 @@ def create_item(
     new_item = item_model(**new_item_in_data)
 
     db.add(new_item)
-    db.commit()
+    catalog_cache.commit_and_invalidate(db, item_model)
     db.refresh(new_item)
     return new_item
 
@@ -53,13 +103,26 @@ def get_all_items(
     item_model: Base,
     active: bool = None,
     find_by_email: str = None,
+    cursor: str = None,
 ):
     """
     This function get all items.
     It's general function.
     All steps described.
     """
-    skip = (page - 1) * limit
+    # categories and authors are kept in memory,
+    # search by email uses trigram index of database
+    if catalog_cache.is_cached(item_model) and find_by_email is None:
+        return catalog_cache.get_page(
+            db=db,
+            item_model=item_model,
+            latest_first=latest_first,
+            limit=limit,
+            page=page,
+            active=active,
+            cursor=cursor,
+        )
+
     db_items = db.query(item_model)
 
     # sorting
@@ -75,10 +138,19 @@ def get_all_items(
     # search by email (author)
     if find_by_email is not None:
         db_items = db_items.filter(
-            item_model.email.like(f"%{find_by_email.lower()}%")
+            item_model.email.ilike(
+                contains_pattern(find_by_email), escape=LIKE_ESCAPE
+            )
         )
 
-    return db_items.limit(limit).offset(skip).all()
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=item_model.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
 
 
 # ---------------------------------------------------------------------------------------
@@ -94,7 +166,37 @@ def get_item_by_id(
     It's general function.
     All steps described.
     """
-    item = db.query(item_model).filter(item_model.id == item_id).first()
+    db_items = db.query(item_model)
+    item = (
+        db_items.options(*related_load_options(item_model))
+        .filter(item_model.id == item_id)
+        .first()
+    )
+
+    # item existence check
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{item_model.__name__} with ID {item_id} not found",
+        )
+
+    return item
+
+
+async def get_item_by_id_async(
+    item_id: int,
+    db: AsyncSession,
+    item_model: Base,
+):
+    """
+    Async variant of get_item_by_id.
+    """
+    result = await db.execute(
+        select(item_model)
+        .options(*related_load_options(item_model))
+        .filter(item_model.id == item_id)
+    )
+    item = result.scalars().first()
 
     # item existence check
     if not item:
@@ -150,7 +252,7 @@ def update_item_by_id(
         db.query(item_model).filter(item_model.id == item_id).update(
             data_to_save
         )
-        db.commit()
+        catalog_cache.commit_and_invalidate(db, item_model)
         db.refresh(item_to_update)
         return item_to_update
     else:
@@ -186,7 +288,7 @@ def delete_item_by_id(
         )
 
     db.delete(item_to_delete)
-    db.commit()
+    catalog_cache.commit_and_invalidate(db, item_model)
 
     return {"detail": item_model.__name__ + " deleted successfully"}
 
@@ -203,14 +305,16 @@ def show_all_books_of_related_model(
     limit: int,
     page: int,
     related_model: str,
+    cursor: str = None,
 ):
     """
     This function get all items of related model (author's or category's).
     It's general function.
     All steps described.
     """
-    skip = (page - 1) * limit
     db_items = db.query(store_m.Book)
+    # load author and category of each book in the same query
+    db_items = db_items.options(*related_load_options(store_m.Book))
 
     # find equal model to return right books
     if related_model == "category":
@@ -229,4 +333,11 @@ def show_all_books_of_related_model(
     else:
         db_items = db_items.order_by(store_m.Book.id)
 
-    return db_items.limit(limit).offset(skip).all()
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=store_m.Book.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
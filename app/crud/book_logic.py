@@ -1,9 +1,50 @@
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from sqlalchemy import Float, cast, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from pydantic import BaseModel, ValidationError
 from fastapi.encoders import jsonable_encoder
 
+from app.core import settings
 from app.models import store_m
+from app.schemas import store_s
+from app.crud import catalog_cache, pagination
+from app.crud.author_category_logic import related_load_options
+
+# ---------------------------------------------------------------------------------------
+# references_checked
+# ---------------------------------------------------------------------------------------
+
+# SQLSTATE of foreign key violation
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+@contextmanager
+def references_checked(db: Session):
+    """
+    Authors and categories are checked in memory of the worker,
+    one of them could be deleted by another worker since it was cached.
+    Foreign key violation of the block is returned as 400.
+    """
+    try:
+        yield
+    except IntegrityError as error:
+        if getattr(error.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+            raise
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Author or category not found!",
+        )
+
 
 # ---------------------------------------------------------------------------------------
 # create_book
@@ -34,12 +75,9 @@ def create_book(
     if "author_id" in request_data:
         if request_data["author_id"] is not None:
             # author existence check
-            bookauthor = (
-                db.query(store_m.Author)
-                .filter(store_m.Author.id == request_data["author_id"])
-                .first()
-            )
-            if not bookauthor:
+            if not catalog_cache.exists(
+                db, store_m.Author, request_data["author_id"]
+            ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Author not found!",
@@ -53,12 +91,9 @@ def create_book(
     if "category_id" in request_data:
         if request_data["category_id"] is not None:
             # category existence check
-            bookcategory = (
-                db.query(store_m.Category)
-                .filter(store_m.Category.id == request_data["category_id"])
-                .first()
-            )
-            if not bookcategory:
+            if not catalog_cache.exists(
+                db, store_m.Category, request_data["category_id"]
+            ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Category not found!",
@@ -72,20 +107,173 @@ def create_book(
     new_item = store_m.Book(**request_data)
 
     db.add(new_item)
-    db.commit()
+    with references_checked(db):
+        catalog_cache.commit_and_invalidate(db, store_m.Book)
     db.refresh(new_item)
     return new_item
 
 
 # ---------------------------------------------------------------------------------------
-# get_all_book
+# import_books
 # ---------------------------------------------------------------------------------------
 
+# columns of books loaded by bulk import
+IMPORT_COLUMNS = (
+    "name",
+    "price",
+    "description",
+    "year_of_publication",
+    "is_active",
+    "author_id",
+    "category_id",
+)
 
-def get_all_book(
+
+def validate_import_rows(rows: list[dict], db: Session):
+    """
+    This function validates rows of bulk import.
+    Authors and categories are checked for all rows at once.
+    Returns valid books (row number > data) and errors of other rows.
+    """
+    books = {}
+    errors = []
+    names = set()
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": row_number, "detail": "Row is not object"})
+            continue
+        try:
+            book = store_s.BookCreate(**row)
+        except ValidationError as error:
+            detail = "; ".join(
+                f"{'.'.join(map(str, item['loc']))}: {item['msg']}"
+                for item in error.errors()
+            )
+            errors.append({"row": row_number, "detail": detail})
+            continue
+
+        if book.author_id is None:
+            errors.append(
+                {"row": row_number, "detail": "You must enter an author!"}
+            )
+        elif book.category_id is None:
+            errors.append(
+                {"row": row_number, "detail": "You must enter category!"}
+            )
+        # the first book with the name is imported
+        elif book.name in names:
+            errors.append(
+                {"row": row_number, "detail": "Duplicate name in import"}
+            )
+        else:
+            names.add(book.name)
+            books[row_number] = book
+
+    # author and category existence check (one query for each at most)
+    author_ids = catalog_cache.existing_ids(
+        db, store_m.Author, {book.author_id for book in books.values()}
+    )
+    category_ids = catalog_cache.existing_ids(
+        db, store_m.Category, {book.category_id for book in books.values()}
+    )
+    for row_number, book in list(books.items()):
+        if book.author_id not in author_ids:
+            detail = "Author not found!"
+        elif book.category_id not in category_ids:
+            detail = "Category not found!"
+        else:
+            continue
+        errors.append({"row": row_number, "detail": detail})
+        del books[row_number]
+
+    return books, errors
+
+
+def import_books(
+    rows: list[dict],
     db: Session,
-    limit: int,
-    page: int,
+):
+    """
+    This function creates many books at once (JSON objects or CSV rows).
+    Valid rows are loaded by COPY into a temporary table and moved to
+    books by one INSERT ... ON CONFLICT, books with existing names
+    are skipped. Everything is done in one transaction.
+    Returns number of imported books and errors of rejected rows.
+    """
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty entered data",
+        )
+
+    books, errors = validate_import_rows(rows, db)
+    imported_names = set()
+    if books:
+        buffer = io.StringIO()
+        # strings are quoted, so only None is NULL for COPY
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row_number, book in books.items():
+            writer.writerow(
+                [row_number]
+                + [getattr(book, column) for column in IMPORT_COLUMNS]
+            )
+        buffer.seek(0)
+
+        columns = ", ".join(IMPORT_COLUMNS)
+        # psycopg2 cursor in the transaction of the session
+        cursor = db.connection().connection.cursor()
+        # qualified by pg_temp, so a table "books_import" of public schema
+        # is never dropped or used
+        cursor.execute("DROP TABLE IF EXISTS pg_temp.books_import")
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE pg_temp.books_import (
+                row_number integer,
+                name varchar(128),
+                price numeric(10, 2),
+                description text,
+                year_of_publication integer,
+                is_active boolean,
+                author_id integer,
+                category_id integer
+            ) ON COMMIT DROP
+            """
+        )
+        cursor.copy_expert(
+            "COPY pg_temp.books_import FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO books ({columns})
+            SELECT {columns} FROM pg_temp.books_import ORDER BY row_number
+            ON CONFLICT (name) DO NOTHING
+            RETURNING name
+            """
+        )
+        imported_names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        catalog_cache.commit_and_invalidate(db, store_m.Book)
+
+    for row_number, book in books.items():
+        if book.name not in imported_names:
+            errors.append(
+                {
+                    "row": row_number,
+                    "detail": "Book with this name already exists",
+                }
+            )
+
+    errors.sort(key=lambda error: error["row"])
+    return {"imported": len(imported_names), "errors": errors}
+
+
+# ---------------------------------------------------------------------------------------
+# filter_books
+# ---------------------------------------------------------------------------------------
+
+
+def filter_books(
+    db_items,
     reverse_sort: bool,
     book_active: bool,
     search_by_autor_id: int,
@@ -93,18 +281,23 @@ def get_all_book(
     categories_active: bool,
 ):
     """
-    This function get all books.
+    This function adds filters and sorting of book list to the query.
+    Works with sync Query and with select() for async session.
     All steps described.
     """
-    skip = (page - 1) * limit
-
-    db_items = db.query(store_m.Book)
-
     # shows book only with active Category (Category.is_active == True)
     if categories_active is not None:
         db_items = db_items.join(store_m.Category).filter(
             store_m.Category.is_active.is_(categories_active)
         )
+        # category is already joined, so it is taken from the same rows
+        db_items = db_items.options(
+            contains_eager(store_m.Book.category),
+            joinedload(store_m.Book.author),
+        )
+    else:
+        # load author and category of each book in the same query
+        db_items = db_items.options(*related_load_options(store_m.Book))
 
     # sorting (reverse by default)
     if reverse_sort:
@@ -128,7 +321,274 @@ def get_all_book(
     if book_active is not None:
         db_items = db_items.filter(store_m.Book.is_active == book_active)
 
-    return db_items.limit(limit).offset(skip).all()
+    return db_items
+
+
+# ---------------------------------------------------------------------------------------
+# get_all_book
+# ---------------------------------------------------------------------------------------
+
+
+def get_all_book(
+    db: Session,
+    limit: int,
+    page: int,
+    reverse_sort: bool,
+    book_active: bool,
+    search_by_autor_id: int,
+    search_by_category_id: int,
+    categories_active: bool,
+    cursor: str = None,
+):
+    """
+    This function get all books.
+    All steps described.
+    """
+    db_items = filter_books(
+        db_items=db.query(store_m.Book),
+        reverse_sort=reverse_sort,
+        book_active=book_active,
+        search_by_autor_id=search_by_autor_id,
+        search_by_category_id=search_by_category_id,
+        categories_active=categories_active,
+    )
+
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=store_m.Book.id,
+        latest_first=reverse_sort,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
+
+
+async def get_all_book_async(
+    db: AsyncSession,
+    limit: int,
+    page: int,
+    reverse_sort: bool,
+    book_active: bool,
+    search_by_autor_id: int,
+    search_by_category_id: int,
+    categories_active: bool,
+    cursor: str = None,
+):
+    """
+    Async variant of get_all_book.
+    """
+    db_items = filter_books(
+        db_items=select(store_m.Book),
+        reverse_sort=reverse_sort,
+        book_active=book_active,
+        search_by_autor_id=search_by_autor_id,
+        search_by_category_id=search_by_category_id,
+        categories_active=categories_active,
+    )
+    db_items = pagination.page_query(
+        db_items=db_items,
+        id_column=store_m.Book.id,
+        latest_first=reverse_sort,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
+
+    result = await db.execute(db_items)
+    return result.scalars().all()
+
+
+# ---------------------------------------------------------------------------------------
+# search_books
+# ---------------------------------------------------------------------------------------
+
+# options of highlighted fragments of description
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def search_books(
+    db: Session,
+    search_text: str,
+    limit: int,
+    book_active: bool,
+    cursor: str = None,
+):
+    """
+    This function searches books by name and description.
+    It uses full-text index (search_vector), the best matches go first.
+    Found books get extra fields: rank, name_highlight
+    and description_highlight (matched words inside <b></b>).
+    All steps described.
+    """
+    config = store_m.BOOK_SEARCH_CONFIG
+    query = func.websearch_to_tsquery(config, search_text)
+    # ts_rank_cd is real, a cursor keeps rank as a double, so rank
+    # is double in both the page and the seek (ties are not lost)
+    rank = cast(func.ts_rank_cd(store_m.Book.search_vector, query), Float(53))
+
+    db_items = (
+        db.query(
+            store_m.Book,
+            rank.label("rank"),
+            func.ts_headline(config, store_m.Book.name, query),
+            func.ts_headline(
+                config,
+                func.coalesce(store_m.Book.description, ""),
+                query,
+                HEADLINE_OPTIONS,
+            ),
+        )
+        .options(*related_load_options(store_m.Book))
+        .filter(store_m.Book.search_vector.op("@@")(query))
+    )
+
+    # is Book active
+    if book_active is not None:
+        db_items = db_items.filter(store_m.Book.is_active == book_active)
+
+    # seek after the last book of previous page (by rank, then by id)
+    if cursor is not None:
+        last = pagination.decode_cursor(cursor, keys=("rank", "id"))
+        db_items = db_items.filter(
+            tuple_(rank, store_m.Book.id) < tuple_(last["rank"], last["id"])
+        )
+
+    # headlines are expensive, database makes them only for found page
+    db_items = db_items.order_by(rank.desc(), store_m.Book.id.desc())
+
+    items = []
+    for (
+        book,
+        book_rank,
+        name_highlight,
+        description_highlight,
+    ) in db_items.limit(limit).all():
+        book.rank = book_rank
+        book.name_highlight = name_highlight
+        book.description_highlight = description_highlight
+        items.append(book)
+
+    return items
+
+
+# ---------------------------------------------------------------------------------------
+# export_books
+# ---------------------------------------------------------------------------------------
+
+# columns of exported books
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "price",
+    "description",
+    "year_of_publication",
+    "is_active",
+    "author",
+    "category",
+    "updated_at",
+)
+# rows fetched from server-side cursor and sent at once
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_row(row):
+    """
+    This function returns values of exported book ready for json or csv.
+    """
+    values = dict(row._mapping)
+    values["price"] = float(values["price"])
+    values["updated_at"] = values["updated_at"].isoformat()
+    return values
+
+
+def export_snapshot_time(db: Session):
+    """
+    This function returns updated_since of the next incremental export.
+    updated_at is start time of the writing transaction, so a book
+    committed after the export began can have updated_at earlier than
+    the export. Time of database is moved back by
+    EXPORT_MAX_TRANSACTION_SECONDS, such books are exported again
+    by the next export (rows can repeat, but they are not lost).
+    """
+    return db.scalar(select(func.localtimestamp())) - timedelta(
+        seconds=settings.EXPORT_MAX_TRANSACTION_SECONDS
+    )
+
+
+def export_books(
+    db: Session,
+    export_format: str,
+    updated_since: datetime = None,
+    book_active: bool = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+):
+    """
+    This function returns iterator over all books (with author and
+    category names) as chunks of NDJSON lines or CSV rows, sorted by id.
+    Rows are read by server-side cursor in batches, so memory doesn't
+    depend on number of books.
+    With updated_since only books changed since that time are exported.
+    """
+    if export_format not in ("ndjson", "csv"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Wrong export format!",
+        )
+
+    statement = (
+        select(
+            store_m.Book.id,
+            store_m.Book.name,
+            store_m.Book.price,
+            store_m.Book.description,
+            store_m.Book.year_of_publication,
+            store_m.Book.is_active,
+            store_m.Author.name.label("author"),
+            store_m.Category.name.label("category"),
+            store_m.Book.updated_at,
+        )
+        .join_from(store_m.Book, store_m.Author)
+        .join_from(store_m.Book, store_m.Category)
+        .order_by(store_m.Book.id)
+    )
+
+    # incremental export
+    if updated_since is not None:
+        statement = statement.filter(store_m.Book.updated_at >= updated_since)
+
+    # is Book active
+    if book_active is not None:
+        statement = statement.filter(store_m.Book.is_active == book_active)
+
+    result = db.execute(
+        statement.execution_options(
+            stream_results=True, max_row_buffer=batch_size
+        )
+    )
+    return export_chunks(result, export_format, batch_size)
+
+
+def export_chunks(result, export_format: str, batch_size: int):
+    """
+    This function yields exported rows of result by batches.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        yield buffer.getvalue()
+
+    for rows in result.partitions(batch_size):
+        if export_format == "ndjson":
+            yield "".join(
+                json.dumps(export_row(row), ensure_ascii=False) + "\n"
+                for row in rows
+            )
+        else:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+            writer.writerows(export_row(row) for row in rows)
+            yield buffer.getvalue()
 
 
 # ---------------------------------------------------------------------------------------
@@ -171,35 +631,29 @@ def update_book(
 
     # check if the author_id exists in database
     if "author_id" in data_to_save:
-        bookauthor = (
-            db.query(store_m.Author)
-            .filter(store_m.Author.id == data_to_save["author_id"])
-            .first()
-        )
-        if not bookauthor:
+        if not catalog_cache.exists(
+            db, store_m.Author, data_to_save["author_id"]
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Author not found!",
             )
     # check if the category_id exists in database
     if "category_id" in data_to_save:
-        bookcategory = (
-            db.query(store_m.Category)
-            .filter(store_m.Category.id == data_to_save["category_id"])
-            .first()
-        )
-
-        if not bookcategory:
+        if not catalog_cache.exists(
+            db, store_m.Category, data_to_save["category_id"]
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category not found!",
             )
     # if we have data to save and all data is valid, updating
     if data_to_save:
-        db.query(store_m.Book).filter(store_m.Book.id == item_id).update(
-            data_to_save
-        )
-        db.commit()
+        with references_checked(db):
+            db.query(store_m.Book).filter(store_m.Book.id == item_id).update(
+                data_to_save
+            )
+            catalog_cache.commit_and_invalidate(db, store_m.Book)
         db.refresh(book_to_update)
         return book_to_update
     else:
@@ -207,3 +661,73 @@ def update_book(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An order with such data already exists!",
         )
+
+
+# ---------------------------------------------------------------------------------------
+# bulk_update_books
+# ---------------------------------------------------------------------------------------
+
+
+def bulk_update_books(
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    This function changes all books chosen by ids or filter
+    by one UPDATE statement in one transaction.
+    Price can be set or changed by percent.
+    Returns number of updated books.
+    All steps described.
+    """
+    where = schema.where.dict(exclude_none=True)
+    data_to_save = schema.values.dict(exclude_none=True)
+
+    # update of all books must not happen by mistake
+    if not where:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Enter ids or filter of books!",
+        )
+    if not data_to_save and schema.price_change_percent is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty entered data",
+        )
+    if "price" in data_to_save and schema.price_change_percent is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Enter price or price change, not both!",
+        )
+
+    # check if the author_id and category_id exist in database
+    if "author_id" in data_to_save and not catalog_cache.exists(
+        db, store_m.Author, data_to_save["author_id"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Author not found!",
+        )
+    if "category_id" in data_to_save and not catalog_cache.exists(
+        db, store_m.Category, data_to_save["category_id"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category not found!",
+        )
+
+    if schema.price_change_percent is not None:
+        factor = 1 + Decimal(str(schema.price_change_percent)) / 100
+        data_to_save["price"] = func.round(store_m.Book.price * factor, 2)
+
+    statement = update(store_m.Book).values(data_to_save)
+    if "ids" in where:
+        statement = statement.where(store_m.Book.id.in_(where.pop("ids")))
+    for column, value in where.items():
+        statement = statement.where(getattr(store_m.Book, column) == value)
+
+    with references_checked(db):
+        result = db.execute(
+            statement.execution_options(synchronize_session=False)
+        )
+        catalog_cache.commit_and_invalidate(db, store_m.Book)
+    return {"updated": result.rowcount}
@@ -0,0 +1,299 @@
+import logging
+import select
+import threading
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.crud import pagination
+from app.database.db import Base, engine
+from app.models import store_m
+
+logger = logging.getLogger(__name__)
+
+# tiny read-mostly tables which are kept in memory of each worker
+CATALOG_MODELS = (store_m.Category, store_m.Author)
+
+# postgres channel which tells other workers that a table was changed
+NOTIFY_CHANNEL = "catalog_cache"
+
+# table name > {"items": rows sorted by id, "loaded_at": monotonic time}
+_tables = {}
+# table name > number of invalidations, a load started before
+# invalidation is not saved (it may have old rows)
+_generations = {}
+# functions called with name of changed table (None if all could change),
+# for example to drop cached responses
+_subscribers = []
+# other channels of the listener > function called with payload of
+# a notification (None after connecting, some could be missed before)
+_channels = {}
+_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "loads": 0,
+    "invalidations": 0,
+}
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns metrics of the catalog cache:
+    * ttl_seconds... the longest time rows can be stale
+    * tables... cached rows of each table
+    * hits... reads served from memory
+    * loads... reads of whole tables from database
+    * invalidations... tables dropped from cache after changes
+    """
+    with _lock:
+        return {
+            "ttl_seconds": settings.CATALOG_CACHE_TTL,
+            "tables": {
+                name: len(table["items"]) for name, table in _tables.items()
+            },
+            **_stats,
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# get_items
+# ---------------------------------------------------------------------------------------
+
+
+def is_cached(item_model: Base):
+    return settings.CATALOG_CACHE and item_model in CATALOG_MODELS
+
+
+def get_items(db: Session, item_model: Base):
+    """
+    Function returns all rows of the catalog table sorted by id.
+    Rows are plain objects with column values, they are not
+    bound to session. Table is loaded again if it was invalidated
+    or is older than CATALOG_CACHE_TTL.
+    """
+    name = item_model.__tablename__
+    now = time.monotonic()
+    with _lock:
+        table = _tables.get(name)
+        if (
+            table is not None
+            and now - table["loaded_at"] < settings.CATALOG_CACHE_TTL
+        ):
+            _stats["hits"] += 1
+            return table["items"]
+        generation = _generations.get(name, 0)
+
+    rows = db.execute(
+        item_model.__table__.select().order_by(item_model.id)
+    ).all()
+    items = [SimpleNamespace(**row._mapping) for row in rows]
+
+    with _lock:
+        _stats["loads"] += 1
+        if _generations.get(name, 0) == generation:
+            _tables[name] = {"items": items, "loaded_at": now}
+    return items
+
+
+# ---------------------------------------------------------------------------------------
+# get_page
+# ---------------------------------------------------------------------------------------
+
+
+def get_page(
+    db: Session,
+    item_model: Base,
+    latest_first: bool,
+    limit: int,
+    page: int,
+    active: bool = None,
+    cursor: str = None,
+):
+    """
+    Function returns one page of the catalog table from memory.
+    Works as get_all_items with page or cursor.
+    """
+    items = get_items(db, item_model)
+
+    # is item active?  (category)
+    if active is not None:
+        items = [item for item in items if item.is_active == active]
+
+    if cursor is not None:
+        last_id = pagination.decode_cursor(cursor)["id"]
+        if latest_first:
+            items = [item for item in reversed(items) if item.id < last_id]
+        else:
+            items = [item for item in items if item.id > last_id]
+        return items[:limit]
+
+    if latest_first:
+        items = items[::-1]
+    skip = max((page - 1) * limit, 0)
+    return items[skip : skip + max(limit, 0)]
+
+
+# ---------------------------------------------------------------------------------------
+# exists
+# ---------------------------------------------------------------------------------------
+
+
+def exists(db: Session, item_model: Base, item_id: int):
+    """
+    Function checks if the row exists.
+    If row is not found in memory database is asked,
+    because it can be added after the table was cached.
+    """
+    if is_cached(item_model):
+        items = get_items(db, item_model)
+        if any(item.id == item_id for item in items):
+            return True
+    return db.query(
+        db.query(item_model).filter(item_model.id == item_id).exists()
+    ).scalar()
+
+
+def existing_ids(db: Session, item_model: Base, ids: set) -> set:
+    """
+    Function returns which of ids exist, by one query at most.
+    Ids which are not found in memory are looked for in database.
+    """
+    found = set()
+    if is_cached(item_model):
+        found = {item.id for item in get_items(db, item_model)} & ids
+    missing = ids - found
+    if missing:
+        rows = db.query(item_model.id).filter(item_model.id.in_(missing))
+        found |= {row.id for row in rows}
+    return found
+
+
+# ---------------------------------------------------------------------------------------
+# invalidate
+# ---------------------------------------------------------------------------------------
+
+
+def subscribe(callback):
+    """
+    Function adds callback which is called when a table of catalog
+    (books, authors or categories) is changed by any worker.
+    """
+    _subscribers.append(callback)
+
+
+def drop(table_name: str = None):
+    """
+    Function drops cached rows of the table (all tables if None)
+    in this worker and tells subscribers about the change.
+    """
+    with _lock:
+        if table_name is None:
+            names = [model.__tablename__ for model in CATALOG_MODELS]
+        else:
+            names = [table_name]
+        for name in names:
+            _generations[name] = _generations.get(name, 0) + 1
+            if _tables.pop(name, None) is not None:
+                _stats["invalidations"] += 1
+    for callback in _subscribers:
+        callback(table_name)
+
+
+def clear():
+    """
+    Function drops all cached tables of this worker.
+    """
+    drop()
+
+
+def commit_and_invalidate(db: Session, item_model: Base):
+    """
+    Function commits changes of the table and drops its cached rows.
+    NOTIFY for other workers is sent inside the committed transaction,
+    so it costs no extra round-trip and it is delivered if and only if
+    the changes are committed. Rows of this worker are dropped after
+    commit, so a concurrent load can't cache rows from before it.
+    """
+    if settings.CATALOG_CACHE_LISTEN:
+        db.execute(
+            text("SELECT pg_notify(:channel, :table)"),
+            {"channel": NOTIFY_CHANNEL, "table": item_model.__tablename__},
+        )
+    db.commit()
+    drop(item_model.__tablename__)
+
+
+# ---------------------------------------------------------------------------------------
+# start_listener
+# ---------------------------------------------------------------------------------------
+
+
+def listen():
+    """
+    Function waits for notifications of other workers and drops
+    changed tables. If connection is lost all tables are dropped
+    and it connects again.
+    """
+    while True:
+        connection = None
+        try:
+            connection = engine.raw_connection()
+            # connection is used only by this thread
+            connection.detach()
+            dbapi_connection = connection.connection
+            dbapi_connection.autocommit = True
+            channels = {NOTIFY_CHANNEL: drop, **_channels}
+            with dbapi_connection.cursor() as cursor:
+                for channel in channels:
+                    cursor.execute(f"LISTEN {channel}")
+            # notifications could be missed while there was no listener
+            for callback in channels.values():
+                callback(None)
+            while True:
+                select.select([dbapi_connection], [], [], 60)
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    channels[notify.channel](notify.payload)
+        except Exception:
+            logger.exception("Catalog cache listener failed, reconnecting")
+            drop()
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            time.sleep(1)
+
+
+_listener = None
+
+
+def listen_channel(channel: str, callback):
+    """
+    Function adds a channel of other notifications to the listener
+    (e.g. profiling turned on in another worker), so a worker needs
+    one listening connection. Call it before start_listener.
+    """
+    _channels[channel] = callback
+
+
+def start_listener():
+    """
+    Function starts a thread which listens for changes of the catalog
+    made by other workers. It's started once per worker.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    _listener = threading.Thread(
+        target=listen, name="catalog-cache-listener", daemon=True
+    )
+    _listener.start()
@@ -1,21 +1,26 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 from fastapi.encoders import jsonable_encoder
 from datetime import date
 
 from app.database.db import Base
 from app.models import order_m, store_m
+from app.crud import pagination
+from app.crud.author_category_logic import (
+    related_load_options,
+    get_item_by_id_async,
+)
 
 # ---------------------------------------------------------------------------------------
-# get_all_orders
+# filter_orders
 # ---------------------------------------------------------------------------------------
 
 
-def get_all_orders(
-    db: Session,
-    limit: int,
-    page: int,
+def filter_orders(
+    db_items,
     latest_first: bool,
     total_min: float,
     total_max: float,
@@ -27,12 +32,10 @@ def get_all_orders(
     date_placed_to: date,
 ):
     """
-    This function gets from database all orders.
+    This function adds filters and sorting of order list to the query.
+    Works with sync Query and with select() for async session.
     All steps described.
     """
-    skip = (page - 1) * limit
-    db_items = db.query(order_m.Order)
-
     # search customer orders
     if owner is not None:
         db_items = db_items.filter(order_m.Order.customer_id == owner)
@@ -85,7 +88,131 @@ def get_all_orders(
     if complete is not None:
         db_items = db_items.filter(order_m.Order.complete == complete)
 
-    return db_items.limit(limit).offset(skip).all()
+    return db_items
+
+
+# ---------------------------------------------------------------------------------------
+# get_all_orders
+# ---------------------------------------------------------------------------------------
+
+
+def get_all_orders(
+    db: Session,
+    limit: int,
+    page: int,
+    latest_first: bool,
+    total_min: float,
+    total_max: float,
+    owner: int,
+    delivery_date_from: date,
+    delivery_date_to: date,
+    complete: bool,
+    date_placed_from: date,
+    date_placed_to: date,
+    cursor: str = None,
+):
+    """
+    This function gets from database all orders.
+    All steps described.
+    """
+    db_items = filter_orders(
+        db_items=db.query(order_m.Order),
+        latest_first=latest_first,
+        total_min=total_min,
+        total_max=total_max,
+        owner=owner,
+        delivery_date_from=delivery_date_from,
+        delivery_date_to=delivery_date_to,
+        complete=complete,
+        date_placed_from=date_placed_from,
+        date_placed_to=date_placed_to,
+    )
+
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=order_m.Order.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
+
+
+async def get_all_orders_async(
+    db: AsyncSession,
+    limit: int,
+    page: int,
+    latest_first: bool,
+    total_min: float,
+    total_max: float,
+    owner: int,
+    delivery_date_from: date,
+    delivery_date_to: date,
+    complete: bool,
+    date_placed_from: date,
+    date_placed_to: date,
+    cursor: str = None,
+):
+    """
+    Async variant of get_all_orders.
+    """
+    db_items = filter_orders(
+        db_items=select(order_m.Order),
+        latest_first=latest_first,
+        total_min=total_min,
+        total_max=total_max,
+        owner=owner,
+        delivery_date_from=delivery_date_from,
+        delivery_date_to=delivery_date_to,
+        complete=complete,
+        date_placed_from=date_placed_from,
+        date_placed_to=date_placed_to,
+    )
+    db_items = pagination.page_query(
+        db_items=db_items,
+        id_column=order_m.Order.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
+
+    result = await db.execute(db_items)
+    return result.scalars().all()
+
+
+# ---------------------------------------------------------------------------------------
+# count_total_price
+# ---------------------------------------------------------------------------------------
+
+
+def count_total_price(
+    item,
+    books_db: list,
+):
+    """
+    This function checks that all books of the order exist
+    and returns total price of the order.
+    books_db is a list of (id, price) rows of order's books.
+    """
+    book_prices = {book_id: price for book_id, price in books_db}
+
+    # books existence check
+    book_ids = {part_of_item.book_id for part_of_item in item}
+    not_found_ids = [
+        str(book_id) for book_id in sorted(book_ids - book_prices.keys())
+    ]
+    if not_found_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with ID {', '.join(not_found_ids)} not found",
+        )
+
+    # adding each order's item price to Order's total price
+    return sum(
+        book_prices[part_of_item.book_id] * part_of_item.quantity
+        for part_of_item in item
+    )
 
 
 # ---------------------------------------------------------------------------------------
@@ -100,82 +227,118 @@ def create_item(
 ):
     """
     This function creates new order.
+    All referenced books are got by one query and the order with
+    all order's items is saved in one transaction.
     All steps described.
     """
+    # order without order's items makes no sense, it is refused with
+    # the same 400 as before (which created and deleted an empty order)
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty entered data",
+        )
+
+    # getting all books of the order by one query
+    books_db = (
+        db.query(store_m.Book.id, store_m.Book.price)
+        .filter(store_m.Book.id.in_({i.book_id for i in item}))
+        .all()
+    )
+    total_price = count_total_price(item=item, books_db=books_db)
+
     # creating new order which all order's items will be added
     new_order = order_m.Order(
-        total_price=0.00,
+        total_price=total_price,
         paid=False,
         customer_id=current_user.id,
         complete=False,
     )
     db.add(new_order)
-    db.commit()
-
-    # total price will change from each item
-    total_price = 0
-
-    # looping each order's item in order
-    for part_of_item in item:
-        book_db = (
-            db.query(store_m.Book)
-            .filter(store_m.Book.id == part_of_item.book_id)
-            .first()
-        )
-        # book existence check
-        if not book_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Book with ID {part_of_item.book_id} not found",
-            )
-
-        # create new order
-        new_order_item = order_m.OrderItem(
-            order_id=new_order.id,
-            book_id=part_of_item.book_id,
-            quantity=part_of_item.quantity,
-        )
-        # adding each order's item price to Order's total price
-        total_price += book_db.price * part_of_item.quantity
-        db.add(new_order_item)
-
-    # updating Order's total price
-    db.query(order_m.Order).filter(order_m.Order.id == new_order.id).update(
-        {"total_price": total_price}
+    # flush to get id of new order, commit will be done at the end
+    db.flush()
+    # commit expires new_order, reading its id after it is a query
+    order_id = new_order.id
+
+    # adding all order's items by one bulk insert
+    db.execute(
+        order_m.OrderItem.__table__.insert(),
+        [
+            {
+                "order_id": order_id,
+                "book_id": part_of_item.book_id,
+                "quantity": part_of_item.quantity,
+            }
+            for part_of_item in item
+        ],
     )
-
     db.commit()
 
-    # if something goes wrong we need and we have no new order's items
-    # so we need to know it
-    check_for_exist_items = (
-        db.query(order_m.OrderItem)
-        .filter(order_m.OrderItem.order_id == new_order.id)
-        .count()
+    # returning the order with related customer and order's items
+    return (
+        db.query(order_m.Order)
+        .options(*related_load_options(order_m.Order))
+        .filter(order_m.Order.id == order_id)
+        .first()
     )
 
-    # if order's items exist, we return the order
-    if check_for_exist_items:
-        db_item = (
-            db.query(order_m.Order)
-            .filter(order_m.Order.id == new_order.id)
-            .first()
-        )
 
-        return db_item
-    else:
-        # deleting order bacause order's items is not exist
-        # if something goes wrong we need to delete empty order
-        delete_previous_order_items = order_m.Order.__table__.delete().where(
-            order_m.Order.id == new_order.id
-        )
-        db.execute(delete_previous_order_items)
-        db.commit()
+async def create_item_async(
+    item,
+    db: AsyncSession,
+    current_user: Base,
+):
+    """
+    Async variant of create_item.
+    """
+    # order without order's items makes no sense, it is refused with
+    # the same 400 as before (which created and deleted an empty order)
+    if not item:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Empty entered data",
         )
 
+    # getting all books of the order by one query
+    result = await db.execute(
+        select(store_m.Book.id, store_m.Book.price).filter(
+            store_m.Book.id.in_({i.book_id for i in item})
+        )
+    )
+    total_price = count_total_price(item=item, books_db=result.all())
+
+    # creating new order which all order's items will be added
+    new_order = order_m.Order(
+        total_price=total_price,
+        paid=False,
+        customer_id=current_user.id,
+        complete=False,
+    )
+    db.add(new_order)
+    # flush to get id of new order, commit will be done at the end
+    await db.flush()
+
+    # adding all order's items by one bulk insert
+    await db.execute(
+        order_m.OrderItem.__table__.insert(),
+        [
+            {
+                "order_id": new_order.id,
+                "book_id": part_of_item.book_id,
+                "quantity": part_of_item.quantity,
+            }
+            for part_of_item in item
+        ],
+    )
+    await db.commit()
+
+    # returning the order with related customer and order's items
+    return await get_item_by_id_async(
+        item_id=new_order.id,
+        db=db,
+        item_model=order_m.Order,
+    )
+
 
 # ---------------------------------------------------------------------------------------
 # update_item_by_id_by_staff
@@ -201,7 +364,9 @@ def update_item_by_id_by_staff(
             detail=f"Order with ID {item_id} not found",
         )
 
-    request_data = jsonable_encoder(schema).items()
+    # delivery_date is kept as a date (not a string of json), so it is
+    # compared with the saved one and it is accepted by every database
+    request_data = schema.dict().items()
 
     data_to_save = dict()
     # checking if the data matches the existing data in our db_item
@@ -235,29 +400,83 @@ def update_item_by_id_by_staff(
 # ---------------------------------------------------------------------------------------
 
 
+def filter_user_orders(
+    db_items,
+    latest_first: bool,
+    current_user: Base,
+):
+    """
+    This function adds owner filter and sorting of user's orders to the query.
+    Works with sync Query and with select() for async session.
+    """
+    # order's items are shown in list, load them by one extra query
+    db_items = db_items.options(selectinload(order_m.Order.order_items))
+    db_items = db_items.filter(order_m.Order.customer_id == current_user.id)
+
+    # sorting
+    if latest_first:
+        db_items = db_items.order_by(order_m.Order.id.desc())
+    else:
+        db_items = db_items.order_by(order_m.Order.id)
+
+    return db_items
+
+
 def get_all_user_orders(
     latest_first: bool,
     limit: int,
     page: int,
     db: Session,
     current_user: Base,
+    cursor: str = None,
 ):
     """
     This function returns list of all orders of the owner (current user).
     All steps described.
     """
-    skip = (page - 1) * limit
-    db_items = db.query(order_m.Order).filter(
-        order_m.Order.customer_id == current_user.id
+    db_items = filter_user_orders(
+        db_items=db.query(order_m.Order),
+        latest_first=latest_first,
+        current_user=current_user,
     )
 
-    # sorting
-    if latest_first:
-        db_items = db_items.order_by(order_m.Order.id.desc())
-    else:
-        db_items = db_items.order_by(order_m.Order.id)
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=order_m.Order.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
+
+
+async def get_all_user_orders_async(
+    latest_first: bool,
+    limit: int,
+    page: int,
+    db: AsyncSession,
+    current_user: Base,
+    cursor: str = None,
+):
+    """
+    Async variant of get_all_user_orders.
+    """
+    db_items = filter_user_orders(
+        db_items=select(order_m.Order),
+        latest_first=latest_first,
+        current_user=current_user,
+    )
+    db_items = pagination.page_query(
+        db_items=db_items,
+        id_column=order_m.Order.id,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
 
-    return db_items.limit(limit).offset(skip).all()
+    result = await db.execute(db_items)
+    return result.scalars().all()
 
 
 # ---------------------------------------------------------------------------------------
@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm import Query
+
+# name of response header with cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# ---------------------------------------------------------------------------------------
+# encode_cursor
+# ---------------------------------------------------------------------------------------
+
+
+def encode_cursor(item, keys: tuple = ("id",)) -> str:
+    """
+    This function returns an opaque cursor which points to the item.
+    Cursor keeps values of the sort keys of the last item on the page.
+    """
+    payload = json.dumps(
+        {key: getattr(item, key) for key in keys}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+# ---------------------------------------------------------------------------------------
+# decode_cursor
+# ---------------------------------------------------------------------------------------
+
+
+def decode_cursor(cursor: str, keys: tuple = ("id",)) -> dict:
+    """
+    This function decodes a cursor which was made by encode_cursor.
+    If cursor is broken raises 400.
+    """
+    cursor_exception = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        raise cursor_exception
+
+    # check if data exist and type of data is valid
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise cursor_exception
+    for key in keys:
+        value = payload.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise cursor_exception
+
+    return payload
+
+
+# ---------------------------------------------------------------------------------------
+# page_query
+# ---------------------------------------------------------------------------------------
+
+
+def page_query(
+    db_items,
+    id_column,
+    latest_first: bool,
+    limit: int,
+    page: int,
+    cursor: str = None,
+):
+    """
+    This function limits already sorted query (Query or select) to one page.
+    If cursor is entered it seeks after the last item of previous page
+    (WHERE id < last_id), so deep pages cost as much as the first one.
+    Otherwise it uses old page/offset mode.
+    """
+    if cursor is not None:
+        last_id = decode_cursor(cursor)["id"]
+        if latest_first:
+            db_items = db_items.filter(id_column < last_id)
+        else:
+            db_items = db_items.filter(id_column > last_id)
+        return db_items.limit(limit)
+
+    skip = (page - 1) * limit
+    return db_items.limit(limit).offset(skip)
+
+
+# ---------------------------------------------------------------------------------------
+# paginate
+# ---------------------------------------------------------------------------------------
+
+
+def paginate(
+    db_items: Query,
+    id_column,
+    latest_first: bool,
+    limit: int,
+    page: int,
+    cursor: str = None,
+):
+    """
+    This function returns one page of already sorted query.
+    """
+    return page_query(
+        db_items=db_items,
+        id_column=id_column,
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    ).all()
+
+
+# ---------------------------------------------------------------------------------------
+# set_next_cursor
+# ---------------------------------------------------------------------------------------
+
+
+def set_next_cursor(
+    response: Response,
+    items: list,
+    limit: int,
+    keys: tuple = ("id",),
+):
+    """
+    This function adds cursor of the next page to response headers.
+    If page is not full there is no next page and header is not added.
+    """
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            items[-1], keys=keys
+        )
@@ -1,11 +1,14 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from app.database.db import Base
 from app.models import user_m
-from app.core import security
+from app.core import password_pool
+from app.crud import pagination
+from app.crud.author_category_logic import contains_pattern, LIKE_ESCAPE
 
 
 # ---------------------------------------------------------------------------------------
@@ -20,12 +23,12 @@ def get_all_users(
     reverse_sort: bool,
     find_by_email: str,
     role: str,
+    cursor: str = None,
 ):
     """
     This function get all users.
     All steps described.
     """
-    skip = (page - 1) * limit
     db_items = db.query(user_m.User)
 
     # sorting
@@ -37,14 +40,25 @@ def get_all_users(
     # search for a match in email
     if find_by_email is not None:
         db_items = db_items.filter(
-            user_m.User.email.like(f"%{find_by_email.lower()}%")
+            user_m.User.email.ilike(
+                contains_pattern(find_by_email), escape=LIKE_ESCAPE
+            )
         )
 
     # is user is staff
     if role is not None:
-        db_items = db_items.filter(user_m.User.role.like(f"%{role}%"))
+        db_items = db_items.filter(
+            user_m.User.role.ilike(contains_pattern(role), escape=LIKE_ESCAPE)
+        )
 
-    return db_items.limit(limit).offset(skip).all()
+    return pagination.paginate(
+        db_items=db_items,
+        id_column=user_m.User.id,
+        latest_first=reverse_sort,
+        limit=limit,
+        page=page,
+        cursor=cursor,
+    )
 
 
 # ---------------------------------------------------------------------------------------
@@ -122,16 +136,53 @@ def change_user_by_superuser(
 # change_user_by_himself
 # ---------------------------------------------------------------------------------------
 
+PASSWORD_FIELDS = ("old_password", "new_password", "new_passwordConfirm")
 
-def change_user_by_himself(
-    email: str,
-    schema: BaseModel,
-    db: Session,
-):
+
+def entered_data(schema: BaseModel):
     """
-    This function change user by himself.
-    All steps described.
+    Function returns entered (not None) values of schema.
+    """
+    return {
+        keyy: value
+        for keyy, value in jsonable_encoder(schema).items()
+        if value is not None
+    }
+
+
+def password_change_requested(data_to_update: dict):
+    """
+    Function returns True if password should be changed.
+    The entered data should include 3 types of passwords.
+    """
+    if not any(field in data_to_update for field in PASSWORD_FIELDS):
+        return False
+    if not all(field in data_to_update for field in PASSWORD_FIELDS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enought data to change password!",
+        )
+    return True
+
+
+def check_new_password(data_to_update: dict, old_password_matches: bool):
     """
+    Function checks result of old password verification
+    and that new passwords match.
+    """
+    if not old_password_matches:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect old password",
+        )
+    if data_to_update["new_password"] != data_to_update["new_passwordConfirm"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="New passwords do not match",
+        )
+
+
+def get_user_to_update(email: str, db: Session):
     # user existence check
     user_to_update = (
         db.query(user_m.User).filter(user_m.User.email == email).first()
@@ -140,13 +191,24 @@ def change_user_by_himself(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
         )
+    return user_to_update
 
-    request_data = jsonable_encoder(schema).items()
-    data_to_update = dict()
-    # сheck if there is a value
-    for keyy, value in request_data:
-        if value is not None:
-            data_to_update[keyy] = value
+
+def change_user_by_himself(
+    email: str,
+    schema: BaseModel,
+    db: Session,
+    new_password_hash: str = None,
+):
+    """
+    This function change user by himself.
+    new_password_hash is the new password already verified and hashed
+    by change_user_by_himself_async.
+    All steps described.
+    """
+    user_to_update = get_user_to_update(email=email, db=db)
+
+    data_to_update = entered_data(schema)
 
     if data_to_update:
         if "fullname" in data_to_update:
@@ -156,57 +218,26 @@ def change_user_by_himself(
                 }
             )
 
-        # check the entered data, it should include 3 types of passwords
-        if any(
-            [
-                "old_password" in data_to_update,
-                "new_password" in data_to_update,
-                "new_passwordConfirm" in data_to_update,
-            ]
-        ):
-            if not all(
-                [
-                    "old_password" in data_to_update,
-                    "new_password" in data_to_update,
-                    "new_passwordConfirm" in data_to_update,
-                ]
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Not enought data to change password!",
-                )
-            else:
+        if password_change_requested(data_to_update):
+            if new_password_hash is None:
                 # checking if the entered password matches
                 # to the one in the database
-                if not security.verify_password(
-                    data_to_update["old_password"], user_to_update.password
-                ):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Incorrect old password",
-                    )
-                else:
-                    # checking passwords for matching
-                    if (
-                        data_to_update["new_password"]
-                        != data_to_update["new_passwordConfirm"]
-                    ):
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="New passwords do not match",
-                        )
-                    else:
-                        # hashing new password
-                        new_password_to_db = security.get_hashed_password(
-                            data_to_update["new_password"]
-                        )
-                        db.query(user_m.User).filter(
-                            user_m.User.email == email
-                        ).update(
-                            {
-                                "password": new_password_to_db,
-                            }
-                        )
+                check_new_password(
+                    data_to_update,
+                    password_pool.verify_password(
+                        data_to_update["old_password"],
+                        user_to_update.password,
+                    ),
+                )
+                # hashing new password
+                new_password_hash = password_pool.get_hashed_password(
+                    data_to_update["new_password"]
+                )
+            db.query(user_m.User).filter(user_m.User.email == email).update(
+                {
+                    "password": new_password_hash,
+                }
+            )
         # check if user with new email is exist
         if "email" in data_to_update:
             user_in_db = (
@@ -238,6 +269,41 @@ def change_user_by_himself(
         )
 
 
+async def change_user_by_himself_async(
+    email: str,
+    schema: BaseModel,
+    db: Session,
+):
+    """
+    Async variant of change_user_by_himself.
+    Password is verified and hashed in password pool without holding
+    a thread of the threadpool, database work runs in the threadpool.
+    """
+    data_to_update = entered_data(schema)
+    new_password_hash = None
+    if password_change_requested(data_to_update):
+        user_to_update = await run_in_threadpool(
+            get_user_to_update, email=email, db=db
+        )
+        check_new_password(
+            data_to_update,
+            await password_pool.verify_password_async(
+                data_to_update["old_password"], user_to_update.password
+            ),
+        )
+        new_password_hash = await password_pool.get_hashed_password_async(
+            data_to_update["new_password"]
+        )
+
+    return await run_in_threadpool(
+        change_user_by_himself,
+        email=email,
+        schema=schema,
+        db=db,
+        new_password_hash=new_password_hash,
+    )
+
+
 # ---------------------------------------------------------------------------------------
 # delete_user
 # ---------------------------------------------------------------------------------------
@@ -1,13 +1,83 @@
-from sqlalchemy import create_engine
+from sqlalchemy import DDL, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core import settings
+from app.database import query_stats
+from app.database.pool_metrics import MeteredAsyncQueuePool, MeteredQueuePool
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+def pool_options():
+    """
+    Returns connection pool options from settings.
+    """
+    return {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+connect_args = {}
+async_connect_args = {}
+if settings.DB_STATEMENT_TIMEOUT:
+    timeout = settings.DB_STATEMENT_TIMEOUT
+    connect_args = {"options": f"-c statement_timeout={timeout}"}
+    async_connect_args = {
+        "server_settings": {"statement_timeout": str(timeout)}
+    }
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=MeteredQueuePool,
+    connect_args=connect_args,
+    **pool_options(),
+)
+# queries per request, Server-Timing and slow-query log
+query_stats.install(engine)
 
 # create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# create async engine and session (only if async database is enabled)
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE:
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        poolclass=MeteredAsyncQueuePool,
+        connect_args=async_connect_args,
+        **pool_options(),
+    )
+    query_stats.install(async_engine.sync_engine)
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+def get_pool_stats():
+    """
+    Returns metrics of database connection pools of this worker.
+    """
+    stats = {"sync": engine.pool.metrics()}
+    if async_engine is not None:
+        stats["async"] = async_engine.sync_engine.pool.metrics()
+    return stats
+
 
 Base = declarative_base()
+
+# extensions used by indexes of models (trigram indexes)
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -1,4 +1,4 @@
-from app.database.db import SessionLocal
+from app.database.db import SessionLocal, AsyncSessionLocal
 
 
 # Dependency to get DB session.
@@ -8,3 +8,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get async DB session.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
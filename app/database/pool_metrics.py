@@ -0,0 +1,85 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# ---------------------------------------------------------------------------------------
+# PoolMetricsMixin
+# ---------------------------------------------------------------------------------------
+
+
+class PoolMetricsMixin:
+    """
+    Collects checkout metrics of a queue pool:
+    * checkouts... number of connections given from pool
+    * checkout_wait_total_ms / checkout_wait_max_ms... time spent waiting
+    for a free connection (includes pre-ping when it is enabled)
+    * timeouts... checkouts failed because pool was exhausted
+    * overflow_checkouts... checkouts served by overflow connections
+    * overflow_max... the biggest overflow seen
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "checkouts": 0,
+            "checkout_wait_total_ms": 0.0,
+            "checkout_wait_max_ms": 0.0,
+            "timeouts": 0,
+            "overflow_checkouts": 0,
+            "overflow_max": 0,
+        }
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._metrics["timeouts"] += 1
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+
+        overflow = self.overflow()
+        with self._metrics_lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["checkout_wait_total_ms"] += wait_ms
+            self._metrics["checkout_wait_max_ms"] = max(
+                self._metrics["checkout_wait_max_ms"], wait_ms
+            )
+            if overflow > 0:
+                self._metrics["overflow_checkouts"] += 1
+                self._metrics["overflow_max"] = max(
+                    self._metrics["overflow_max"], overflow
+                )
+        return connection
+
+    def metrics(self):
+        """
+        Returns current state of the pool and collected metrics.
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        checkouts = metrics["checkouts"]
+        metrics["checkout_wait_avg_ms"] = (
+            metrics["checkout_wait_total_ms"] / checkouts if checkouts else 0.0
+        )
+        metrics.update(
+            {
+                "pool_size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+            }
+        )
+        return metrics
+
+
+class MeteredQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
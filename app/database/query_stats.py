@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+# statements of the current request: {"queries", "time_ms", "scope"},
+# None outside of requests (startup, listener threads)
+_current = ContextVar("query_stats", default=None)
+_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "queries": 0,
+    "query_time_total_ms": 0.0,
+    "slow_queries": 0,
+    # statements of tracked requests
+    "request_queries": 0,
+}
+# functions called after each statement, e.g. by request profiler
+_listeners = []
+# logged statements are cut to this length
+MAX_STATEMENT_LENGTH = 1000
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns query metrics of the worker:
+    * slow_query_ms... threshold of the slow-query log (0 = off)
+    * requests... requests which were tracked
+    * queries, query_time_total_ms... statements sent to database
+    * queries_per_request_avg... statements of tracked requests
+    * slow_queries... statements slower than slow_query_ms
+    """
+    with _lock:
+        stats = dict(_stats)
+    requests = stats["requests"]
+    stats["queries_per_request_avg"] = (
+        stats.pop("request_queries") / requests if requests else 0.0
+    )
+    return {"slow_query_ms": settings.SLOW_QUERY_MS, **stats}
+
+
+# ---------------------------------------------------------------------------------------
+# track
+# ---------------------------------------------------------------------------------------
+
+
+@contextmanager
+def track(scope: dict = None):
+    """
+    Counts statements executed inside the block (in this task and in
+    threads started from it, e.g. sync endpoints). Yields a dict with
+    "queries" and "time_ms" which is updated as statements are done.
+    """
+    request_stats = {"queries": 0, "time_ms": 0.0, "scope": scope}
+    token = _current.set(request_stats)
+    try:
+        yield request_stats
+    finally:
+        _current.reset(token)
+        with _lock:
+            _stats["requests"] += 1
+            _stats["request_queries"] += request_stats["queries"]
+
+
+def route_name(scope: dict | None) -> str:
+    """
+    Function returns name of the endpoint which handles the request,
+    or its path if the request isn't routed yet.
+    """
+    if scope is None:
+        return "-"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", str(endpoint))
+    return f"{scope.get('method', '')} {scope.get('path', '')}".strip()
+
+
+# ---------------------------------------------------------------------------------------
+# parameter_shapes
+# ---------------------------------------------------------------------------------------
+
+
+def _type_name(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters, executemany: bool = False) -> str:
+    """
+    Function describes bound parameters by their types, not values,
+    so logs don't have emails, passwords and other data of users:
+    {"id_1": 5, "name": "x"} > "{id_1: int, name: str}".
+    """
+    if executemany:
+        rows = list(parameters)
+        if not rows:
+            return "0 x ()"
+        return f"{len(rows)} x {parameter_shapes(rows[0])}"
+    if isinstance(parameters, dict):
+        items = ", ".join(
+            f"{name}: {_type_name(value)}"
+            for name, value in parameters.items()
+        )
+        return f"{{{items}}}"
+    if isinstance(parameters, (list, tuple)):
+        return f"({', '.join(_type_name(value) for value in parameters)})"
+    return _type_name(parameters)
+
+
+# ---------------------------------------------------------------------------------------
+# install
+# ---------------------------------------------------------------------------------------
+
+
+def before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    request_stats = _current.get()
+    if request_stats is not None:
+        request_stats["queries"] += 1
+        request_stats["time_ms"] += elapsed_ms
+
+    slow = 0 < settings.SLOW_QUERY_MS <= elapsed_ms
+    with _lock:
+        _stats["queries"] += 1
+        _stats["query_time_total_ms"] += elapsed_ms
+        if slow:
+            _stats["slow_queries"] += 1
+
+    if slow:
+        scope = request_stats["scope"] if request_stats is not None else None
+        logger.warning(
+            "Slow query %.1f ms in %s: %s parameters %s",
+            elapsed_ms,
+            route_name(scope),
+            " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+            parameter_shapes(parameters, executemany),
+        )
+
+    for callback in _listeners:
+        callback(statement, parameters, executemany, elapsed_ms)
+
+
+def add_listener(callback):
+    """
+    Function adds callback which is called after each statement
+    with (statement, parameters, executemany, elapsed_ms).
+    It runs in thread of the statement, so it must be fast.
+    """
+    _listeners.append(callback)
+
+
+def install(engine):
+    """
+    Function adds listeners which time every statement of the engine.
+    Works with sync engine (use async_engine.sync_engine for async).
+    """
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+# ---------------------------------------------------------------------------------------
+# QueryStatsMiddleware
+# ---------------------------------------------------------------------------------------
+
+
+def server_timing(request_stats: dict, total_ms: float) -> str:
+    """
+    Function returns value of Server-Timing header, browsers show it
+    in developer tools next to the request.
+    """
+    return (
+        f'db;dur={request_stats["time_ms"]:.1f};'
+        f'desc="{request_stats["queries"]} queries", '
+        f"app;dur={total_ms:.1f}"
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware which counts statements of each request and adds
+    Server-Timing header: database time, number of queries and time
+    until response headers were sent. Statements of streamed bodies
+    are done after the header is sent, they are logged only.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_STATS:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with track(scope) as request_stats:
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    total_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (
+                            b"server-timing",
+                            server_timing(request_stats, total_ms).encode(),
+                        )
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from sqlalchemy import text
+
+from app.core import profiler, settings
+from app.database.db import Base, SessionLocal, engine
+
+# ---------------------------------------------------------------------------------------
+# create_tables
+# ---------------------------------------------------------------------------------------
+
+
+def create_tables():
+    """
+    Function creates all tables which don't exist yet.
+    Only for local development, use alembic migrations otherwise.
+    """
+    Base.metadata.create_all(bind=engine)
+
+
+# ---------------------------------------------------------------------------------------
+# check_database
+# ---------------------------------------------------------------------------------------
+
+
+def _ping_database():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def check_database(timeout: float):
+    """
+    Function checks that database answers in timeout seconds.
+    If not, raises RuntimeError, so the worker doesn't start
+    instead of hanging on the first request.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        executor.submit(_ping_database).result(timeout=timeout)
+    except TimeoutError:
+        raise RuntimeError(
+            f"Database did not answer in {timeout} seconds on startup"
+        )
+    finally:
+        executor.shutdown(wait=False)
+
+
+# ---------------------------------------------------------------------------------------
+# load_profiler_config
+# ---------------------------------------------------------------------------------------
+
+
+def load_profiler_config(payload: str = None):
+    """
+    Function loads profiling turned on by admins in any worker,
+    it's called by the listener of notifications.
+    """
+    with SessionLocal() as db:
+        profiler.load_config(db)
+
+
+# ---------------------------------------------------------------------------------------
+# on_startup
+# ---------------------------------------------------------------------------------------
+
+
+def on_startup():
+    """
+    Startup hook of the application.
+    By default it doesn't touch schema (it's done by alembic),
+    so a worker boots without reflecting tables.
+    """
+    if settings.DB_CREATE_TABLES:
+        create_tables()
+    if settings.DB_STARTUP_CHECK:
+        check_database(timeout=settings.DB_STARTUP_TIMEOUT)
+    if settings.CATALOG_CACHE_LISTEN and (
+        settings.CATALOG_CACHE or settings.RESPONSE_CACHE or settings.PROFILER
+    ):
+        # imported here, crud modules are not needed to create tables
+        from app.crud import catalog_cache
+
+        if settings.PROFILER:
+            catalog_cache.listen_channel(
+                profiler.NOTIFY_CHANNEL, load_profiler_config
+            )
+        catalog_cache.start_listener()
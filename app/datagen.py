@@ -0,0 +1,300 @@
+"""
+Generates production-sized synthetic data for performance testing.
+
+Scale factor 1 is 100k books and ~500k order items,
+scale 100 is 10M books and ~50M order items. The same seed and scale
+give the same data. Rows are generated by several processes and loaded
+by COPY, new rows get ids after existing ones. For example:
+    python -m app.datagen --scale 1 --workers 4
+    python -m app.datagen --scale 10 --seed 7 --dry-run
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import psycopg2
+
+from app.core import security, settings
+
+# rows of each table for scale factor 1
+BASE_ROWS = {
+    "authors": 1000,
+    "categories": 100,
+    "users": 20000,
+    "books": 100000,
+    "orders": 200000,
+}
+# rows generated and copied by one task
+CHUNK_SIZE = 50000
+# the same password for all generated users (bcrypt is too slow for all)
+USER_PASSWORD = "password123"
+# orders are placed during two years before this date
+BASE_DATE = datetime(2024, 1, 1)
+
+COLUMNS = {
+    "authors": ("id", "name", "email"),
+    "categories": ("id", "name", "is_active"),
+    "users": ("id", "fullname", "email", "password", "role"),
+    "books": (
+        "id",
+        "name",
+        "price",
+        "description",
+        "year_of_publication",
+        "is_active",
+        "author_id",
+        "category_id",
+    ),
+    "orders": (
+        "id",
+        "date_placed",
+        "customer_id",
+        "total_price",
+        "paid",
+        "delivery_date",
+        "complete",
+    ),
+    "order_items": ("order_id", "book_id", "quantity"),
+}
+
+FIRST_NAMES = "Anna Artem Bob Carla Denis Emma Felix Greta Hugo Iris".split()
+LAST_NAMES = "Brown Clark Davis Evans Fisher Garcia Hall Jones King".split()
+WORDS = (
+    "adventure ancient book city dark dragon dream garden history home "
+    "journey king light love magic mountain night ocean old recipes river "
+    "sea secret shadow story summer time war world"
+).split()
+
+# ---------------------------------------------------------------------------------------
+# book_price
+# ---------------------------------------------------------------------------------------
+
+
+def book_price(book_id: int) -> float:
+    """
+    Price of generated book, orders use it without reading books.
+    """
+    return round(2.5 + (book_id * 7919 % 1000) / 1000 * 47.5, 2)
+
+
+# ---------------------------------------------------------------------------------------
+# generate_rows
+# ---------------------------------------------------------------------------------------
+
+
+def generate_rows(table: str, first_id: int, count: int, rng, refs: dict):
+    """
+    Yields rows of the table with ids first_id...first_id + count - 1.
+    refs has id ranges (first, last) of referenced tables.
+    For orders yields rows of orders and order items as
+    ("orders", row) and ("order_items", row).
+    """
+    for row_id in range(first_id, first_id + count):
+        if table == "authors":
+            yield (row_id, f"Author {row_id}", f"author{row_id}@example.com")
+        elif table == "categories":
+            yield (row_id, f"Category {row_id}", rng.random() > 0.1)
+        elif table == "users":
+            yield (
+                row_id,
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"user{row_id}@example.com",
+                refs["password"],
+                "user",
+            )
+        elif table == "books":
+            yield (
+                row_id,
+                f"Book {row_id}",
+                book_price(row_id),
+                " ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                rng.randint(1900, 2023),
+                rng.random() > 0.05,
+                rng.randint(*refs["authors"]),
+                rng.randint(*refs["categories"]),
+            )
+        elif table == "orders":
+            total_price = 0
+            for _ in range(rng.randint(1, 4)):
+                book_id = rng.randint(*refs["books"])
+                quantity = rng.randint(1, 3)
+                total_price += book_price(book_id) * quantity
+                yield "order_items", (row_id, book_id, quantity)
+            date_placed = BASE_DATE - timedelta(
+                seconds=rng.randint(0, 730 * 24 * 3600)
+            )
+            complete = rng.random() > 0.1
+            delivery_date = None
+            if complete:
+                delivery_date = date_placed + timedelta(
+                    days=rng.randint(1, 14)
+                )
+                delivery_date = delivery_date.date().isoformat()
+            yield "orders", (
+                row_id,
+                date_placed.isoformat(),
+                rng.randint(*refs["users"]),
+                round(total_price, 2),
+                complete or rng.random() > 0.5,
+                delivery_date,
+                complete,
+            )
+
+
+def generate_tables(table: str, first_id: int, count: int, rng, refs: dict):
+    """
+    Returns rows of generate_rows by table: {table: [rows]}.
+    Orders are split into orders and order_items, orders go first
+    (order items reference them).
+    """
+    rows = generate_rows(table, first_id, count, rng, refs)
+    if table != "orders":
+        return {table: list(rows)}
+    tables = {"orders": [], "order_items": []}
+    for row_table, row in rows:
+        tables[row_table].append(row)
+    return tables
+
+
+# ---------------------------------------------------------------------------------------
+# load_chunk
+# ---------------------------------------------------------------------------------------
+
+
+def copy_rows(cursor, table: str, rows: list):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(COLUMNS[table])}) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def load_chunk(task: dict):
+    """
+    Generates one chunk of rows and loads it by COPY in own connection.
+    Random generator depends only on seed, table and chunk number.
+    Returns table and number of loaded rows.
+    """
+    table = task["table"]
+    rng = random.Random(f"{task['seed']}-{table}-{task['chunk']}")
+    tables = generate_tables(
+        table, task["first_id"], task["count"], rng, task["refs"]
+    )
+
+    connection = psycopg2.connect(task["dsn"])
+    try:
+        with connection, connection.cursor() as cursor:
+            for row_table, table_rows in tables.items():
+                copy_rows(cursor, row_table, table_rows)
+    finally:
+        connection.close()
+    return {row_table: len(rows) for row_table, rows in tables.items()}
+
+
+# ---------------------------------------------------------------------------------------
+# make_tasks
+# ---------------------------------------------------------------------------------------
+
+
+def make_tasks(table: str, first_id: int, count: int, seed: int, refs, dsn):
+    tasks = []
+    for chunk, start in enumerate(range(0, count, CHUNK_SIZE)):
+        tasks.append(
+            {
+                "table": table,
+                "chunk": chunk,
+                "first_id": first_id + start,
+                "count": min(CHUNK_SIZE, count - start),
+                "seed": seed,
+                "refs": refs,
+                "dsn": dsn,
+            }
+        )
+    return tasks
+
+
+# ---------------------------------------------------------------------------------------
+# generate
+# ---------------------------------------------------------------------------------------
+
+
+def generate(scale: float, seed: int, workers: int, dry_run: bool = False):
+    """
+    Generates all tables for the scale factor.
+    Tables are loaded one after another (references must exist),
+    chunks of one table are loaded in parallel.
+    """
+    counts = {
+        table: max(int(rows * scale), 1) for table, rows in BASE_ROWS.items()
+    }
+    if dry_run:
+        counts["order_items (about)"] = int(counts["orders"] * 2.5)
+        for table, count in counts.items():
+            print(f"{table:>20}: {count:>12,}")
+        return
+
+    dsn = str(settings.SQLALCHEMY_DATABASE_URI)
+    connection = psycopg2.connect(dsn)
+    with connection, connection.cursor() as cursor:
+        first_ids = {}
+        for table in BASE_ROWS:
+            cursor.execute(f"SELECT coalesce(max(id), 0) FROM {table}")
+            first_ids[table] = cursor.fetchone()[0] + 1
+    connection.close()
+
+    refs = {
+        table: (first_ids[table], first_ids[table] + count - 1)
+        for table, count in counts.items()
+    }
+    # one bcrypt hash for all users
+    refs["password"] = security.get_hashed_password(USER_PASSWORD)
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for table in BASE_ROWS:
+            tasks = make_tasks(
+                table, first_ids[table], counts[table], seed, refs, dsn
+            )
+            loaded = {}
+            for result in pool.imap_unordered(load_chunk, tasks):
+                for row_table, count in result.items():
+                    loaded[row_table] = loaded.get(row_table, 0) + count
+            for row_table, count in loaded.items():
+                elapsed = time.perf_counter() - start
+                print(f"{row_table:>12}: {count:>12,} rows ({elapsed:.1f}s)")
+
+    # serial ids continue after generated rows
+    connection = psycopg2.connect(dsn)
+    with connection, connection.cursor() as cursor:
+        for table in COLUMNS:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT max(id) FROM {table}))"
+            )
+        cursor.execute("ANALYZE")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only show rows per table"
+    )
+    args = parser.parse_args()
+    generate(args.scale, args.seed, args.workers, args.dry_run)
+    if not args.dry_run:
+        print(f"password of generated users: {USER_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
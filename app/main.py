@@ -1,19 +1,36 @@
 from fastapi import FastAPI
 
-from app.database.db import engine
 from app.core import settings
-from app.routers import api_router
-from app.database.db import Base
-
-# creating all tables in database
-Base.metadata.create_all(bind=engine)
+from app.core.metrics import MetricsMiddleware
+from app.core.profiler import ProfilerMiddleware
+from app.routers import api_router, metrics_r
+from app.database.db import SessionLocal
+from app.database.query_stats import QueryStatsMiddleware
+from app.database.startup import on_startup
 
 app = FastAPI()
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# profiles of requests selected by admins (POST /profiler)
+if settings.PROFILER:
+    app.add_middleware(ProfilerMiddleware, session_factory=SessionLocal)
+
+# queries and database time of each request in Server-Timing header
+app.add_middleware(QueryStatsMiddleware)
+
+# request metrics of each worker for Prometheus (GET /metrics)
+if settings.METRICS:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_r.router)
+
+# schema is managed by alembic ("alembic upgrade head"),
+# set DB_CREATE_TABLES=True to create tables on startup in development
+app.add_event_handler("startup", on_startup)
+
 
 # poetry shell                      launch virtual enviroment
+# alembic upgrade head              create or update database tables
 # uvicorn app.main:app --reload     launch project
 # pytest -v                         launch tests
 # pytest --cov                      to see how many percents of
@@ -2,3 +2,4 @@ from app.database.db import Base
 from .order_m import *
 from .store_m import *
 from .user_m import *
+from .profile_m import *
@@ -7,6 +7,8 @@ from sqlalchemy import (
     SmallInteger,
     DateTime,
     Numeric,
+    Index,
+    text,
 )
 from datetime import datetime
 from sqlalchemy.orm import relationship
@@ -18,15 +20,26 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    date_placed = Column(DateTime(), default=datetime.now)
+    date_placed = Column(DateTime(), default=datetime.now, index=True)
     customer_id = Column(Integer, ForeignKey("users.id"))
-    total_price = Column(Numeric(10, 2))
+    total_price = Column(Numeric(10, 2), index=True)
     paid = Column(Boolean, default=False)
-    delivery_date = Column(Date, default=None)
+    delivery_date = Column(Date, default=None, index=True)
     complete = Column(Boolean, default=False)
 
     order_items = relationship("OrderItem", backref="order")
 
+    __table_args__ = (
+        # orders of one customer, the latest first
+        Index("ix_orders_customer_id_id", "customer_id", text("id DESC")),
+        # orders which are not completed yet (small working set)
+        Index(
+            "ix_orders_not_complete_id",
+            "id",
+            postgresql_where=text("complete IS false"),
+        ),
+    )
+
     def __repr__(self):
         return f"Order ID: {self.id}"
 
@@ -34,8 +47,8 @@ class Order(Base):
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer(), primary_key=True)
-    order_id = Column(Integer(), ForeignKey("orders.id"))
-    book_id = Column(Integer(), ForeignKey("books.id"))
+    order_id = Column(Integer(), ForeignKey("orders.id"), index=True)
+    book_id = Column(Integer(), ForeignKey("books.id"), index=True)
     quantity = Column(SmallInteger(), nullable=False)
     book = relationship("Book")
 
@@ -0,0 +1,23 @@
+from sqlalchemy import JSON, Column, Integer, String
+
+from app.database.db import Base
+
+
+class ProfilerConfig(Base):
+    __tablename__ = "profiler_config"
+
+    # one row, profiling turned on by an admin for all workers
+    id = Column(Integer, primary_key=True)
+    remaining = Column(Integer, nullable=False, default=0)
+    pattern = Column(String)
+    token = Column(String)
+
+
+class RequestProfile(Base):
+    __tablename__ = "request_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Profile.summary(), stacks and queries of Profile.to_dict()
+    summary = Column(JSON, nullable=False)
+    stacks = Column(JSON, nullable=False)
+    queries = Column(JSON, nullable=False)
@@ -3,13 +3,27 @@ from sqlalchemy import (
     Integer,
     Boolean,
     Column,
+    Computed,
+    DateTime,
+    Index,
     Text,
     ForeignKey,
     Numeric,
+    func,
+    text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.database.db import Base
 
+# text search configuration used for books
+BOOK_SEARCH_CONFIG = "english"
+BOOK_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{BOOK_SEARCH_CONFIG}', coalesce(name, '')), 'A')"
+    f" || setweight(to_tsvector('{BOOK_SEARCH_CONFIG}', "
+    "coalesce(description, '')), 'B')"
+)
+
 
 class Category(Base):
     __tablename__ = "categories"
@@ -29,6 +43,16 @@ class Author(Base):
     name = Column(String(64), nullable=False, unique=True)
     email = Column(String(64), nullable=False)
 
+    __table_args__ = (
+        # trigram index for substring search by email
+        Index(
+            "ix_authors_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"Author name: {self.name}"
 
@@ -45,9 +69,53 @@ class Book(Base):
 
     author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    # time of the last change, used by incremental export
+    updated_at = Column(
+        DateTime(),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        index=True,
+    )
+
+    # full-text search document, filled by database (name is more important)
+    # deferred, so it's not loaded with every book
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(BOOK_SEARCH_VECTOR, persisted=True),
+        )
+    )
 
     author = relationship("Author", backref="books")
     category = relationship("Category", backref="books")
 
+    __table_args__ = (
+        Index(
+            "ix_books_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        # book lists filtered by author or category (is_active, sorted by id)
+        Index(
+            "ix_books_author_id_is_active_id",
+            "author_id",
+            "is_active",
+            "id",
+        ),
+        Index(
+            "ix_books_category_id_is_active_id",
+            "category_id",
+            "is_active",
+            "id",
+        ),
+        # default book list (only active books, sorted by id)
+        Index(
+            "ix_books_active_id",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
     def __repr__(self):
         return f"Book title: {self.name}"
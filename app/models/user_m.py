@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, Column
+from datetime import datetime
+from sqlalchemy import String, Integer, Column, DateTime, Index
 from sqlalchemy.orm import relationship
 
 
@@ -15,3 +16,22 @@ class User(Base):
     role = Column(String, default="user")
 
     orders = relationship("Order", backref="customer")
+
+    __table_args__ = (
+        # trigram index for substring search by email
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, unique=True, nullable=False)
+    expires_at = Column(DateTime(), nullable=False, index=True)
+    revoked_at = Column(DateTime(), default=datetime.utcnow, index=True)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.core import settings
 from app.routers import (
     authentication_r,
     user_r,
@@ -7,6 +8,10 @@ from app.routers import (
     category_r,
     book_r,
     order_r,
+    stats_r,
+    profiler_r,
+    async_book_r,
+    async_order_r,
 )
 
 api_router = APIRouter()
@@ -18,3 +23,13 @@ api_router.include_router(author_r.router)
 api_router.include_router(book_r.router)
 api_router.include_router(user_r.router)
 api_router.include_router(order_r.router)
+api_router.include_router(stats_r.router)
+
+# request profiling switched on by admins
+if settings.PROFILER:
+    api_router.include_router(profiler_r.router)
+
+# async variants of book/order endpoints (opt-in)
+if settings.ASYNC_DATABASE:
+    api_router.include_router(async_book_r.router, prefix="/async")
+    api_router.include_router(async_order_r.router, prefix="/async")
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import store_m
+from app.schemas import store_s
+from app.database.dependb import get_async_db
+from app.crud import author_category_logic, book_logic, pagination
+
+router = APIRouter(tags=["Book (async)"])
+
+
+# ---------------------------------------------------------------------------------------
+# get_all_books
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/books",
+    response_model=list[store_s.BookFullShow],
+    status_code=status.HTTP_200_OK,
+)
+async def get_all_books(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    latest_first: bool = Query(
+        True, description="Get the latest added books (from end to start)"
+    ),
+    limit: int = 10,
+    page: int = 1,
+    cursor: str
+    | None = Query(None, description="Cursor of the next page (seek mode)"),
+    active_books: bool = Query(True, description="books active or inactive"),
+    active_categories: bool = Query(
+        True,
+        description="books whose category active or inactive",
+    ),
+    autor: int | None = Query(None, description="Search books by author id"),
+    category: int
+    | None = Query(None, description="Search books by category id"),
+):
+    """
+    Get all books. Served from the event loop by async database session.
+
+        DON'T need authentication and special permissions.
+
+    Query parameters are the same as in "GET /books".
+    """
+    items = await book_logic.get_all_book_async(
+        db=db,
+        page=page,
+        limit=limit,
+        reverse_sort=latest_first,
+        book_active=active_books,
+        search_by_autor_id=autor,
+        search_by_category_id=category,
+        categories_active=active_categories,
+        cursor=cursor,
+    )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return items
+
+
+# ---------------------------------------------------------------------------------------
+# get_book_by_id
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/books/{book_id}",
+    response_model=store_s.BookFullShow,
+    status_code=status.HTTP_200_OK,
+)
+async def get_book_by_id(
+    book_id: int,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get full information about one book by ID.
+    Served from the event loop by async database session.
+
+        DON'T need authentication and special permissions.
+    """
+    return await author_category_logic.get_item_by_id_async(
+        item_id=book_id,
+        db=db,
+        item_model=store_m.Book,
+    )
@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+
+from app.models import order_m
+from app.schemas import user_order_s
+from app.database.dependb import get_async_db
+from app.crud import author_category_logic, order_logic, pagination
+from app.core import security
+
+router = APIRouter(tags=["Orders (async)"])
+
+# ---------------------------------------------------------------------------------------
+# get_all_orders
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/orders",
+    response_model=list[user_order_s.OrderShortShow],
+    status_code=status.HTTP_200_OK,
+)
+async def get_all_orders(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    latest_first: bool = True,
+    owner: int | None = None,
+    limit: int = 10,
+    page: int = 1,
+    cursor: str | None = None,
+    date_placed_from: date | None = None,
+    date_placed_to: date | None = None,
+    total_min: float | None = None,
+    total_max: float | None = None,
+    delivery_date_from: date | None = None,
+    delivery_date_to: date | None = None,
+    complete: bool | None = None,
+    current_user: dict = Depends(security.auth_access_wrapper_async),
+):
+    """
+    Get all orders. Served from the event loop by async database session.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='staff' or role='admin' can get access.
+
+    Query parameters are the same as in "GET /orders".
+    """
+    if security.check_permision(current_user, bottom_perm="staff"):
+        items = await order_logic.get_all_orders_async(
+            db=db,
+            page=page,
+            limit=limit,
+            latest_first=latest_first,
+            total_min=total_min,
+            total_max=total_max,
+            owner=owner,
+            delivery_date_from=delivery_date_from,
+            delivery_date_to=delivery_date_to,
+            complete=complete,
+            date_placed_from=date_placed_from,
+            date_placed_to=date_placed_to,
+            cursor=cursor,
+        )
+        pagination.set_next_cursor(response=response, items=items, limit=limit)
+        return items
+
+
+# ---------------------------------------------------------------------------------------
+# create_order
+# ---------------------------------------------------------------------------------------
+@router.post(
+    "/orders",
+    response_model=user_order_s.OrderFullShow,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_order(
+    order: list[user_order_s.OrderItemCreate],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(security.auth_access_wrapper_async),
+):
+    """
+    Create order. Served from the event loop by async database session.
+
+        Need authentication and DON'T need special permissions.
+
+    The logic is the same as in "POST /orders".
+    """
+    return await order_logic.create_item_async(
+        item=order,
+        db=db,
+        current_user=current_user,
+    )
+
+
+# ---------------------------------------------------------------------------------------
+# get_order_by_id
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/orders/{order_id}",
+    response_model=user_order_s.OrderFullShow,
+    status_code=status.HTTP_200_OK,
+)
+async def get_order_by_id(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(security.auth_access_wrapper_async),
+):
+    """
+    Get order by id. Served from the event loop by async database session.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='staff' or role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="staff"):
+        return await author_category_logic.get_item_by_id_async(
+            item_id=order_id,
+            db=db,
+            item_model=order_m.Order,
+        )
+
+
+# ---------------------------------------------------------------------------------------
+# get_all_user_orders
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/orders/my/",
+    response_model=list[user_order_s.OrdersForUserShow],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def get_all_user_orders(
+    response: Response,
+    latest_first: bool = True,
+    limit: int = 10,
+    page: int = 1,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(security.auth_access_wrapper_async),
+):
+    """
+    Get all orders of current_user by himself.
+    Served from the event loop by async database session.
+
+        Need authentication and DON'T need special permissions.
+
+        Only user who created it - can see it.
+    """
+    items = await order_logic.get_all_user_orders_async(
+        latest_first=latest_first,
+        limit=limit,
+        page=page,
+        db=db,
+        current_user=current_user,
+        cursor=cursor,
+    )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return items
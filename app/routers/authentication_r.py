@@ -1,4 +1,6 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Security
+from fastapi import Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.core import security
@@ -19,7 +21,7 @@ router = APIRouter(tags=["Authentication"])
     response_model=user_order_s.UserFullShow,
     status_code=status.HTTP_201_CREATED,
 )
-def registrate_new_user(
+async def registrate_new_user(
     schema: user_order_s.UserCreate,
     db: Session = Depends(get_db),
 ):
@@ -31,7 +33,7 @@ def registrate_new_user(
     By default user will have permission:
     * role = 'user'
     """
-    return auth_logic.create_user(db=db, schema=schema)
+    return await auth_logic.create_user_async(db=db, schema=schema)
 
 
 @router.post(
@@ -39,7 +41,7 @@ def registrate_new_user(
     response_model=auth_s.LoginToken,
     status_code=status.HTTP_200_OK,
 )
-def login(
+async def login(
     schema: auth_s.LoginUserSchema,
     db: Session = Depends(get_db),
 ):
@@ -60,7 +62,7 @@ def login(
     Using a refresh token requires to refresh access token.
     (expire in 10080 minutes = 7 days)
     """
-    return auth_logic.verify_login(db=db, schema=schema)
+    return await auth_logic.verify_login_async(db=db, schema=schema)
 
 
 # ---------------------------------------------------------------------------------------
@@ -113,3 +115,34 @@ def refresh_access_token(
         "access_token": new_access_token,
         "token_type": "bearer",
     }
+
+
+# ---------------------------------------------------------------------------------------
+# logout
+# ---------------------------------------------------------------------------------------
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def logout(
+    schema: auth_s.LogoutSchema | None = None,
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Security(HTTPBearer()),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Logout form.
+
+        Need authentication.
+
+    Revokes access token and refresh token (if it is entered).
+    Revoked tokens can't be used anymore.
+    """
+    auth_logic.logout(
+        access_token=credentials.credentials,
+        refresh_token=schema.refresh_token if schema else None,
+        db=db,
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
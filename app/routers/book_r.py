@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, status, Query
+import csv
+import io
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, status, Query, Response
+from fastapi import Body, File, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.models import store_m
 from app.schemas import store_s
 from app.database.dependb import get_db
-from app.crud import author_category_logic, book_logic
+from app.crud import author_category_logic, book_logic, pagination
 from app.core import security
+from app.routers import fast_json, response_cache
 
-router = APIRouter()
+router = APIRouter(route_class=response_cache.CachedRoute)
 
 
 # ---------------------------------------------------------------------------------------
@@ -21,13 +28,17 @@ router = APIRouter()
     status_code=status.HTTP_200_OK,
     tags=["Book"],
 )
+@response_cache.cached
 def get_all_books(
+    response: Response,
     db: Session = Depends(get_db),
     latest_first: bool = Query(
         True, description="Get the latest added books (from end to start)"
     ),
     limit: int = 10,
     page: int = 1,
+    cursor: str
+    | None = Query(None, description="Cursor of the next page (seek mode)"),
     active_books: bool = Query(True, description="books active or inactive"),
     active_categories: bool = Query(
         True,
@@ -50,8 +61,10 @@ def get_all_books(
     * categories_active... shows books whose category is active or inactive
     * autor... shows books with an author who has this id
     * category... shows books with category who have this id
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+    Faster than page on deep pages.
     """
-    return book_logic.get_all_book(
+    items = book_logic.get_all_book(
         db=db,
         page=page,
         limit=limit,
@@ -60,6 +73,119 @@ def get_all_books(
         search_by_autor_id=autor,
         search_by_category_id=category,
         categories_active=active_categories,
+        cursor=cursor,
+    )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return fast_json.fast_response(items, store_s.BookFullShow, response)
+
+
+# ---------------------------------------------------------------------------------------
+# search_books
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/books/search",
+    response_model=list[store_s.BookSearchShow],
+    status_code=status.HTTP_200_OK,
+    tags=["Book"],
+)
+def search_books(
+    response: Response,
+    q: str = Query(
+        ..., min_length=1, description="Words to find in name or description"
+    ),
+    limit: int = 10,
+    cursor: str
+    | None = Query(None, description="Cursor of the next page (seek mode)"),
+    active_books: bool = Query(True, description="books active or inactive"),
+    db: Session = Depends(get_db),
+):
+    """
+    Search books by name and description.
+
+        DON'T need authentication and special permissions.
+
+    The best matches go first. Matches in name are more important.
+
+    * q... words to find. Supports "quoted phrases", OR and -excluded words
+    * active_books... shows active or inattive books
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+
+    Found words are highlighted in name_highlight and
+    description_highlight as <b>word</b>.
+    """
+    items = book_logic.search_books(
+        db=db,
+        search_text=q,
+        limit=limit,
+        book_active=active_books,
+        cursor=cursor,
+    )
+    pagination.set_next_cursor(
+        response=response, items=items, limit=limit, keys=("rank", "id")
+    )
+    return fast_json.fast_response(items, store_s.BookSearchShow, response)
+
+
+# ---------------------------------------------------------------------------------------
+# export_books
+# ---------------------------------------------------------------------------------------
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@router.get(
+    "/books/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Book"],
+)
+def export_books(
+    export_format: str = Query(
+        "ndjson", alias="format", regex="^(ndjson|csv)$"
+    ),
+    updated_since: datetime
+    | None = Query(None, description="Export only books changed since"),
+    active_books: bool
+    | None = Query(None, description="books active or inactive"),
+    db: Session = Depends(get_db),
+):
+    """
+    Export all books as one stream.
+
+        DON'T need authentication and special permissions.
+
+    Each book has author's and category's names.
+
+    * format... ndjson (one json object per line) or csv
+    * updated_since... books changed since this time.
+    Use "X-Export-Snapshot" header of the previous export.
+    Books changed shortly before the previous export can be exported
+    again, update them by id.
+
+    Incremental exports don't show deleted books, only a full export
+    shows which books are gone.
+    """
+    snapshot = book_logic.export_snapshot_time(db)
+    chunks = book_logic.export_books(
+        db=db,
+        export_format=export_format,
+        updated_since=updated_since,
+        book_active=active_books,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=books.{export_format}"
+            ),
+            "X-Export-Snapshot": snapshot.isoformat(),
+        },
     )
 
 
@@ -93,6 +219,66 @@ def create_book(
         )
 
 
+# ---------------------------------------------------------------------------------------
+# import_books
+# ---------------------------------------------------------------------------------------
+
+
+@router.post(
+    "/books/import",
+    response_model=store_s.BookImportResult,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Book"],
+)
+def import_books(
+    books: list[dict] = Body(
+        ..., example=[store_s.BookCreate.Config.schema_extra["example"]]
+    ),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Create many books at once from JSON array.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='staff' or role='admin' can get access.
+
+    Each book has the same fields as in "Create book".
+    Valid books are created, errors show numbers of rejected books
+    (from 1) and reasons.
+    """
+    if security.check_permision(current_user, bottom_perm="staff"):
+        return book_logic.import_books(rows=books, db=db)
+
+
+@router.post(
+    "/books/import/csv",
+    response_model=store_s.BookImportResult,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Book"],
+)
+def import_books_csv(
+    file: UploadFile = File(..., description="CSV file with header"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Create many books at once from CSV file.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='staff' or role='admin' can get access.
+
+    The first line is header: name, price, description,
+    year_of_publication, is_active, author_id, category_id.
+    Errors show numbers of rejected rows (from 1, without header).
+    """
+    if security.check_permision(current_user, bottom_perm="staff"):
+        reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8"))
+        return book_logic.import_books(rows=list(reader), db=db)
+
+
 # ---------------------------------------------------------------------------------------
 # get_book_by_id
 # ---------------------------------------------------------------------------------------
@@ -104,6 +290,7 @@ def create_book(
     status_code=status.HTTP_200_OK,
     tags=["Book"],
 )
+@response_cache.cached
 def get_book_by_id(
     book_id: int,
     db: Session = Depends(get_db),
@@ -113,11 +300,12 @@ def get_book_by_id(
 
         DON'T need authentication and special permissions.
     """
-    return author_category_logic.get_item_by_id(
+    item = author_category_logic.get_item_by_id(
         item_id=book_id,
         db=db,
         item_model=store_m.Book,
     )
+    return fast_json.fast_response(item, store_s.BookFullShow)
 
 
 # ---------------------------------------------------------------------------------------
@@ -152,6 +340,40 @@ def update_book_by_id(
         )
 
 
+# ---------------------------------------------------------------------------------------
+# bulk_update_books
+# ---------------------------------------------------------------------------------------
+
+
+@router.patch(
+    "/books",
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Book"],
+)
+def bulk_update_books(
+    schema: store_s.BookBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Change many books at once.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='staff' or role='admin' can get access.
+
+    * where... books to change: ids and/or author_id, category_id,
+    is_active (all conditions must match)
+    * values... new values of the books
+    * price_change_percent... change price by percent (-10 = 10% cheaper),
+    price is rounded to cents
+
+    Returns number of updated books.
+    """
+    if security.check_permision(current_user, bottom_perm="staff"):
+        return book_logic.bulk_update_books(schema=schema, db=db)
+
+
 # ---------------------------------------------------------------------------------------
 # delete_book_by_id
 # ---------------------------------------------------------------------------------------
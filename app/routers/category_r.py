@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Response
 from sqlalchemy.orm import Session
 
 from app.models import store_m
 from app.schemas import store_s
 from app.database.dependb import get_db
-from app.crud import author_category_logic
+from app.crud import author_category_logic, pagination
 from app.core import security
+from app.routers import fast_json, response_cache
 
-router = APIRouter(tags=["Category"])
+router = APIRouter(tags=["Category"], route_class=response_cache.CachedRoute)
 
 
 # ---------------------------------------------------------------------------------------
@@ -21,12 +22,15 @@ router = APIRouter(tags=["Category"])
     status_code=status.HTTP_200_OK,
 )
 def get_all_categories(
+    response: Response,
     db: Session = Depends(get_db),
     latest_first: bool = Query(
         True, description="Get the latest added books (from end to start)"
     ),
     limit: int = 10,
     page: int = 1,
+    cursor: str
+    | None = Query(None, description="Cursor of the next page (seek mode)"),
     active: bool | None = None,
 ):
     """
@@ -38,16 +42,21 @@ def get_all_categories(
     You can use query parameters to get some specific information as:
 
     * latest_first...   True shows list from end to start.
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+    Faster than page on deep pages.
     * active... shows active categories or not
     """
-    return author_category_logic.get_all_items(
+    items = author_category_logic.get_all_items(
         db=db,
         page=page,
         limit=limit,
         item_model=store_m.Category,
         latest_first=latest_first,
+        cursor=cursor,
         active=active,
     )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return fast_json.fast_response(items, store_s.CategoryShortShow, response)
 
 
 # ---------------------------------------------------------------------------------------
@@ -177,14 +186,18 @@ def delete_category_by_id(
     response_model=list[store_s.BookFullShow],
     status_code=status.HTTP_200_OK,
 )
+@response_cache.cached
 def show_all_books_of_category_by_id(
     category_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     latest_first: bool = Query(
         True, description="Get the latest added books (from end to start)"
     ),
     limit: int = 10,
     page: int = 1,
+    cursor: str
+    | None = Query(None, description="Cursor of the next page (seek mode)"),
     active: bool | None = None,
 ):
     """
@@ -195,12 +208,17 @@ def show_all_books_of_category_by_id(
     You can use query parameters to get some specific information as:
 
     * latest_first...   True shows list from end to start.
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+    Faster than page on deep pages.
     """
-    return author_category_logic.show_all_books_of_related_model(
+    items = author_category_logic.show_all_books_of_related_model(
         item_id=category_id,
         db=db,
         page=page,
         limit=limit,
         related_model="category",
         latest_first=latest_first,
+        cursor=cursor,
     )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return fast_json.fast_response(items, store_s.BookFullShow, response)
@@ -0,0 +1,148 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+from app.core import settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency (poetry install -E fast-json)
+    orjson = None
+
+# headers of the endpoint's response which are kept in fast response
+KEPT_HEADERS = ("x-next-cursor",)
+
+# ---------------------------------------------------------------------------------------
+# FastJSONResponse
+# ---------------------------------------------------------------------------------------
+
+
+def default(value):
+    """
+    Encodes values which json libraries don't know.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded by orjson if it is installed.
+    Content must be made of dicts, lists and simple values already.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=default)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=default,
+        ).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------------------
+# compile_serializer
+# ---------------------------------------------------------------------------------------
+
+
+def _to_float(value):
+    return value if value is None else float(value)
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# converters of values which are not stored as type of schema field
+CONVERTERS = {
+    float: _to_float,
+    date: _to_date,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(schema: type[BaseModel]):
+    """
+    Function returns a function which makes a dict from ORM object
+    as schema.from_orm(item).dict() does, but without validation.
+    Use it only for objects loaded from database (valid data).
+    """
+    fields = []
+    for field in schema.__fields__.values():
+        nested = isinstance(field.type_, type) and issubclass(
+            field.type_, BaseModel
+        )
+        if nested:
+            convert = compile_serializer(field.type_)
+        else:
+            convert = CONVERTERS.get(field.type_)
+        if field.shape not in (SHAPE_SINGLETON, SHAPE_LIST):
+            raise ValueError(f"Field {field.name} can't be compiled")
+        fields.append((field.alias, field.name, convert, field.shape))
+
+    def serialize(item):
+        if item is None:
+            return None
+        data = {}
+        for alias, name, convert, shape in fields:
+            value = getattr(item, name)
+            if convert is not None and value is not None:
+                if shape == SHAPE_LIST:
+                    value = [convert(element) for element in value]
+                else:
+                    value = convert(value)
+            data[alias] = value
+        return data
+
+    return serialize
+
+
+# ---------------------------------------------------------------------------------------
+# fast_response
+# ---------------------------------------------------------------------------------------
+
+
+def fast_response(
+    items,
+    schema: type[BaseModel],
+    response: Response = None,
+    status_code: int = status.HTTP_200_OK,
+):
+    """
+    Function returns FastJSONResponse of item or list of items
+    if FAST_JSON is turned on. Otherwise returns items as is, so they
+    are validated by response_model of endpoint.
+    Headers added to response parameter of endpoint are kept.
+    Status code must be the same as status code of endpoint.
+    """
+    if not settings.FAST_JSON:
+        return items
+
+    serialize = compile_serializer(schema)
+    if isinstance(items, list):
+        content = [serialize(item) for item in items]
+    else:
+        content = serialize(items)
+
+    headers = {}
+    if response is not None:
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name in KEPT_HEADERS
+        }
+    return FastJSONResponse(
+        content=content, status_code=status_code, headers=headers
+    )
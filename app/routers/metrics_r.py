@@ -0,0 +1,111 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics, revocation, token_cache
+from app.database import db
+
+router = APIRouter(tags=["Statistics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---------------------------------------------------------------------------------------
+# render_gauges
+# ---------------------------------------------------------------------------------------
+
+
+def render_database_pool():
+    pools = db.get_pool_stats().items()
+    lines = []
+    for name, kind, key, description in (
+        ("db_pool_size", "gauge", "pool_size", "Size of the pool."),
+        (
+            "db_pool_checked_out",
+            "gauge",
+            "checked_out",
+            "Connections in use.",
+        ),
+        ("db_pool_overflow", "gauge", "overflow", "Overflow connections."),
+        (
+            "db_pool_checkouts_total",
+            "counter",
+            "checkouts",
+            "Connections given from pool.",
+        ),
+        (
+            "db_pool_timeouts_total",
+            "counter",
+            "timeouts",
+            "Checkouts failed because pool was exhausted.",
+        ),
+    ):
+        lines += metrics.format_metric(
+            name,
+            kind,
+            description,
+            [({"pool": pool}, stats[key]) for pool, stats in pools],
+        )
+    lines += metrics.format_metric(
+        "db_pool_checkout_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a free connection.",
+        [
+            ({"pool": pool}, stats["checkout_wait_total_ms"] / 1000)
+            for pool, stats in pools
+        ],
+    )
+    return lines
+
+
+def render_auth_caches():
+    token_stats = token_cache.get_stats()
+    revocation_stats = revocation.get_stats()
+    lines = metrics.format_metric(
+        "token_cache_size",
+        "gauge",
+        "Verified access tokens in cache.",
+        [({}, token_stats["size"])],
+    )
+    for key in ("hits", "misses", "evictions"):
+        lines += metrics.format_metric(
+            f"token_cache_{key}_total",
+            "counter",
+            f"Token cache {key}.",
+            [({}, token_stats[key])],
+        )
+    lines += metrics.format_metric(
+        "revocation_filter_added",
+        "gauge",
+        "Revoked tokens in the filter.",
+        [({}, revocation_stats["added"])],
+    )
+    for key in ("checks", "filter_hits", "false_positives"):
+        lines += metrics.format_metric(
+            f"revocation_{key}_total",
+            "counter",
+            f"Revocation {key.replace('_', ' ')}.",
+            [({}, revocation_stats[key])],
+        )
+    return lines
+
+
+# ---------------------------------------------------------------------------------------
+# get_metrics
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """
+    Metrics of the worker which handled the request in Prometheus
+    text format. Async, so it runs in the event loop thread
+    which alone changes request metrics.
+    """
+    lines = metrics.render_http_metrics()
+    lines += render_database_pool()
+    lines += render_auth_caches()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Response
 from sqlalchemy.orm import Session
 from datetime import date
 
 from app.models import order_m
 from app.schemas import user_order_s
 from app.database.dependb import get_db
-from app.crud import author_category_logic, order_logic
+from app.crud import author_category_logic, order_logic, pagination
 from app.core import security
+from app.routers import fast_json
 
 router = APIRouter(tags=["Orders"])
 
@@ -21,11 +22,13 @@ router = APIRouter(tags=["Orders"])
     status_code=status.HTTP_200_OK,
 )
 def get_all_orders(
+    response: Response,
     db: Session = Depends(get_db),
     latest_first: bool = True,
     owner: int | None = None,
     limit: int = 10,
     page: int = 1,
+    cursor: str | None = None,
     date_placed_from: date | None = None,
     date_placed_to: date | None = None,
     total_min: float | None = None,
@@ -44,6 +47,8 @@ def get_all_orders(
 
     You can use query parameters to get some specific information as:
     * latest_first...   True shows list  from end to start
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+    Faster than page on deep pages.
     * owner... shows User orders by his customer_id
     * date_placed_from and date_placed_to...
     shows orders using borders of placed date
@@ -56,7 +61,7 @@ def get_all_orders(
         Date example ('2000-01-01' Year/month/day)
     """
     if security.check_permision(current_user, bottom_perm="staff"):
-        return order_logic.get_all_orders(
+        items = order_logic.get_all_orders(
             db=db,
             page=page,
             limit=limit,
@@ -69,6 +74,11 @@ def get_all_orders(
             complete=complete,
             date_placed_from=date_placed_from,
             date_placed_to=date_placed_to,
+            cursor=cursor,
+        )
+        pagination.set_next_cursor(response=response, items=items, limit=limit)
+        return fast_json.fast_response(
+            items, user_order_s.OrderShortShow, response
         )
 
 
@@ -101,6 +111,8 @@ def create_order(
 
     All entered information (in the list) will add to info described
     above in field OrderItem
+
+    An empty list is refused with 400 "Empty entered data".
     """
     return order_logic.create_item(
         item=order,
@@ -133,11 +145,12 @@ def get_order_by_id(
     """
 
     if security.check_permision(current_user, bottom_perm="staff"):
-        return author_category_logic.get_item_by_id(
+        item = author_category_logic.get_item_by_id(
             item_id=order_id,
             db=db,
             item_model=order_m.Order,
         )
+        return fast_json.fast_response(item, user_order_s.OrderFullShow)
 
 
 # ---------------------------------------------------------------------------------------
@@ -238,9 +251,11 @@ def delete_order_by_id(
     status_code=status.HTTP_202_ACCEPTED,
 )
 def get_all_user_orders(
+    response: Response,
     latest_first: bool = True,
     limit: int = 10,
     page: int = 1,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(security.auth_access_wrapper),
 ):
@@ -250,13 +265,26 @@ def get_all_user_orders(
         Need authentication and DON'T need special permissions.
 
         Only user who created it - can see it.
+
+    You can use query parameters to get some specific information as:
+    * latest_first...   True shows list  from end to start
+    * cursor... value of "X-Next-Cursor" header of the previous page.
+    Faster than page on deep pages.
     """
-    return order_logic.get_all_user_orders(
+    items = order_logic.get_all_user_orders(
         latest_first=latest_first,
         limit=limit,
         page=page,
         db=db,
         current_user=current_user,
+        cursor=cursor,
+    )
+    pagination.set_next_cursor(response=response, items=items, limit=limit)
+    return fast_json.fast_response(
+        items,
+        user_order_s.OrdersForUserShow,
+        response,
+        status_code=status.HTTP_202_ACCEPTED,
     )
 
 
@@ -0,0 +1,139 @@
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from app.core import profiler, security
+from app.database.dependb import get_db
+from app.schemas import stats_s
+
+router = APIRouter(tags=["Statistics"])
+
+
+class ProfileFormat(str, Enum):
+    json = "json"
+    folded = "folded"
+
+
+# ---------------------------------------------------------------------------------------
+# start_profiler
+# ---------------------------------------------------------------------------------------
+
+
+@router.post(
+    "/profiler",
+    status_code=status.HTTP_200_OK,
+)
+def start_profiler(
+    schema: stats_s.ProfilerStart,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Turn profiling on for the next requests of all workers
+    (other workers are told by LISTEN/NOTIFY).
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+
+    Profiled are requests which match the pattern ("METHOD path")
+    or have "X-Profile" header with the returned token.
+    Profiling turns off after the number of requests.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return profiler.enable(db, schema.pattern, schema.requests)
+
+
+# ---------------------------------------------------------------------------------------
+# stop_profiler
+# ---------------------------------------------------------------------------------------
+
+
+@router.delete(
+    "/profiler",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def stop_profiler(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Turn profiling off, saved profiles are kept.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        profiler.disable(db)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# ---------------------------------------------------------------------------------------
+# get_profiles
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/profiler/profiles",
+    status_code=status.HTTP_200_OK,
+)
+def get_profiles(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get the last profiles of all workers, the newest first.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return profiler.get_profiles(db)
+
+
+# ---------------------------------------------------------------------------------------
+# get_profile
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/profiler/profiles/{profile_id}",
+    status_code=status.HTTP_200_OK,
+)
+def get_profile(
+    profile_id: int,
+    profile_format: ProfileFormat = Query(ProfileFormat.json, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Download the profile.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+
+    * json... stacks with samples and statements with time
+    * folded... flame graph input (flamegraph.pl, speedscope)
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        profile = profiler.get_profile(db, profile_id)
+        if profile is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profile not found!",
+            )
+        if profile_format == ProfileFormat.folded:
+            return PlainTextResponse(
+                profiler.folded(profile),
+                headers={
+                    "Content-Disposition": (
+                        f'attachment; filename="profile-{profile_id}.folded"'
+                    )
+                },
+            )
+        return profile
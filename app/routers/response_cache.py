@@ -0,0 +1,216 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core import settings
+from app.crud import catalog_cache
+
+# headers of the response which are kept with cached body
+CACHED_HEADERS = ("content-type", "x-next-cursor")
+
+# request key > {"body", "etag", "headers", "expire"}
+# least recently used response is the first one
+_responses = OrderedDict()
+# number of invalidations, a response made before invalidation is not saved
+_generation = 0
+_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "not_modified": 0,
+    "invalidations": 0,
+}
+
+# ---------------------------------------------------------------------------------------
+# get_stats
+# ---------------------------------------------------------------------------------------
+
+
+def get_stats():
+    """
+    Function returns metrics of the response cache:
+    * max_size, ttl_seconds... settings of the cache
+    * size... responses in cache right now
+    * hits... responses sent from memory
+    * misses... responses made by endpoint
+    * not_modified... 304 responses (client has the same ETag)
+    * invalidations... drops of all responses after catalog changes
+    """
+    with _lock:
+        return {
+            "max_size": settings.RESPONSE_CACHE_SIZE,
+            "ttl_seconds": settings.RESPONSE_CACHE_TTL,
+            "size": len(_responses),
+            **_stats,
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# invalidate
+# ---------------------------------------------------------------------------------------
+
+
+def invalidate(table_name: str = None):
+    """
+    Function drops all cached responses.
+    Every cached response can show books, authors and categories,
+    so a change of any of them drops everything.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+        _responses.clear()
+        _stats["invalidations"] += 1
+
+
+# changes made by this and other workers
+catalog_cache.subscribe(invalidate)
+
+# ---------------------------------------------------------------------------------------
+# cache_key
+# ---------------------------------------------------------------------------------------
+
+
+def cache_key(request: Request) -> str:
+    """
+    Function returns key of the response: path and sorted query params,
+    so "?limit=5&page=2" and "?page=2&limit=5" share one response.
+    """
+    params = sorted(request.query_params.multi_items())
+    query = "&".join(f"{key}={value}" for key, value in params)
+    return f"{request.url.path}?{query}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Function checks If-None-Match header of the request.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # weak comparison, "W/" prefix is ignored
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+def cache_control() -> str:
+    if settings.RESPONSE_CACHE_MAX_AGE > 0:
+        return f"public, max-age={settings.RESPONSE_CACHE_MAX_AGE}"
+    return "public, no-cache"
+
+
+# ---------------------------------------------------------------------------------------
+# get_response / add_response
+# ---------------------------------------------------------------------------------------
+
+
+def get_response(key: str):
+    """
+    Function returns cached response or None if it's missing or expired.
+    """
+    with _lock:
+        cached = _responses.get(key)
+        if cached is None or cached["expire"] <= time.monotonic():
+            if cached is not None:
+                del _responses[key]
+            _stats["misses"] += 1
+            return None
+        _responses.move_to_end(key)
+        _stats["hits"] += 1
+        return cached
+
+
+def add_response(key: str, response: Response, generation: int):
+    """
+    Function puts body and headers of the response into cache.
+    Returns cached response.
+    """
+    body = response.body
+    cached = {
+        "body": body,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "headers": {
+            name: value
+            for name, value in response.headers.items()
+            if name in CACHED_HEADERS
+        },
+        "expire": time.monotonic() + settings.RESPONSE_CACHE_TTL,
+    }
+    if settings.RESPONSE_CACHE_SIZE <= 0:
+        return cached
+    with _lock:
+        # catalog was changed while response was made
+        if generation != _generation:
+            return cached
+        _responses[key] = cached
+        _responses.move_to_end(key)
+        while len(_responses) > settings.RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+    return cached
+
+
+# ---------------------------------------------------------------------------------------
+# cached
+# ---------------------------------------------------------------------------------------
+
+
+def cached(endpoint):
+    """
+    Decorator to mark public GET endpoint which response can be cached.
+    Put it under the router decorator. Works with CachedRoute only.
+    """
+    endpoint.response_cache = True
+    return endpoint
+
+
+# ---------------------------------------------------------------------------------------
+# CachedRoute
+# ---------------------------------------------------------------------------------------
+
+
+class CachedRoute(APIRoute):
+    """
+    Route which sends responses of endpoints marked by "cached"
+    from memory with strong ETag and Cache-Control headers.
+    If client already has the response (If-None-Match) returns 304.
+    Cached responses are sent without dependencies (no database).
+    """
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+        if not getattr(self.endpoint, "response_cache", False):
+            return route_handler
+
+        async def cached_route_handler(request: Request) -> Response:
+            if not settings.RESPONSE_CACHE or request.method != "GET":
+                return await route_handler(request)
+
+            key = cache_key(request)
+            cached_response = get_response(key)
+            if cached_response is None:
+                generation = _generation
+                response = await route_handler(request)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached_response = add_response(key, response, generation)
+
+            headers = {
+                "ETag": cached_response["etag"],
+                "Cache-Control": cache_control(),
+            }
+            if etag_matches(request, cached_response["etag"]):
+                with _lock:
+                    _stats["not_modified"] += 1
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
+            return Response(
+                content=cached_response["body"],
+                headers={**cached_response["headers"], **headers},
+            )
+
+        return cached_route_handler
@@ -0,0 +1,185 @@
+from fastapi import APIRouter, Depends, status
+
+from app.core import security, password_pool, token_cache, revocation
+from app.crud import catalog_cache
+from app.database import db, query_stats
+from app.routers import response_cache
+
+router = APIRouter(tags=["Statistics"])
+
+# ---------------------------------------------------------------------------------------
+# get_database_pool_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/database-pool",
+    status_code=status.HTTP_200_OK,
+)
+def get_database_pool_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get metrics of database connection pools of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+
+    * pool_size, checked_in, checked_out, overflow... current state
+    * checkouts... number of connections given from pool
+    * checkout_wait_avg_ms, checkout_wait_max_ms... time of waiting
+    for a free connection
+    * timeouts... checkouts failed because pool was exhausted
+    * overflow_checkouts, overflow_max... usage of overflow connections
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return db.get_pool_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_password_pool_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/password-pool",
+    status_code=status.HTTP_200_OK,
+)
+def get_password_pool_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get metrics of password hashing pool of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return password_pool.get_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_token_cache_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/token-cache",
+    status_code=status.HTTP_200_OK,
+)
+def get_token_cache_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get hit/miss metrics of verified access token cache of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return token_cache.get_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_revocation_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/revocation",
+    status_code=status.HTTP_200_OK,
+)
+def get_revocation_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get metrics of revoked tokens filter of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return revocation.get_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_catalog_cache_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/catalog-cache",
+    status_code=status.HTTP_200_OK,
+)
+def get_catalog_cache_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get metrics of categories and authors cache of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return catalog_cache.get_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_response_cache_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/response-cache",
+    status_code=status.HTTP_200_OK,
+)
+def get_response_cache_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get metrics of public book responses cache of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return response_cache.get_stats()
+
+
+# ---------------------------------------------------------------------------------------
+# get_query_stats
+# ---------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/stats/queries",
+    status_code=status.HTTP_200_OK,
+)
+def get_query_stats(
+    current_user: dict = Depends(security.auth_access_wrapper),
+):
+    """
+    Get number and time of database queries of the worker
+    which handled the request.
+
+        Need authentication and special permissions.
+
+        Only a user who has role='admin' can get access.
+
+    Queries of one request are sent in its Server-Timing header,
+    queries slower than SLOW_QUERY_MS are logged with endpoint name.
+    """
+    if security.check_permision(current_user, bottom_perm="admin"):
+        return query_stats.get_stats()
@@ -36,6 +36,7 @@ class TokenData(BaseModel):
     id: int | None = None
     email: str | None = None
     role: str | None = None
+    jti: str | None = None
 
 
 # ---------------------------------------------------------------------------------------
@@ -84,3 +85,23 @@ class RefreshedAccessToken(BaseModel):
                 "token_type": "bearer",
             }
         }
+
+
+# ---------------------------------------------------------------------------------------
+# LogoutSchema
+# ---------------------------------------------------------------------------------------
+
+
+class LogoutSchema(BaseModel):
+    """
+    Used for logout endpoint
+    """
+
+    refresh_token: str | None = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "refresh_token": "very large string of different characters",
+            }
+        }
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+# ---------------------------------------------------------------------------------------
+# ProfilerStart
+# ---------------------------------------------------------------------------------------
+
+
+class ProfilerStart(BaseModel):
+    """
+    Used to turn request profiling on
+    """
+
+    # "METHOD path" shell pattern, None = only requests with the token
+    pattern: str | None
+    # profiling turns off after this number of requests
+    requests: int = Field(10, gt=0, le=1000)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pattern": "PUT /api/v1/orders/my/*",
+                "requests": "10",
+            }
+        }
@@ -152,6 +152,55 @@ class BookChange(BaseModel):
         }
 
 
+# ---------------------------------------------------------------------------------------
+# BookBulkUpdate
+# ---------------------------------------------------------------------------------------
+
+
+class BookBulkFilter(BaseModel):
+    """
+    Used to choose books for bulk update
+    """
+
+    ids: list[int] | None
+    author_id: int | None
+    category_id: int | None
+    is_active: bool | None
+
+
+class BookBulkChange(BaseModel):
+    """
+    Used to set the same values to many books
+    """
+
+    price: float | None
+    description: str | None
+    year_of_publication: int | None
+    is_active: bool | None
+    author_id: int | None
+    category_id: int | None
+
+
+class BookBulkUpdate(BaseModel):
+    """
+    Used to change many books at once
+    """
+
+    where: BookBulkFilter
+    values: BookBulkChange = BookBulkChange()
+    # percentage price change, -10 = 10% cheaper
+    price_change_percent: float | None = Field(None, gt=-100)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "where": {"category_id": "1", "is_active": "True"},
+                "values": {},
+                "price_change_percent": "-15",
+            }
+        }
+
+
 # ---------------------------------------------------------------------------------------
 # CategoryShortShow
 # ---------------------------------------------------------------------------------------
@@ -365,3 +414,80 @@ class BookFullShow(BaseModel):
                 },
             }
         }
+
+
+# ---------------------------------------------------------------------------------------
+# BookSearchShow
+# ---------------------------------------------------------------------------------------
+
+
+class BookSearchShow(BookFullShow):
+    """
+    Used to show found book with rank and highlighted matches
+    """
+
+    rank: float
+    name_highlight: str
+    description_highlight: str
+
+    class Config:
+        orm_mode = True
+        schema_extra = {
+            "example": {
+                "id": "123",
+                "name": "Example Book",
+                "price": "100",
+                "description": "Any your description about a book",
+                "year_of_publication": "2022",
+                "is_active": "True",
+                "author": {
+                    "id": "123",
+                    "name": "Example Author",
+                },
+                "category": {
+                    "id": "123",
+                    "name": "Example category",
+                },
+                "rank": "0.1",
+                "name_highlight": "<b>Example</b> Book",
+                "description_highlight": "Any your description about a book",
+            }
+        }
+
+
+# ---------------------------------------------------------------------------------------
+# BookImportError
+# ---------------------------------------------------------------------------------------
+
+
+class BookImportError(BaseModel):
+    """
+    Used to show why a row of bulk import was not imported
+    """
+
+    row: int
+    detail: str
+
+
+# ---------------------------------------------------------------------------------------
+# BookImportResult
+# ---------------------------------------------------------------------------------------
+
+
+class BookImportResult(BaseModel):
+    """
+    Used to show result of bulk import of books
+    """
+
+    imported: int
+    errors: list[BookImportError] = []
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "imported": 2,
+                "errors": [
+                    {"row": 3, "detail": "Book with this name already exists"}
+                ],
+            }
+        }
@@ -0,0 +1,138 @@
+"""
+Measures cold start of the application: import time and worker boot time.
+
+* import... time of "import app.main" in a fresh interpreter
+* boot... time from spawning a worker process until it answers
+the first request (uvicorn by default, or gunicorn with uvicorn workers)
+
+For example:
+    python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --server gunicorn
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_CODE = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+SERVERS = {
+    "uvicorn": [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        "{port}",
+        "--workers",
+        "1",
+    ],
+    "gunicorn": [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "app.main:app",
+        "--bind",
+        "127.0.0.1:{port}",
+        "--workers",
+        "1",
+        "--worker-class",
+        "uvicorn.workers.UvicornWorker",
+    ],
+}
+
+# ---------------------------------------------------------------------------------------
+# measure_import
+# ---------------------------------------------------------------------------------------
+
+
+def measure_import() -> float:
+    """
+    Returns seconds spent on "import app.main" in a new interpreter.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CODE],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------------------------
+# measure_boot
+# ---------------------------------------------------------------------------------------
+
+
+def wait_first_response(url: str, process, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited before answering")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                response.read()
+                return
+        except urllib.error.HTTPError:
+            # any answer of the application is fine
+            return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"Server did not answer in {timeout} seconds")
+
+
+def measure_boot(server: str, port: int, url: str, timeout: float) -> float:
+    """
+    Returns seconds from spawning a server until its first response.
+    """
+    command = [part.format(port=port) for part in SERVERS[server]]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_first_response(url, process, timeout)
+        return time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report(name: str, results: list):
+    print(
+        f"{name:>7}: median {statistics.median(results) * 1000:8.1f} ms, "
+        f"min {min(results) * 1000:8.1f} ms, "
+        f"max {max(results) * 1000:8.1f} ms ({len(results)} runs)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", choices=SERVERS, default="uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/docs")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--skip-boot", action="store_true")
+    args = parser.parse_args()
+
+    report("import", [measure_import() for _ in range(args.runs)])
+    if not args.skip_boot:
+        url = f"http://127.0.0.1:{args.port}{args.path}"
+        report(
+            "boot",
+            [
+                measure_boot(args.server, args.port, url, args.timeout)
+                for _ in range(args.runs)
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
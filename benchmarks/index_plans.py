@@ -0,0 +1,248 @@
+"""
+Shows query plans and latency of list endpoints with and without indexes.
+
+Every case runs the real crud function, its SQL is captured and measured
+by EXPLAIN ANALYZE twice: with current indexes and after dropping the
+access path indexes inside a transaction which is rolled back at the end
+(indexes are not really removed, but tables are locked while it runs).
+
+Use a separate database, for example:
+    python benchmarks/index_plans.py --generate --books 1000000
+    python benchmarks/index_plans.py --plans
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import event, text
+
+from app.crud import book_logic, order_logic
+from app.database.db import SessionLocal, engine
+
+# indexes added for list access paths (see alembic revision e4c59ed96cee)
+ACCESS_PATH_INDEXES = [
+    "ix_books_author_id_is_active_id",
+    "ix_books_category_id_is_active_id",
+    "ix_books_active_id",
+    "ix_orders_customer_id_id",
+    "ix_orders_not_complete_id",
+    "ix_orders_date_placed",
+    "ix_orders_delivery_date",
+    "ix_orders_total_price",
+    "ix_order_items_order_id",
+    "ix_order_items_book_id",
+]
+
+# ---------------------------------------------------------------------------------------
+# generate_dataset
+# ---------------------------------------------------------------------------------------
+
+
+def generate_dataset(connection, books: int, orders: int):
+    """
+    Fills database with synthetic rows by generate_series (fast).
+    """
+    run = int(time.time())
+    params = {"run": run, "books": books, "orders": orders}
+    statements = [
+        """
+        INSERT INTO authors (name, email)
+        SELECT 'Author ' || :run || '-' || i, 'author' || i || '@example.com'
+        FROM generate_series(1, 1000) AS i
+        """,
+        """
+        INSERT INTO categories (name, is_active)
+        SELECT 'Category ' || :run || '-' || i, i % 10 <> 0
+        FROM generate_series(1, 100) AS i
+        """,
+        """
+        INSERT INTO users (fullname, email, password, role)
+        SELECT 'User ' || i, 'user' || :run || '-' || i || '@example.com',
+            '', 'user'
+        FROM generate_series(1, 10000) AS i
+        """,
+        """
+        INSERT INTO books (name, price, description, year_of_publication,
+            is_active, author_id, category_id)
+        SELECT 'Book ' || :run || '-' || i, round((random() * 50)::numeric, 2),
+            'Description of book ' || i, 1900 + i % 123, i % 20 <> 0,
+            (SELECT max(id) FROM authors) - i % 1000,
+            (SELECT max(id) FROM categories) - i % 100
+        FROM generate_series(1, :books) AS i
+        """,
+        """
+        INSERT INTO orders (date_placed, customer_id, total_price, paid,
+            delivery_date, complete)
+        SELECT now() - random() * interval '730 days',
+            (SELECT max(id) FROM users) - i % 10000,
+            round((random() * 200)::numeric, 2), i % 3 = 0,
+            CASE WHEN i % 4 = 0 THEN NULL
+                ELSE current_date - (i % 700) END,
+            i % 10 <> 0
+        FROM generate_series(1, :orders) AS i
+        """,
+        """
+        INSERT INTO order_items (order_id, book_id, quantity)
+        SELECT o.id, (SELECT max(id) FROM books) - (o.id * n) % :books, n
+        FROM orders AS o, generate_series(1, 2) AS n
+        WHERE o.id > (SELECT max(order_id) FROM order_items)
+            OR NOT EXISTS (SELECT 1 FROM order_items)
+        """,
+        "ANALYZE",
+    ]
+    for statement in statements:
+        connection.execute(text(statement), params)
+
+
+# ---------------------------------------------------------------------------------------
+# cases
+# ---------------------------------------------------------------------------------------
+
+
+def cases(db):
+    """
+    Returns list endpoints calls which should be measured.
+    """
+    some_book = db.execute(text("SELECT author_id, category_id FROM books"))
+    author_id, category_id = some_book.first()
+    customer_id = db.execute(text("SELECT customer_id FROM orders")).scalar()
+
+    books = dict(
+        db=db,
+        limit=10,
+        page=1,
+        reverse_sort=True,
+        book_active=True,
+        search_by_autor_id=None,
+        search_by_category_id=None,
+        categories_active=True,
+    )
+    orders = dict(
+        db=db,
+        limit=10,
+        page=1,
+        latest_first=True,
+        total_min=None,
+        total_max=None,
+        owner=None,
+        delivery_date_from=None,
+        delivery_date_to=None,
+        complete=None,
+        date_placed_from=None,
+        date_placed_to=None,
+    )
+    week_ago = date.today() - timedelta(days=7)
+    return {
+        "books (default)": lambda: book_logic.get_all_book(**books),
+        "books by author": lambda: book_logic.get_all_book(
+            **{**books, "search_by_autor_id": author_id}
+        ),
+        "books by category": lambda: book_logic.get_all_book(
+            **{**books, "search_by_category_id": category_id}
+        ),
+        "orders of customer": lambda: order_logic.get_all_orders(
+            **{**orders, "owner": customer_id}
+        ),
+        "not complete orders": lambda: order_logic.get_all_orders(
+            **{**orders, "complete": False}
+        ),
+        "orders placed last week": lambda: order_logic.get_all_orders(
+            **{**orders, "date_placed_from": week_ago}
+        ),
+        "orders delivered last week": lambda: order_logic.get_all_orders(
+            **{**orders, "delivery_date_from": week_ago}
+        ),
+        "orders by total price": lambda: order_logic.get_all_orders(
+            **{**orders, "total_min": 199}
+        ),
+        "my orders with items": lambda: order_logic.get_all_user_orders(
+            latest_first=True,
+            limit=10,
+            page=1,
+            db=db,
+            current_user=SimpleNamespace(id=customer_id),
+        ),
+    }
+
+
+# ---------------------------------------------------------------------------------------
+# measure
+# ---------------------------------------------------------------------------------------
+
+
+def capture_statements(db, run):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    db.rollback()
+    return statements
+
+
+def explain(connection, statements):
+    """
+    Returns plans and total execution time (ms) of statements.
+    """
+    plans = []
+    total_ms = 0.0
+    for statement, parameters in statements:
+        rows = connection.exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+        ).all()
+        plan = "\n".join(row[0] for row in rows)
+        total_ms += float(plan.rsplit("Execution Time: ", 1)[1].split()[0])
+        plans.append(plan)
+    return plans, total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--generate", action="store_true")
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--plans", action="store_true", help="print plans")
+    args = parser.parse_args()
+
+    if args.generate:
+        with engine.begin() as connection:
+            generate_dataset(connection, args.books, args.orders)
+
+    db = SessionLocal()
+    statements = {
+        name: capture_statements(db, run) for name, run in cases(db).items()
+    }
+    db.close()
+
+    results = {}
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        for name, case_statements in statements.items():
+            results[name] = {"after": explain(connection, case_statements)}
+        for index in ACCESS_PATH_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+        for name, case_statements in statements.items():
+            results[name]["before"] = explain(connection, case_statements)
+        transaction.rollback()
+
+    print(f"{'case':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name, result in results.items():
+        before_ms = result["before"][1]
+        after_ms = result["after"][1]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{name:<28}{before_ms:>12.2f}{after_ms:>12.2f}{speedup:>9.1f}x")
+        if args.plans:
+            for mode in ("before", "after"):
+                print(f"\n--- {name}: {mode} ---")
+                print("\n\n".join(result[mode][0]))
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+"""
+Load test of the API with realistic mixes of requests.
+
+Virtual users send requests of the mix one after another for
+the duration (each user has its own keep-alive connection).
+Mix parts are:
+* browse... anonymous catalog: book lists, books, books of
+author/category and search
+* login... POST /login of generated users (bcrypt)
+* order... a logged in user places an order
+* staff... staff searches orders (needs --staff-email/--staff-password)
+
+Latency percentiles and requests/sec per endpoint are printed and saved
+as JSON (with git commit), --compare shows change against older results.
+Database should be filled by app.datagen only (users and books are
+picked by generated ids). For example:
+    python -m benchmarks.load_test --generate --scale 1 --server uvicorn
+    python -m benchmarks.load_test --mix browse=90,order=10 --users 100
+    python -m benchmarks.load_test --compare benchmarks/results/old.json
+"""
+import argparse
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from pathlib import Path
+
+from app.datagen import BASE_ROWS, USER_PASSWORD, WORDS
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = "browse=70,login=5,order=20,staff=5"
+SERVERS = {
+    "uvicorn": [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        "{port}",
+        "--workers",
+        "{workers}",
+    ],
+    "gunicorn": [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "app.main:app",
+        "--bind",
+        "127.0.0.1:{port}",
+        "--workers",
+        "{workers}",
+        "--worker-class",
+        "uvicorn.workers.UvicornWorker",
+    ],
+}
+
+# ---------------------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------------------
+
+
+class Client:
+    """
+    Keep-alive connection of one virtual user which records latency
+    of every request by endpoint name.
+    """
+
+    def __init__(self, base_url: str, prefix: str, results: dict):
+        url = urllib.parse.urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.prefix = prefix
+        self.results = results
+        self.connection = None
+        # token sent with requests, tokens of logged in user and staff
+        self.token = None
+        self.user_token = None
+        self.staff_token = None
+
+    def request(self, name: str, method: str, path: str, body=None):
+        headers = {"Content-Type": "application/json"}
+        if self.token is not None:
+            headers["Authorization"] = f"Bearer {self.token}"
+        data = None if body is None else json.dumps(body).encode()
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+            self.connection.request(
+                method, self.prefix + path, body=data, headers=headers
+            )
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            content, status = b"", 0
+        elapsed = time.perf_counter() - start
+
+        latencies, errors = self.results.setdefault(name, ([], [0]))
+        latencies.append(elapsed)
+        if not 200 <= status < 400:
+            errors[0] += 1
+            return None
+        return json.loads(content) if content else None
+
+    def login(self, name: str, email: str, password: str):
+        self.token = None
+        tokens = self.request(
+            name, "POST", "/login", {"email": email, "password": password}
+        )
+        if tokens is not None:
+            self.token = tokens["access_token"]
+        return self.token
+
+
+# ---------------------------------------------------------------------------------------
+# scenarios
+# ---------------------------------------------------------------------------------------
+
+
+def browse(client: Client, rng, counts: dict, options):
+    client.token = None
+    step = rng.random()
+    if step < 0.3:
+        page = rng.randint(1, 50)
+        client.request("GET /books", "GET", f"/books?limit=20&page={page}")
+    elif step < 0.6:
+        book_id = rng.randint(1, counts["books"])
+        client.request("GET /books/{book_id}", "GET", f"/books/{book_id}")
+    elif step < 0.75:
+        author_id = rng.randint(1, counts["authors"])
+        client.request(
+            "GET /author-books/{author_id}",
+            "GET",
+            f"/author-books/{author_id}?limit=20",
+        )
+    elif step < 0.9:
+        category_id = rng.randint(1, counts["categories"])
+        client.request(
+            "GET /category-books/{category_id}",
+            "GET",
+            f"/category-books/{category_id}?limit=20",
+        )
+    else:
+        query = urllib.parse.quote(rng.choice(WORDS))
+        client.request("GET /books/search", "GET", f"/books/search?q={query}")
+
+
+def login(client: Client, rng, counts: dict, options):
+    user_id = rng.randint(1, counts["users"])
+    client.login("POST /login", f"user{user_id}@example.com", USER_PASSWORD)
+    client.token = None
+
+
+def order(client: Client, rng, counts: dict, options):
+    # the same user places orders until its token expires
+    if client.user_token is None:
+        user_id = rng.randint(1, counts["users"])
+        client.user_token = client.login(
+            "POST /login", f"user{user_id}@example.com", USER_PASSWORD
+        )
+        if client.user_token is None:
+            return
+    client.token = client.user_token
+    items = [
+        {"book_id": rng.randint(1, counts["books"]), "quantity": 1}
+        for _ in range(rng.randint(1, 3))
+    ]
+    if client.request("POST /orders", "POST", "/orders", items) is None:
+        client.user_token = None
+    client.token = None
+
+
+def staff(client: Client, rng, counts: dict, options):
+    if client.staff_token is None:
+        client.staff_token = client.login(
+            "POST /login (staff)",
+            options.staff_email,
+            options.staff_password,
+        )
+        if client.staff_token is None:
+            return
+    client.token = client.staff_token
+    date_from = f"2023-{rng.randint(1, 12):02d}-01"
+    total_min = rng.randint(0, 100)
+    client.request(
+        "GET /orders (search)",
+        "GET",
+        f"/orders?limit=20&date_placed_from={date_from}"
+        f"&total_min={total_min}&complete=false",
+    )
+    client.token = None
+
+
+SCENARIOS = {
+    "browse": browse,
+    "login": login,
+    "order": order,
+    "staff": staff,
+}
+
+# ---------------------------------------------------------------------------------------
+# run
+# ---------------------------------------------------------------------------------------
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown part of mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def virtual_user(number: int, stop_at: float, weights: dict, options):
+    """
+    Sends requests of the mix until stop_at, returns its results:
+    endpoint name > (latencies, [errors]).
+    """
+    rng = random.Random(f"{options.seed}-{number}")
+    results = {}
+    client = Client(options.base_url, options.prefix, results)
+    names, parts = list(weights), list(weights.values())
+    while time.perf_counter() < stop_at:
+        scenario = rng.choices(names, parts)[0]
+        SCENARIOS[scenario](client, rng, options.counts, options)
+    return results
+
+
+def run(weights: dict, options):
+    """
+    Runs virtual users in threads and merges their results.
+    """
+    stop_at = time.perf_counter() + options.duration
+    results = [None] * options.users
+
+    def target(number):
+        results[number] = virtual_user(number, stop_at, weights, options)
+
+    threads = [
+        threading.Thread(target=target, args=(number,))
+        for number in range(options.users)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    merged = {}
+    for user_results in results:
+        for name, (latencies, errors) in user_results.items():
+            all_latencies, all_errors = merged.setdefault(name, ([], [0]))
+            all_latencies.extend(latencies)
+            all_errors[0] += errors[0]
+    return merged, elapsed
+
+
+# ---------------------------------------------------------------------------------------
+# report
+# ---------------------------------------------------------------------------------------
+
+
+def percentile(values: list, percent: float) -> float:
+    # nearest-rank percentile of sorted values
+    index = max(round(percent / 100 * len(values) + 0.5) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies) or [0.0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def print_table(endpoints: dict, baseline: dict | None = None):
+    print(
+        f"{'endpoint':<36}{'requests':>9}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for name, stats in sorted(endpoints.items()):
+        print(
+            f"{name:<36}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['rps']:>9.1f}{stats['p50_ms']:>9.1f}"
+            f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            changes = [
+                f"{key} {(stats[key] - old[key]) / old[key] * 100:+.1f}%"
+                for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+                if old[key]
+            ]
+            print(f"{'  vs baseline':<36}{', '.join(changes)}")
+
+
+# ---------------------------------------------------------------------------------------
+# server
+# ---------------------------------------------------------------------------------------
+
+
+def start_server(options):
+    command = [
+        part.format(port=options.port, workers=options.workers)
+        for part in SERVERS[options.server]
+    ]
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"{options.base_url}{options.prefix}/categories?limit=1"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("Server exited before answering")
+        try:
+            connection = http.client.HTTPConnection(
+                "127.0.0.1", options.port, timeout=1
+            )
+            connection.request("GET", urllib.parse.urlsplit(url).path)
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("Server did not answer in 60 seconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", help="default http://127.0.0.1:PORT")
+    parser.add_argument("--prefix", default="/api/v1")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument(
+        "--generate", action="store_true", help="run app.datagen first"
+    )
+    parser.add_argument(
+        "--server", choices=SERVERS, help="boot app.main:app for the test"
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--staff-email")
+    parser.add_argument("--staff-password")
+    parser.add_argument("--output", help="JSON file of results")
+    parser.add_argument("--compare", help="JSON file of older results")
+    options = parser.parse_args()
+    options.base_url = options.base_url or f"http://127.0.0.1:{options.port}"
+    options.counts = {
+        table: max(int(rows * options.scale), 1)
+        for table, rows in BASE_ROWS.items()
+    }
+
+    weights = parse_mix(options.mix)
+    if "staff" in weights and not options.staff_email:
+        print("staff part is skipped: --staff-email is not given")
+        del weights["staff"]
+
+    if options.generate:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "app.datagen",
+                "--scale",
+                str(options.scale),
+                "--seed",
+                str(options.seed),
+            ],
+            check=True,
+        )
+
+    process = start_server(options) if options.server else None
+    try:
+        if options.warmup > 0:
+            duration, options.duration = options.duration, options.warmup
+            run(weights, options)
+            options.duration = duration
+        results, elapsed = run(weights, options)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    endpoints = {
+        name: summarize(latencies, errors[0], elapsed)
+        for name, (latencies, errors) in results.items()
+    }
+    all_latencies = [
+        latency for latencies, _ in results.values() for latency in latencies
+    ]
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "mix": weights,
+            "users": options.users,
+            "duration": options.duration,
+            "scale": options.scale,
+            "server": options.server,
+            "workers": options.workers,
+        },
+        "total": summarize(
+            all_latencies,
+            sum(errors[0] for _, errors in results.values()),
+            elapsed,
+        ),
+        "endpoints": endpoints,
+    }
+
+    baseline = None
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+        print(f"baseline: {baseline['commit']} {baseline['started_at']}")
+    print_table(
+        {**endpoints, "TOTAL": report["total"]},
+        baseline and {**baseline["endpoints"], "TOTAL": baseline["total"]},
+    )
+
+    output = options.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"load-{report['commit']}-{stamp}.json"
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results: {output}")
+
+
+if __name__ == "__main__":
+    main()
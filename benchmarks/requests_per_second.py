@@ -0,0 +1,67 @@
+"""
+Measures requests/sec of the sync and async variants of one endpoint.
+
+Launch the server with ASYNC_DATABASE=True, for example:
+    ASYNC_DATABASE=True uvicorn app.main:app --workers 1
+and then:
+    python benchmarks/requests_per_second.py --path /books?limit=100
+"""
+import argparse
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def send_request(url: str, headers: dict):
+    request = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        return response.status
+
+
+def measure(url: str, number: int, concurrency: int, headers: dict):
+    """
+    Sends number of requests to the url using concurrency threads.
+    Returns requests per second and number of failed requests.
+    """
+    # warm up connections and caches
+    send_request(url, headers)
+
+    failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(send_request, url, headers) for _ in range(number)
+        ]
+        for future in futures:
+            if future.exception() is not None:
+                failed += 1
+    elapsed = time.perf_counter() - start
+    return number / elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--prefix", default="/api/v1")
+    parser.add_argument("--path", default="/books")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--token", help="access token for private routes")
+    args = parser.parse_args()
+
+    headers = {}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    modes = {
+        "sync": f"{args.base_url}{args.prefix}{args.path}",
+        "async": f"{args.base_url}{args.prefix}/async{args.path}",
+    }
+    for mode, url in modes.items():
+        rps, failed = measure(url, args.requests, args.concurrency, headers)
+        print(f"{mode:>5}: {rps:8.1f} requests/sec ({failed} failed) {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares serialization cost of one page of books (per item).
+
+* response_model... what FastAPI does: BookFullShow.from_orm for each
+book, jsonable_encoder and stdlib json
+* fast_json... compiled serializer and json (or orjson if installed)
+
+Books are built in memory, database is not needed:
+    python benchmarks/serialization.py --books 100
+"""
+import argparse
+import timeit
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import store_m
+from app.routers import fast_json
+from app.schemas import store_s
+
+
+def make_books(number: int):
+    author = store_m.Author(id=1, name="Author", email="author@example.com")
+    category = store_m.Category(id=1, name="Category", is_active=True)
+    return [
+        store_m.Book(
+            id=i,
+            name=f"Book {i}",
+            price=Decimal("19.99"),
+            description=f"Description of book {i} " * 5,
+            year_of_publication=2000 + i % 22,
+            is_active=True,
+            author=author,
+            category=category,
+        )
+        for i in range(1, number + 1)
+    ]
+
+
+def response_model(books):
+    items = [store_s.BookFullShow.from_orm(book) for book in books]
+    return JSONResponse(content=jsonable_encoder(items)).body
+
+
+def fast(books):
+    serialize = fast_json.compile_serializer(store_s.BookFullShow)
+    content = [serialize(book) for book in books]
+    return fast_json.FastJSONResponse(content=content).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    books = make_books(args.books)
+    encoder = "orjson" if fast_json.orjson is not None else "json"
+    cases = {
+        "response_model": response_model,
+        f"fast_json ({encoder})": fast,
+    }
+    results = {}
+    for name, serialize in cases.items():
+        serialize(books)  # warm up
+        seconds = min(
+            timeit.repeat(
+                lambda: serialize(books), number=args.repeat, repeat=5
+            )
+        )
+        results[name] = seconds / args.repeat / args.books * 1e6
+
+    print(f"{args.books} books per page")
+    baseline = results["response_model"]
+    for name, per_item in results.items():
+        print(
+            f"{name:>22}: {per_item:8.2f} us per book "
+            f"({baseline / per_item:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
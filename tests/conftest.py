@@ -1,9 +1,19 @@
+import hashlib
+import os
+from decimal import Decimal
 import pytest
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Generator
 
 # from starlette.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
@@ -12,6 +22,8 @@ from app.main import app
 
 from app.database.dependb import get_db
 from app.core import settings
+from app.crud import catalog_cache
+from app.models import store_m, user_m
 
 
 prg_user = settings.TEST_POSTGRES_USER
@@ -19,27 +31,211 @@ prg_pswrd = settings.TEST_POSTGRES_PASSWORD
 prg_server = settings.TEST_POSTGRES_SERVER
 prg_db = settings.TEST_POSTGRES_DB
 
-SQLALCHEMY_DATABASE_URI = (
-    f"postgresql://{prg_user}:{prg_pswrd}@{prg_server}/{prg_db}"
+# database of tests:
+# * postgres... TEST_POSTGRES_DB, schema is created once per session
+# * template... a copy of template database (schema is created only
+# when models were changed), one database per pytest-xdist worker
+# * sqlite... in-memory database, tests marked "postgres" are skipped
+TEST_DATABASES = ("postgres", "template", "sqlite")
+
+TestSession = sessionmaker(autocommit=False, autoflush=False)
+
+# sequences start from 1 in each test, as if tables were new
+RESET_SEQUENCES = text(
+    "SELECT setval(c.oid::regclass, 1, false) FROM pg_class c "
+    "WHERE c.relkind = 'S' AND c.relnamespace = 'public'::regnamespace"
 )
 
-test_engine = create_engine(SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 
-TestSession = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+def database_uri(name: str) -> str:
+    return f"postgresql://{prg_user}:{prg_pswrd}@{prg_server}/{name}"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--test-db",
+        choices=TEST_DATABASES,
+        default=os.environ.get("TEST_DATABASE", "postgres"),
+        help="database of tests (TEST_DATABASE environment variable)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "postgres: test needs postgres (skipped in sqlite mode)"
+    )
+    if config.getoption("--test-db") == "sqlite":
+        # there is no postgres for startup check and LISTEN/NOTIFY
+        settings.DB_STARTUP_CHECK = False
+        settings.CATALOG_CACHE_LISTEN = False
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--test-db") != "sqlite":
+        return
+    skip = pytest.mark.skip(reason="needs postgres")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+# ---------------------------------------------------------------------------------------
+# sqlite
+# ---------------------------------------------------------------------------------------
+
+
+@compiles(TSVECTOR, "sqlite")
+def compile_tsvector_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(CreateColumn, "sqlite")
+def compile_create_column_sqlite(element, compiler, **kw):
+    # search vector is computed by postgres functions, in sqlite
+    # it's an empty column (full-text search tests need postgres)
+    column = element.element
+    if column.computed is not None and isinstance(column.type, TSVECTOR):
+        return f"{column.name} TEXT"
+    return compiler.visit_create_column(element, **kw)
+
+
+def create_sqlite_engine():
+    engine = create_engine(
+        "sqlite://",
+        # one in-memory database shared by threads of test client
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    # pysqlite doesn't begin transactions itself properly,
+    # SAVEPOINT needs explicit BEGIN
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    @event.listens_for(engine, "begin")
+    def on_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+# ---------------------------------------------------------------------------------------
+# template
+# ---------------------------------------------------------------------------------------
+
+
+def schema_digest() -> str:
+    """
+    Digest of DDL of all models, template is rebuilt when it changes.
+    """
+    dialect = postgresql.dialect()
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+def create_database_from_template(name: str):
+    """
+    Creates database "name" as a copy of the template database.
+    Template is created by the first worker (others wait for the lock)
+    and only when the schema of models was changed.
+    """
+    template = f"{prg_db}_template"
+    digest = schema_digest()
+    admin_engine = create_engine(
+        database_uri(prg_db), isolation_level="AUTOCOMMIT"
+    )
+    with admin_engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(hashtext(:name))"),
+            {"name": template},
+        )
+        try:
+            comment = connection.scalar(
+                text(
+                    "SELECT shobj_description(oid, 'pg_database') "
+                    "FROM pg_database WHERE datname = :name"
+                ),
+                {"name": template},
+            )
+            if comment != digest:
+                connection.execute(
+                    text(f'DROP DATABASE IF EXISTS "{template}"')
+                )
+                connection.execute(text(f'CREATE DATABASE "{template}"'))
+                template_engine = create_engine(database_uri(template))
+                Base.metadata.create_all(template_engine)
+                template_engine.dispose()
+                connection.execute(
+                    text(f"COMMENT ON DATABASE \"{template}\" IS '{digest}'")
+                )
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+            connection.execute(
+                text(f'CREATE DATABASE "{name}" TEMPLATE "{template}"')
+            )
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"),
+                {"name": template},
+            )
+    return admin_engine
+
+
+# ---------------------------------------------------------------------------------------
+# test_engine
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def test_engine(request):
+    """
+    Engine of the test database, schema is created once per session.
+    Each pytest-xdist worker gets its own database.
+    """
+    test_db = request.config.getoption("--test-db")
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+
+    if test_db == "sqlite":
+        engine = create_sqlite_engine()
+        yield engine
+        engine.dispose()
+    elif test_db == "template" or worker is not None:
+        name = f"{prg_db}_{worker or 'main'}"
+        admin_engine = create_database_from_template(name)
+        engine = create_engine(database_uri(name), pool_pre_ping=True)
+        yield engine
+        engine.dispose()
+        with admin_engine.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        admin_engine.dispose()
+    else:
+        engine = create_engine(database_uri(prg_db), pool_pre_ping=True)
+        # tables of an interrupted session
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        yield engine
+        Base.metadata.drop_all(engine)
+        engine.dispose()
 
 
 @pytest.fixture(autouse=True)
-def app() -> Generator[FastAPI, Any, None]:
+def app(test_engine) -> Generator[FastAPI, Any, None]:
     """
-    Create a fresh database on each test case.
+    Application with empty caches on each test case.
+    Tables are empty, because every test is rolled back.
     """
-    Base.metadata.create_all(test_engine)  # Create the tables.
+    catalog_cache.clear()  # cached rows of previous test
     yield app
-    Base.metadata.drop_all(test_engine)
 
 
 @pytest.fixture()
-def db_session(app: FastAPI) -> Generator[TestSession, Any, None]:
+def db_session(app: FastAPI, test_engine) -> Generator[TestSession, Any, None]:
     """
     Creates a fresh sqlalchemy session for each test that operates
     in a transaction. The transaction is rolled back at the end
@@ -48,10 +244,23 @@ def db_session(app: FastAPI) -> Generator[TestSession, Any, None]:
 
     # connect to the database
     connection = test_engine.connect()
+    if test_engine.dialect.name == "postgresql":
+        # sequences are not rolled back with the transaction
+        connection.execute(RESET_SEQUENCES)
     # begin a non-ORM transaction
     transaction = connection.begin()
     # bind an individual Session to the connection
     session = TestSession(bind=connection)
+    # commit() and rollback() of tested code end a SAVEPOINT,
+    # so the outer transaction is kept until the end of the test
+    session.begin_nested()
+
+    @event.listens_for(session, "after_transaction_end")
+    def restart_savepoint(session, transaction):
+        if transaction.nested and not transaction._parent.nested:
+            session.expire_all()
+            session.begin_nested()
+
     yield session  # use the session in tests.
     session.close()
     # rollback - everything that happened with the
@@ -62,6 +271,127 @@ def db_session(app: FastAPI) -> Generator[TestSession, Any, None]:
     connection.close()
 
 
+@pytest.fixture()
+def capture_statements(db_session):
+    """
+    Returns a context manager which collects (statement, parameters)
+    sent by connection of `db_session` inside its block:
+
+        with capture_statements() as statements:
+            ...
+    """
+
+    @contextmanager
+    def capture():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+
+        connection = db_session.connection()
+        event.listen(
+            connection, "before_cursor_execute", before_cursor_execute
+        )
+        try:
+            yield statements
+        finally:
+            event.remove(
+                connection, "before_cursor_execute", before_cursor_execute
+            )
+
+    return capture
+
+
+@pytest.fixture()
+def async_session_scope(test_engine):
+    """
+    Returns an async context manager with an AsyncSession of the test
+    database (needs asyncpg, "poetry install -E async"). Like in
+    `db_session` everything is rolled back at the end of the block,
+    commit() of tested code ends a SAVEPOINT. The session is bound to
+    the event loop which entered the block:
+
+        async with async_session_scope() as db:
+            ...
+    """
+    pytest.importorskip("asyncpg")
+    url = test_engine.url.set(drivername="postgresql+asyncpg")
+
+    @asynccontextmanager
+    async def scope():
+        engine = create_async_engine(url)
+        try:
+            async with engine.connect() as connection:
+                transaction = await connection.begin()
+                await connection.begin_nested()
+                session = AsyncSession(
+                    bind=connection, autoflush=False, expire_on_commit=False
+                )
+
+                @event.listens_for(
+                    session.sync_session, "after_transaction_end"
+                )
+                def restart_savepoint(session, transaction):
+                    if not connection.in_nested_transaction():
+                        connection.sync_connection.begin_nested()
+
+                try:
+                    yield session
+                finally:
+                    await session.close()
+                    await transaction.rollback()
+        finally:
+            await engine.dispose()
+
+    return scope
+
+
+@pytest.fixture()
+def fill_async_db():
+    """
+    Returns a coroutine function which adds a user, an author,
+    a category and books of them by an async session (there are no
+    async create functions). Returns dict of them:
+
+        data = await fill_async_db(db, books=2)
+        data["user"], data["author"], data["category"], data["books"]
+    """
+
+    async def fill(db: AsyncSession, books: int = 2):
+        user = user_m.User(
+            fullname="User1",
+            email="user1@gmail.com",
+            password="not used",
+            role="user",
+        )
+        author = store_m.Author(name="Author1", email="author@gmail.com")
+        category = store_m.Category(name="Category1", is_active=True)
+        db.add_all([user, author, category])
+        await db.flush()
+        book_items = [
+            store_m.Book(
+                name=f"Example Book{i}",
+                price=Decimal("5.55"),
+                description=f"Any your description about a book {i}",
+                year_of_publication=2022,
+                is_active=True,
+                author_id=author.id,
+                category_id=category.id,
+            )
+            for i in range(1, books + 1)
+        ]
+        db.add_all(book_items)
+        await db.commit()
+        return {
+            "user": user,
+            "author": author,
+            "category": category,
+            "books": book_items,
+        }
+
+    return fill
+
+
 @pytest.fixture()
 def client(
     app: FastAPI, db_session: TestSession
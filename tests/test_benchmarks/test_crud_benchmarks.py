@@ -0,0 +1,195 @@
+import random
+
+import pytest
+from sqlalchemy import text
+
+from app.core import security, token_cache
+from app.crud import author_category_logic, book_logic, order_logic
+from app.datagen import COLUMNS, generate_tables
+from app.models import order_m, store_m, user_m
+from app.schemas import store_s, user_order_s
+
+# datasets set postgres sequences
+pytestmark = pytest.mark.postgres
+
+# number of books in dataset, other tables are proportional
+DATASET_SIZES = (100, 1000, 10000)
+
+MODELS = {
+    "authors": store_m.Author,
+    "categories": store_m.Category,
+    "users": user_m.User,
+    "books": store_m.Book,
+    "orders": order_m.Order,
+    "order_items": order_m.OrderItem,
+}
+
+# ---------------------------------------------------------------------------------------
+# dataset
+# ---------------------------------------------------------------------------------------
+
+
+def insert_rows(db_session, table: str, rows):
+    db_session.execute(
+        MODELS[table].__table__.insert(),
+        [dict(zip(COLUMNS[table], row)) for row in rows],
+    )
+
+
+@pytest.fixture(params=DATASET_SIZES, ids=lambda size: f"{size}-books")
+def dataset(request, db_session):
+    """
+    Fills database with rows of app.datagen, books count is the param.
+    Returns the first generated user.
+    """
+    size = request.param
+    counts = {
+        "authors": max(size // 100, 1),
+        "categories": max(size // 1000, 1),
+        "users": max(size // 10, 1),
+        "books": size,
+        "orders": size,
+    }
+    refs = {table: (1, count) for table, count in counts.items()}
+    refs["password"] = "not used"
+    rng = random.Random(size)
+
+    for table, count in counts.items():
+        tables = generate_tables(table, 1, count, rng, refs)
+        for row_table, rows in tables.items():
+            insert_rows(db_session, row_table, rows)
+    # new rows of benchmarks get ids after generated ones
+    for table in MODELS:
+        db_session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT max(id) FROM {table}))"
+            )
+        )
+    db_session.commit()
+    return db_session.get(user_m.User, 1)
+
+
+# ---------------------------------------------------------------------------------------
+# test_get_all_book_benchmark
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("page", (1, 5))
+def test_get_all_book_benchmark(benchmark, db_session, dataset, page):
+    benchmark.group = "book_logic.get_all_book"
+    books = benchmark(
+        book_logic.get_all_book,
+        db=db_session,
+        limit=20,
+        page=page,
+        reverse_sort=True,
+        book_active=True,
+        search_by_autor_id=None,
+        search_by_category_id=None,
+        categories_active=True,
+    )
+    assert books
+
+
+# ---------------------------------------------------------------------------------------
+# test_create_order_benchmark
+# ---------------------------------------------------------------------------------------
+
+
+def test_create_order_benchmark(benchmark, db_session, dataset):
+    benchmark.group = "order_logic.create_item"
+    items = [
+        user_order_s.OrderItemCreate(book_id=book_id, quantity=2)
+        for book_id in (1, 2, 3)
+    ]
+    order = benchmark(
+        order_logic.create_item,
+        item=items,
+        db=db_session,
+        current_user=dataset,
+    )
+    assert len(order.order_items) == 3
+
+
+# ---------------------------------------------------------------------------------------
+# test_update_order_by_user_benchmark
+# ---------------------------------------------------------------------------------------
+
+
+def test_update_order_by_user_benchmark(benchmark, db_session, dataset):
+    benchmark.group = "order_logic.update_order_by_id_by_user"
+    order = order_logic.create_item(
+        item=[user_order_s.OrderItemCreate(book_id=1, quantity=1)],
+        db=db_session,
+        current_user=dataset,
+    )
+    items = [
+        user_order_s.OrderItemCreate(book_id=book_id, quantity=3)
+        for book_id in (2, 3)
+    ]
+    updated_order = benchmark(
+        order_logic.update_order_by_id_by_user,
+        order_id=order.id,
+        db=db_session,
+        schema=items,
+        current_user=dataset,
+    )
+    assert len(updated_order.order_items) == 2
+
+
+# ---------------------------------------------------------------------------------------
+# test_update_category_benchmark
+# ---------------------------------------------------------------------------------------
+
+
+def test_update_category_benchmark(benchmark, db_session, dataset):
+    benchmark.group = "author_category_logic.update_item_by_id"
+    names = iter(range(10**9))
+
+    def update_category():
+        return author_category_logic.update_item_by_id(
+            item_id=1,
+            db=db_session,
+            schema=store_s.CategoryChange(name=f"Renamed {next(names)}"),
+            item_model=store_m.Category,
+        )
+
+    category = benchmark(update_category)
+    assert category.id == 1
+
+
+# ---------------------------------------------------------------------------------------
+# test_token_benchmarks
+# ---------------------------------------------------------------------------------------
+
+
+TOKEN_DATA = {"email": "user1@example.com", "id": "1", "role": "user"}
+
+
+def test_encode_token_benchmark(benchmark):
+    benchmark.group = "security tokens"
+    token = benchmark(security.encode_token, TOKEN_DATA, "access_token")
+    assert token
+
+
+def test_decode_access_token_benchmark(benchmark):
+    benchmark.group = "security tokens"
+    token = security.encode_token(TOKEN_DATA, "access_token")
+    # every round verifies the token (cache is empty)
+    token_data = benchmark.pedantic(
+        security.decode_access_token,
+        args=(token,),
+        setup=token_cache.clear,
+        rounds=200,
+    )
+    assert token_data.email == TOKEN_DATA["email"]
+
+
+def test_decode_cached_access_token_benchmark(benchmark):
+    benchmark.group = "security tokens"
+    token = security.encode_token(TOKEN_DATA, "access_token")
+    security.decode_access_token(token)
+    token_data = benchmark(security.decode_access_token, token)
+    assert token_data.email == TOKEN_DATA["email"]
+    token_cache.clear()
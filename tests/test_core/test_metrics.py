@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware
+
+# ---------------------------------------------------------------------------------------
+# test_histogram
+# ---------------------------------------------------------------------------------------
+
+
+def test_histogram():
+    histogram = metrics.Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.sum == 14.5
+
+    lines = metrics.format_histogram("size", "Size.", [({}, histogram)])
+    assert 'size_bucket{le="1"} 2' in lines
+    assert 'size_bucket{le="5"} 3' in lines
+    assert 'size_bucket{le="+Inf"} 4' in lines
+    assert "size_count 4" in lines
+
+
+# ---------------------------------------------------------------------------------------
+# test_metrics_middleware
+# ---------------------------------------------------------------------------------------
+
+
+def test_metrics_middleware():
+    metrics.clear()
+    test_app = FastAPI()
+
+    @test_app.get("/books/{book_id}")
+    def get_book(book_id: int):
+        return {"id": book_id}
+
+    test_app.add_middleware(MetricsMiddleware)
+    test_client = TestClient(test_app)
+    test_client.get("/books/1")
+    test_client.get("/books/2")
+    test_client.get("/authors/1")
+
+    text = "\n".join(metrics.render_http_metrics())
+    # one series for all books
+    assert (
+        'http_requests_total{method="GET",route="/books/{book_id}",'
+        'status="200"} 2'
+    ) in text
+    assert (
+        'http_requests_total{method="GET",route="unmatched",status="404"} 1'
+    ) in text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/books/{book_id}"} 2'
+    ) in text
+    assert "http_requests_in_flight 0" in text
+    metrics.clear()
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import password_pool, security, settings
+
+# ---------------------------------------------------------------------------------------
+# test_get_hashed_password
+# ---------------------------------------------------------------------------------------
+
+
+def test_get_hashed_password():
+    hashed_password = password_pool.get_hashed_password(password="qwerty123")
+    assert len(hashed_password) == 60
+    assert security.verify_password("qwerty123", hashed_password) is True
+
+
+# ---------------------------------------------------------------------------------------
+# test_verify_password
+# ---------------------------------------------------------------------------------------
+
+
+def test_verify_password():
+    hashed_password = security.get_hashed_password(password="qwerty123")
+    assert password_pool.verify_password("qwerty123", hashed_password) is True
+    assert password_pool.verify_password("wrong", hashed_password) is False
+
+
+def test_verify_password_async():
+    hashed_password = security.get_hashed_password(password="qwerty123")
+    result = asyncio.run(
+        password_pool.verify_password_async("qwerty123", hashed_password)
+    )
+    assert result is True
+
+
+# ---------------------------------------------------------------------------------------
+# test_backpressure
+# ---------------------------------------------------------------------------------------
+
+
+def test_backpressure(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    rejected = password_pool.get_stats()["rejected"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        password_pool.get_hashed_password(password="qwerty123")
+
+    assert exc_info.value.status_code == 503
+    assert password_pool.get_stats()["rejected"] == rejected + 1
+    assert password_pool.get_stats()["pending"] == 0
@@ -0,0 +1,123 @@
+import time
+from contextlib import contextmanager
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiler, settings
+from app.core.profiler import ProfilerMiddleware
+from app.models import profile_m
+
+# ---------------------------------------------------------------------------------------
+# test_profiler
+# ---------------------------------------------------------------------------------------
+
+
+def make_app(db_session):
+    test_app = FastAPI()
+
+    @test_app.put("/orders/my/{order_id}")
+    def slow_endpoint(order_id: int):
+        start = time.perf_counter()
+        while time.perf_counter() - start < 0.1:
+            pass
+        return {"id": order_id}
+
+    @contextmanager
+    def session_factory():
+        yield db_session
+
+    test_app.add_middleware(
+        ProfilerMiddleware, session_factory=session_factory
+    )
+    return test_app
+
+
+def test_profiler_pattern(db_session):
+    profiler.clear(db_session)
+    test_client = TestClient(make_app(db_session))
+
+    # profiling is off
+    test_client.put("/orders/my/1")
+    assert profiler.get_profiles(db_session) == []
+
+    profiler.enable(db_session, "PUT /orders/my/*", requests=1)
+    test_client.get("/orders/my/1")
+    test_client.put("/orders/my/1")
+    # only one request was left
+    test_client.put("/orders/my/2")
+
+    profiles = profiler.get_profiles(db_session)
+    assert len(profiles) == 1
+    assert profiles[0]["method"] == "PUT"
+    assert profiles[0]["endpoint"] == "slow_endpoint"
+    assert profiles[0]["status"] == 200
+    assert profiles[0]["samples"] > 0
+
+    profile = profiler.get_profile(db_session, profiles[0]["id"])
+    assert "slow_endpoint" in profiler.folded(profile)
+    assert profiler.get_config()["remaining"] == 0
+    profiler.clear(db_session)
+
+
+def test_profiler_token(db_session):
+    profiler.clear(db_session)
+    test_client = TestClient(make_app(db_session))
+
+    config = profiler.enable(db_session, None, requests=5)
+    test_client.put("/orders/my/1")
+    test_client.put("/orders/my/1", headers={"X-Profile": "wrong"})
+    assert profiler.get_profiles(db_session) == []
+
+    test_client.put("/orders/my/1", headers={"X-Profile": config["token"]})
+    assert len(profiler.get_profiles(db_session)) == 1
+    profiler.clear(db_session)
+
+
+def test_profiler_shared_by_workers(db_session):
+    profiler.clear(db_session)
+    test_client = TestClient(make_app(db_session))
+
+    profiler.enable(db_session, "PUT /orders/my/*", requests=1)
+    # another worker took the request
+    db_session.query(profile_m.ProfilerConfig).update({"remaining": 0})
+    db_session.commit()
+    test_client.put("/orders/my/1")
+    assert profiler.get_profiles(db_session) == []
+    # this worker stops profiling
+    assert profiler.get_config()["remaining"] == 0
+
+    # another worker turned profiling on, this one got NOTIFY
+    db_session.merge(
+        profile_m.ProfilerConfig(
+            id=profiler.CONFIG_ID,
+            remaining=1,
+            pattern="PUT /orders/my/*",
+            token="other",
+        )
+    )
+    db_session.commit()
+    profiler.load_config(db_session)
+    test_client.put("/orders/my/2", headers={"X-Profile": "other"})
+
+    profiles = profiler.get_profiles(db_session)
+    assert [profile["path"] for profile in profiles] == ["/orders/my/2"]
+    profiler.clear(db_session)
+
+
+def test_profiler_keeps_last_profiles(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_KEEP", 2)
+    profiler.clear(db_session)
+    test_client = TestClient(make_app(db_session))
+
+    profiler.enable(db_session, "PUT /orders/my/*", requests=3)
+    for order_id in (1, 2, 3):
+        test_client.put(f"/orders/my/{order_id}")
+
+    profiles = profiler.get_profiles(db_session)
+    assert [profile["path"] for profile in profiles] == [
+        "/orders/my/3",
+        "/orders/my/2",
+    ]
+    assert db_session.query(profile_m.RequestProfile).count() == 2
+    profiler.clear(db_session)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import revocation, security
+from app.crud import auth_logic
+from app.models import user_m
+
+# ---------------------------------------------------------------------------------------
+# test_bloom_filter
+# ---------------------------------------------------------------------------------------
+
+
+def test_bloom_filter():
+    bloom_filter = revocation.BloomFilter(
+        capacity=1000, false_positive_rate=0.01
+    )
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+    false_positives = sum(f"other-{i}" in bloom_filter for i in range(10000))
+    assert false_positives < 300
+
+
+# ---------------------------------------------------------------------------------------
+# test_logout
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.postgres
+def test_logout(db_session, capture_statements):
+    access_token = security.encode_token(
+        data={"email": "user1@gmail.com", "id": 1, "role": "user"},
+        type="access_token",
+    )
+    refresh_token = security.encode_token(
+        data={"email": "user1@gmail.com"}, type="refresh_token"
+    )
+    access_jti = security.decode_access_token(access_token).jti
+    refresh_jti = security.get_token_claims(refresh_token)["jti"]
+    revocation.refresh(db_session, force=True)
+
+    assert revocation.is_revoked(access_jti, db_session) is False
+    assert revocation.is_revoked(refresh_jti, db_session) is False
+
+    with capture_statements() as statements:
+        auth_logic.logout(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            db=db_session,
+        )
+    # tokens are revoked by one commit (RELEASE of the test session)
+    commits = [
+        statement
+        for statement, _ in statements
+        if statement.startswith("RELEASE SAVEPOINT")
+    ]
+    assert len(commits) == 1
+
+    assert revocation.is_revoked(access_jti, db_session) is True
+    assert revocation.is_revoked(refresh_jti, db_session) is True
+    # token issued before revocation
+    assert revocation.is_revoked(None, db_session) is False
+
+
+@pytest.mark.postgres
+def test_logout_refresh_token_of_other_user(db_session):
+    access_token = security.encode_token(
+        data={"email": "user1@gmail.com", "id": 1, "role": "user"},
+        type="access_token",
+    )
+    refresh_token = security.encode_token(
+        data={"email": "user2@gmail.com"}, type="refresh_token"
+    )
+    refresh_jti = security.get_token_claims(refresh_token)["jti"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth_logic.logout(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            db=db_session,
+        )
+
+    assert exc_info.value.status_code == 403
+    assert revocation.is_revoked(refresh_jti, db_session) is False
+
+
+# ---------------------------------------------------------------------------------------
+# test_refresh_commits_out_of_order
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.postgres
+def test_refresh_commits_out_of_order(db_session):
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    # id 2 is committed first, id 1 (inserted earlier by a slower
+    # transaction) is committed after the refresh
+    db_session.add(
+        user_m.RevokedToken(id=2, jti="committed-first", expires_at=expires_at)
+    )
+    db_session.commit()
+    revocation.refresh(db_session, force=True)
+
+    db_session.add(
+        user_m.RevokedToken(id=1, jti="committed-later", expires_at=expires_at)
+    )
+    db_session.commit()
+    revocation.refresh(db_session, force=True)
+
+    assert revocation.is_revoked("committed-first", db_session) is True
+    assert revocation.is_revoked("committed-later", db_session) is True
@@ -0,0 +1,73 @@
+import time
+
+from app.core import security, settings, token_cache
+
+access_data = {
+    "email": "user1@gmail.com",
+    "id": "1",
+    "role": "user",
+}
+
+# ---------------------------------------------------------------------------------------
+# test_decode_access_token_cached
+# ---------------------------------------------------------------------------------------
+
+
+def test_decode_access_token_cached(monkeypatch):
+    token_cache.clear()
+    token = security.encode_token(data=access_data, type="access_token")
+
+    data1 = security.decode_access_token(access_token=token)
+    stats = token_cache.get_stats()
+
+    # second request doesn't decode token
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("token was decoded again")
+
+    monkeypatch.setattr(security.jwt, "decode", fail_decode)
+    data2 = security.decode_access_token(access_token=token)
+
+    assert data2 is data1
+    assert token_cache.get_stats()["hits"] == stats["hits"] + 1
+    assert token_cache.get_stats()["misses"] == stats["misses"]
+
+
+# ---------------------------------------------------------------------------------------
+# test_expired_token
+# ---------------------------------------------------------------------------------------
+
+
+def test_expired_token():
+    token_data = security.decode_access_token(
+        access_token=security.encode_token(
+            data=access_data, type="access_token"
+        )
+    )
+    # decoded token was cached, only the expired one is checked
+    token_cache.clear()
+    token_cache.add_token_data("token", token_data, time.time() - 1)
+
+    assert token_cache.get_token_data("token") is None
+    assert token_cache.get_stats()["size"] == 0
+
+
+# ---------------------------------------------------------------------------------------
+# test_eviction
+# ---------------------------------------------------------------------------------------
+
+
+def test_eviction(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_SIZE", 2)
+    token_cache.clear()
+    expire = time.time() + 60
+    evictions = token_cache.get_stats()["evictions"]
+
+    token_cache.add_token_data("token1", "data1", expire)
+    token_cache.add_token_data("token2", "data2", expire)
+    # token1 is used recently, so token2 is evicted
+    assert token_cache.get_token_data("token1") == "data1"
+    token_cache.add_token_data("token3", "data3", expire)
+
+    assert token_cache.get_token_data("token2") is None
+    assert token_cache.get_token_data("token3") == "data3"
+    assert token_cache.get_stats()["evictions"] == evictions + 1
@@ -1,3 +1,8 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
 from app.crud import auth_logic
 from app.models import user_m
 from app.schemas import user_order_s, auth_s
@@ -59,3 +64,47 @@ def test_verify_login(
     for item in should_be:
         assert item in login_answer.keys()
     login_answer["token_type"] == "bearer"
+
+
+# ---------------------------------------------------------------------------------------
+# test_create_user_and_login_async
+# ---------------------------------------------------------------------------------------
+
+
+def test_create_user_and_login_async(
+    db_session,
+):
+    user_data = {
+        "fullname": "User1",
+        "email": "user1@gmail.com",
+        "password": "12345678",
+        "passwordConfirm": "12345678",
+    }
+    user: user_m.User = asyncio.run(
+        auth_logic.create_user_async(
+            db=db_session,
+            schema=user_order_s.UserCreate(**user_data),
+        )
+    )
+    assert user.email == user_data["email"]
+
+    login_answer = asyncio.run(
+        auth_logic.verify_login_async(
+            schema=auth_s.LoginUserSchema(
+                email="user1@gmail.com", password="12345678"
+            ),
+            db=db_session,
+        )
+    )
+    assert login_answer["token_type"] == "bearer"
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            auth_logic.verify_login_async(
+                schema=auth_s.LoginUserSchema(
+                    email="user1@gmail.com", password="wrong password"
+                ),
+                db=db_session,
+            )
+        )
+    assert exc_info.value.status_code == 401
@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import text
 
-from app.crud import author_category_logic, book_logic
+from app.crud import author_category_logic, book_logic, pagination
 from app.models import store_m
 from app.schemas import store_s
 
@@ -134,6 +137,164 @@ def test_get_all_items_category(
     assert len(item_list) == 6
 
 
+@pytest.mark.parametrize("latest_first", [True, False])
+def test_get_all_items_author_with_cursor(
+    db_session,
+    latest_first,
+):
+    for i in range(1, 20):
+        author_data = {
+            "name": f"Author{i}",
+            "email": f"author{i}@gmail.com",
+        }
+        obj_in = store_s.AuthorCreate(**author_data)
+        author_category_logic.create_item(
+            db=db_session,
+            item=obj_in,
+            item_model=store_m.Author,
+        )
+
+    # cursor pages must be the same as page/offset pages
+    cursor = None
+    for page in range(1, 5):
+        page_list = author_category_logic.get_all_items(
+            db=db_session,
+            latest_first=latest_first,
+            limit=6,
+            page=page,
+            item_model=store_m.Author,
+        )
+        cursor_list = author_category_logic.get_all_items(
+            db=db_session,
+            latest_first=latest_first,
+            limit=6,
+            page=1,
+            item_model=store_m.Author,
+            cursor=cursor,
+        )
+        assert [item.id for item in cursor_list] == [
+            item.id for item in page_list
+        ]
+        cursor = pagination.encode_cursor(cursor_list[-1])
+
+
+def test_get_all_items_with_wrong_cursor(
+    db_session,
+):
+    with pytest.raises(HTTPException):
+        author_category_logic.get_all_items(
+            db=db_session,
+            latest_first=True,
+            limit=6,
+            page=1,
+            item_model=store_m.Author,
+            cursor="wrong cursor",
+        )
+
+
+def create_authors_with_emails(db_session):
+    for i in range(1, 5):
+        author_data = {
+            "name": f"Author{i}",
+            "email": f"author{i}@gmail.com",
+        }
+        author_category_logic.create_item(
+            db=db_session,
+            item=store_s.AuthorCreate(**author_data),
+            item_model=store_m.Author,
+        )
+
+
+def find_authors_by_email(db_session, find_by_email: str):
+    return author_category_logic.get_all_items(
+        db=db_session,
+        latest_first=False,
+        limit=10,
+        page=1,
+        item_model=store_m.Author,
+        find_by_email=find_by_email,
+    )
+
+
+def test_get_all_items_author_find_by_email(
+    db_session,
+):
+    create_authors_with_emails(db_session)
+
+    item_list = find_authors_by_email(db_session, "AUTHOR3")
+    assert [item.name for item in item_list] == ["Author3"]
+
+
+@pytest.mark.postgres
+def test_get_all_items_author_find_by_email_uses_index(
+    db_session,
+    capture_statements,
+):
+    create_authors_with_emails(db_session)
+
+    with capture_statements() as statements:
+        find_authors_by_email(db_session, "AUTHOR3")
+
+    # tables in tests are tiny, so turn off other scans to see
+    # if trigram index can be used for the filter
+    statement, parameters = statements[-1]
+    connection = db_session.connection()
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    connection.execute(text("SET LOCAL enable_indexscan = off"))
+    plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+    assert "ix_authors_email_trgm" in "\n".join(row[0] for row in plan)
+
+
+def test_get_all_items_category_from_cache(
+    db_session,
+    capture_statements,
+):
+    for i in range(1, 4):
+        author_category_logic.create_item(
+            db=db_session,
+            item=store_s.CategoryCreate(name=f"Category{i}"),
+            item_model=store_m.Category,
+        )
+
+    def get_categories():
+        return author_category_logic.get_all_items(
+            db=db_session,
+            latest_first=True,
+            limit=10,
+            page=1,
+            item_model=store_m.Category,
+        )
+
+    get_categories()
+    with capture_statements() as statements:
+        item_list = get_categories()
+    assert statements == []
+    assert [item.name for item in item_list] == [
+        "Category3",
+        "Category2",
+        "Category1",
+    ]
+
+    # cache is invalidated by changes
+    author_category_logic.create_item(
+        db=db_session,
+        item=store_s.CategoryCreate(name="Category4"),
+        item_model=store_m.Category,
+    )
+    author_category_logic.update_item_by_id(
+        item_id=item_list[-1].id,
+        db=db_session,
+        schema=store_s.CategoryChange(name="First category"),
+        item_model=store_m.Category,
+    )
+    assert [item.name for item in get_categories()] == [
+        "Category4",
+        "Category3",
+        "Category2",
+        "First category",
+    ]
+
+
 # ---------------------------------------------------------------------------------------
 # test_get_item_by_id
 # ---------------------------------------------------------------------------------------
@@ -184,6 +345,34 @@ def test_get_item_by_id_category(
     assert item == item2
 
 
+@pytest.mark.postgres
+def test_get_item_by_id_async(
+    async_session_scope,
+    fill_async_db,
+):
+    async def scenario():
+        async with async_session_scope() as db:
+            data = await fill_async_db(db)
+            author = await author_category_logic.get_item_by_id_async(
+                item_id=data["author"].id,
+                db=db,
+                item_model=store_m.Author,
+            )
+            assert author.name == "Author1"
+            # books are loaded with the author
+            assert len(author.books) == 2
+
+            with pytest.raises(HTTPException) as exc_info:
+                await author_category_logic.get_item_by_id_async(
+                    item_id=data["author"].id + 100,
+                    db=db,
+                    item_model=store_m.Author,
+                )
+            assert exc_info.value.status_code == 404
+
+    asyncio.run(scenario())
+
+
 # ---------------------------------------------------------------------------------------
 # test_update_item_by_id
 # ---------------------------------------------------------------------------------------
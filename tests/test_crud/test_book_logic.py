@@ -1,7 +1,18 @@
+import asyncio
+import csv
+import json
+from datetime import timedelta
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import delete
 
-from app.crud import book_logic, author_category_logic
+from app.crud import (
+    author_category_logic,
+    book_logic,
+    catalog_cache,
+    pagination,
+)
 from app.models import store_m
 from app.schemas import store_s
 
@@ -59,6 +70,45 @@ def create_author_and_category_for_book(
     )
 
 
+def create_books(
+    db_session,
+    number_of_books,
+):
+    for i in range(1, number_of_books + 1):
+        book_data = {
+            "name": f"Example Book{i}",
+            "price": "100",
+            "description": f"Any your description about a book {i}",
+            "year_of_publication": "2022",
+            "is_active": "True",
+            "author_id": "1",
+            "category_id": "1",
+        }
+        obj_in = store_s.BookCreate(**book_data)
+        book_logic.create_book(
+            db=db_session,
+            item=obj_in,
+        )
+
+
+def count_queries(
+    db_session,
+    capture_statements,
+    get_books,
+):
+    """
+    Returns number of statements used to get and serialize books.
+    """
+    # forget already loaded authors and categories
+    db_session.expunge_all()
+    with capture_statements() as statements:
+        items = get_books()
+        if not isinstance(items, list):
+            items = [items]
+        [store_s.BookFullShow.from_orm(item) for item in items]
+    return len(statements)
+
+
 @pytest.mark.parametrize("book_data", books_data)
 def test_create_book(
     db_session,
@@ -110,6 +160,47 @@ def test_get_all_book(
     assert len(item_list) == 6
 
 
+@pytest.mark.postgres
+def test_get_all_book_async(
+    async_session_scope,
+    fill_async_db,
+):
+    async def scenario():
+        async with async_session_scope() as db:
+            data = await fill_async_db(db, books=5)
+            book_ids = [book.id for book in data["books"]]
+            filters = {
+                "reverse_sort": False,
+                "book_active": True,
+                "search_by_autor_id": None,
+                "search_by_category_id": data["category"].id,
+                "categories_active": True,
+            }
+            first_page = await book_logic.get_all_book_async(
+                db=db, limit=3, page=1, **filters
+            )
+            second_page = await book_logic.get_all_book_async(
+                db=db, limit=3, page=2, **filters
+            )
+            assert [book.id for book in first_page] == book_ids[:3]
+            assert [book.id for book in second_page] == book_ids[3:]
+            # related author and category are loaded with the books
+            assert first_page[0].author.name == "Author1"
+            assert first_page[0].category.name == "Category1"
+
+            # the same page by cursor
+            cursor_page = await book_logic.get_all_book_async(
+                db=db,
+                limit=3,
+                page=1,
+                cursor=pagination.encode_cursor(first_page[-1]),
+                **filters,
+            )
+            assert cursor_page == second_page
+
+    asyncio.run(scenario())
+
+
 def test_update_book(
     db_session,
 ):
@@ -174,6 +265,26 @@ def test_create_book_with_wrong_author(
         )
 
 
+@pytest.mark.postgres
+def test_create_book_with_author_deleted_by_other_worker(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    # authors are cached in this worker
+    assert catalog_cache.exists(db_session, store_m.Author, 1)
+    # another worker deletes the author, notification is not here yet
+    db_session.execute(delete(store_m.Author).where(store_m.Author.id == 1))
+    db_session.commit()
+
+    obj_in = store_s.BookCreate(**books_data[0])
+    with pytest.raises(HTTPException) as exc_info:
+        book_logic.create_book(
+            db=db_session,
+            item=obj_in,
+        )
+    assert exc_info.value.status_code == 400
+
+
 def test_create_book_with_wrong_category(
     db_session,
 ):
@@ -195,3 +306,327 @@ def test_create_book_with_wrong_category(
             db=db_session,
             item=obj_in,
         )
+
+
+@pytest.mark.parametrize("categories_active", [None, True])
+def test_get_all_book_query_count(
+    db_session,
+    capture_statements,
+    categories_active,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=15)
+
+    def get_books(limit):
+        return lambda: book_logic.get_all_book(
+            db=db_session,
+            page=1,
+            limit=limit,
+            reverse_sort=True,
+            book_active=True,
+            search_by_autor_id=None,
+            search_by_category_id=None,
+            categories_active=categories_active,
+        )
+
+    small_page = count_queries(
+        db_session, capture_statements, get_books(limit=2)
+    )
+    big_page = count_queries(
+        db_session, capture_statements, get_books(limit=15)
+    )
+    assert small_page == big_page == 1
+
+
+def test_show_all_books_of_related_model_query_count(
+    db_session,
+    capture_statements,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=15)
+
+    def get_books(limit):
+        return lambda: author_category_logic.show_all_books_of_related_model(
+            item_id=1,
+            db=db_session,
+            latest_first=True,
+            limit=limit,
+            page=1,
+            related_model="author",
+        )
+
+    small_page = count_queries(
+        db_session, capture_statements, get_books(limit=2)
+    )
+    big_page = count_queries(
+        db_session, capture_statements, get_books(limit=15)
+    )
+    assert small_page == big_page == 1
+
+
+def test_get_book_by_id_query_count(
+    db_session,
+    capture_statements,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=1)
+
+    queries = count_queries(
+        db_session,
+        capture_statements,
+        lambda: author_category_logic.get_item_by_id(
+            item_id=1,
+            db=db_session,
+            item_model=store_m.Book,
+        ),
+    )
+    assert queries == 1
+
+
+@pytest.mark.postgres
+def test_search_books(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    names_and_descriptions = [
+        ("The Dragon Rider", "A boy finds a dragon egg"),
+        ("Cooking at home", "Simple recipes for every day"),
+        ("Sea stories", "Old sailors remember a sea dragon"),
+        ("Dragons and dragons", "Everything about dragons"),
+    ]
+    for name, description in names_and_descriptions:
+        book_data = {
+            "name": name,
+            "price": "100",
+            "description": description,
+            "year_of_publication": "2022",
+            "is_active": "True",
+            "author_id": "1",
+            "category_id": "1",
+        }
+        book_logic.create_book(
+            db=db_session,
+            item=store_s.BookCreate(**book_data),
+        )
+
+    found = book_logic.search_books(
+        db=db_session,
+        search_text="dragon",
+        limit=10,
+        book_active=True,
+    )
+    found_names = [book.name for book in found]
+    assert "Cooking at home" not in found_names
+    assert len(found_names) == 3
+    # match in name is more important than match in description
+    assert found_names[-1] == "Sea stories"
+    assert "<b>" in found[0].name_highlight
+    assert found == sorted(found, key=lambda book: book.rank, reverse=True)
+
+    # pages by cursor give the same books
+    first_page = book_logic.search_books(
+        db=db_session,
+        search_text="dragon",
+        limit=2,
+        book_active=True,
+    )
+    second_page = book_logic.search_books(
+        db=db_session,
+        search_text="dragon",
+        limit=2,
+        book_active=True,
+        cursor=pagination.encode_cursor(first_page[-1], keys=("rank", "id")),
+    )
+    assert [book.id for book in first_page + second_page] == [
+        book.id for book in found
+    ]
+
+
+@pytest.mark.postgres
+def test_search_books_pages_with_same_rank(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    for _ in range(5):
+        book_data = {
+            "name": "Dragon",
+            "price": "100",
+            "description": "A book about a dragon",
+            "year_of_publication": "2022",
+            "is_active": "True",
+            "author_id": "1",
+            "category_id": "1",
+        }
+        book_logic.create_book(
+            db=db_session,
+            item=store_s.BookCreate(**book_data),
+        )
+
+    found = book_logic.search_books(
+        db=db_session,
+        search_text="dragon",
+        limit=10,
+        book_active=True,
+    )
+    assert len({book.rank for book in found}) == 1
+
+    # every page starts after the last book of the previous one
+    paged = []
+    cursor = None
+    while True:
+        page = book_logic.search_books(
+            db=db_session,
+            search_text="dragon",
+            limit=2,
+            book_active=True,
+            cursor=cursor,
+        )
+        paged += page
+        if len(page) < 2:
+            break
+        cursor = pagination.encode_cursor(page[-1], keys=("rank", "id"))
+    assert [book.id for book in paged] == [book.id for book in found]
+
+
+# ---------------------------------------------------------------------------------------
+# test_export_books
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.postgres
+def test_export_books(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=5)
+
+    chunks = list(
+        book_logic.export_books(
+            db=db_session, export_format="ndjson", batch_size=2
+        )
+    )
+    assert len(chunks) == 3
+    books = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [book["name"] for book in books] == [
+        f"Example Book{i}" for i in range(1, 6)
+    ]
+    assert books[0]["author"] == "Author1"
+    assert books[0]["category"] == "Category1"
+    assert books[0]["price"] == 100
+
+    rows = list(
+        csv.DictReader(
+            "".join(
+                book_logic.export_books(db=db_session, export_format="csv")
+            ).splitlines()
+        )
+    )
+    assert len(rows) == 5
+    assert rows[4]["name"] == "Example Book5"
+
+    # incremental export
+    snapshot = book_logic.export_snapshot_time(db_session)
+    # books of transactions which started before the snapshot
+    # (all of this test) are exported again
+    repeated_books = book_logic.export_books(
+        db=db_session,
+        export_format="ndjson",
+        updated_since=snapshot,
+    )
+    assert len("".join(repeated_books).splitlines()) == 5
+    later_books = book_logic.export_books(
+        db=db_session,
+        export_format="ndjson",
+        updated_since=snapshot + timedelta(days=1),
+    )
+    assert list(later_books) == []
+
+    with pytest.raises(HTTPException):
+        book_logic.export_books(db=db_session, export_format="xml")
+
+
+# ---------------------------------------------------------------------------------------
+# test_import_books
+# ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.postgres
+def test_import_books(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=1)
+
+    rows = [
+        {**books_data[0], "name": "Imported1"},
+        {**books_data[0], "name": "Imported2", "description": ""},
+        # the same name as the first row
+        {**books_data[0], "name": "Imported1"},
+        # already in database
+        {**books_data[0], "name": "Example Book1"},
+        {**books_data[0], "name": "Imported3", "author_id": "2"},
+        {**books_data[0], "name": "Imported4", "price": "free"},
+        "not a book",
+    ]
+    result = book_logic.import_books(rows=rows, db=db_session)
+
+    assert result["imported"] == 2
+    assert [error["row"] for error in result["errors"]] == [3, 4, 5, 6, 7]
+    assert result["errors"][2]["detail"] == "Author not found!"
+    names = {book.name for book in db_session.query(store_m.Book)}
+    assert names == {"Example Book1", "Imported1", "Imported2"}
+
+    with pytest.raises(HTTPException):
+        book_logic.import_books(rows=[], db=db_session)
+
+
+# ---------------------------------------------------------------------------------------
+# test_bulk_update_books
+# ---------------------------------------------------------------------------------------
+
+
+def test_bulk_update_books(
+    db_session,
+):
+    create_author_and_category_for_book(db_session=db_session)
+    create_books(db_session=db_session, number_of_books=5)
+    ids = [book.id for book in db_session.query(store_m.Book).limit(2)]
+
+    result = book_logic.bulk_update_books(
+        schema=store_s.BookBulkUpdate(
+            where={"ids": ids},
+            price_change_percent=-15,
+        ),
+        db=db_session,
+    )
+    assert result == {"updated": 2}
+
+    result = book_logic.bulk_update_books(
+        schema=store_s.BookBulkUpdate(
+            where={"author_id": 1, "is_active": True},
+            values={"is_active": False, "year_of_publication": 1999},
+        ),
+        db=db_session,
+    )
+    assert result == {"updated": 5}
+
+    db_session.expire_all()
+    books = db_session.query(store_m.Book).order_by(store_m.Book.id).all()
+    assert sorted(float(book.price) for book in books) == [
+        85,
+        85,
+        100,
+        100,
+        100,
+    ]
+    assert all(book.is_active is False for book in books)
+    assert all(book.year_of_publication == 1999 for book in books)
+
+    # filter is required
+    with pytest.raises(HTTPException):
+        book_logic.bulk_update_books(
+            schema=store_s.BookBulkUpdate(
+                where={}, values={"is_active": True}
+            ),
+            db=db_session,
+        )
@@ -1,8 +1,10 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
 
 from app.crud import author_category_logic, book_logic, order_logic, auth_logic
-from app.models import store_m, order_m
+from app.models import store_m, order_m, user_m
 from app.schemas import store_s, user_order_s
 
 
@@ -109,6 +111,59 @@ def test_get_all_orders(
     assert len(all_orders) == 6
 
 
+@pytest.mark.postgres
+def test_get_all_orders_async(
+    async_session_scope,
+    fill_async_db,
+):
+    async def scenario():
+        async with async_session_scope() as db:
+            data = await fill_async_db(db)
+            orders = []
+            for quantity in range(1, 4):
+                order = await order_logic.create_item_async(
+                    item=[
+                        user_order_s.OrderItemCreate(
+                            book_id=data["books"][0].id, quantity=quantity
+                        )
+                    ],
+                    db=db,
+                    current_user=data["user"],
+                )
+                orders.append(order.id)
+
+            filters = {
+                "total_min": None,
+                "total_max": None,
+                "owner": None,
+                "delivery_date_from": None,
+                "delivery_date_to": None,
+                "complete": None,
+                "date_placed_from": None,
+                "date_placed_to": None,
+            }
+            first_page = await order_logic.get_all_orders_async(
+                db=db, limit=2, page=1, latest_first=True, **filters
+            )
+            second_page = await order_logic.get_all_orders_async(
+                db=db, limit=2, page=2, latest_first=True, **filters
+            )
+            assert [order.id for order in first_page + second_page] == (
+                orders[::-1]
+            )
+
+            expensive = await order_logic.get_all_orders_async(
+                db=db,
+                limit=10,
+                page=1,
+                latest_first=False,
+                **{**filters, "total_min": 10},
+            )
+            assert [order.id for order in expensive] == orders[1:]
+
+    asyncio.run(scenario())
+
+
 # ---------------------------------------------------------------------------------------
 # test_create_item
 # ---------------------------------------------------------------------------------------
@@ -160,6 +215,159 @@ def test_create_item(
     assert new_order.complete is False
 
 
+def test_create_item_without_items(
+    db_session,
+):
+    user = auth_logic.create_user(
+        db=db_session,
+        schema=user_order_s.UserCreate(
+            fullname="User1",
+            email="user1@gmail.com",
+            password="12345678",
+            passwordConfirm="12345678",
+        ),
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        order_logic.create_item(
+            item=[],
+            db=db_session,
+            current_user=user,
+        )
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Empty entered data"
+    # empty order is not saved
+    assert db_session.query(order_m.Order).count() == 0
+
+
+def count_order_creation_queries(
+    db_session,
+    capture_statements,
+    user,
+    order_item,
+):
+    """
+    Returns number of statements used to create an order.
+    """
+    # user of a request is loaded by authentication, commits of earlier
+    # orders expired it here
+    db_session.refresh(user)
+    with capture_statements() as statements:
+        order_logic.create_item(
+            item=order_item,
+            db=db_session,
+            current_user=user,
+        )
+    return len(statements)
+
+
+def test_create_item_query_count(
+    db_session,
+    capture_statements,
+):
+    user_data = {
+        "fullname": "User1",
+        "email": "user1@gmail.com",
+        "password": "12345678",
+        "passwordConfirm": "12345678",
+    }
+    obj_user = user_order_s.UserCreate(**user_data)
+    user = auth_logic.create_user(
+        db=db_session,
+        schema=obj_user,
+    )
+
+    create_author_category_and_books_for_order(db_session=db_session)
+
+    small_order = [
+        user_order_s.OrderItemCreate(book_id=1, quantity=1),
+    ]
+    big_order = [
+        user_order_s.OrderItemCreate(book_id=i % 2 + 1, quantity=1)
+        for i in range(50)
+    ]
+
+    # the first order loads mappers and caches compiled statements
+    count_order_creation_queries(
+        db_session, capture_statements, user, small_order
+    )
+    small_order_queries = count_order_creation_queries(
+        db_session, capture_statements, user, small_order
+    )
+    big_order_queries = count_order_creation_queries(
+        db_session, capture_statements, user, big_order
+    )
+    assert small_order_queries == big_order_queries
+    # books, order, order's items, returned order and its items,
+    # commit is RELEASE and SAVEPOINT of the test session
+    assert small_order_queries == 7
+
+
+def test_create_item_with_wrong_book(
+    db_session,
+):
+    user_data = {
+        "fullname": "User1",
+        "email": "user1@gmail.com",
+        "password": "12345678",
+        "passwordConfirm": "12345678",
+    }
+    obj_user = user_order_s.UserCreate(**user_data)
+    user = auth_logic.create_user(
+        db=db_session,
+        schema=obj_user,
+    )
+
+    create_author_category_and_books_for_order(db_session=db_session)
+
+    order_item = [
+        user_order_s.OrderItemCreate(book_id=1, quantity=1),
+        user_order_s.OrderItemCreate(book_id=100, quantity=1),
+    ]
+
+    with pytest.raises(HTTPException):
+        order_logic.create_item(
+            item=order_item,
+            db=db_session,
+            current_user=user,
+        )
+    # order must not be saved if any book is not found
+    assert db_session.query(order_m.Order).count() == 0
+
+
+@pytest.mark.postgres
+def test_create_item_async(
+    async_session_scope,
+    fill_async_db,
+):
+    async def scenario():
+        async with async_session_scope() as db:
+            data = await fill_async_db(db)
+            book1, book2 = data["books"]
+            order = await order_logic.create_item_async(
+                item=[
+                    user_order_s.OrderItemCreate(book_id=book1.id, quantity=2),
+                    user_order_s.OrderItemCreate(book_id=book2.id, quantity=1),
+                ],
+                db=db,
+                current_user=data["user"],
+            )
+            assert order.customer.id == data["user"].id
+            assert str(order.total_price) == "16.65"
+            assert sorted(
+                (item.book_id, item.quantity) for item in order.order_items
+            ) == [(book1.id, 2), (book2.id, 1)]
+
+            with pytest.raises(HTTPException) as exc_info:
+                await order_logic.create_item_async(
+                    item=[], db=db, current_user=data["user"]
+                )
+            assert exc_info.value.status_code == 400
+
+    asyncio.run(scenario())
+
+
 # ---------------------------------------------------------------------------------------
 # test_update_item_by_id_by_staff
 # ---------------------------------------------------------------------------------------
@@ -279,6 +487,51 @@ def test_get_all_user_orders(
     assert len(all_orders) == 6
 
 
+@pytest.mark.postgres
+def test_get_all_user_orders_async(
+    async_session_scope,
+    fill_async_db,
+):
+    async def scenario():
+        async with async_session_scope() as db:
+            data = await fill_async_db(db)
+            other_user = user_m.User(
+                fullname="User2",
+                email="user2@gmail.com",
+                password="not used",
+                role="user",
+            )
+            db.add(other_user)
+            await db.commit()
+
+            user_orders = []
+            for customer in (data["user"], other_user, data["user"]):
+                order = await order_logic.create_item_async(
+                    item=[
+                        user_order_s.OrderItemCreate(
+                            book_id=data["books"][0].id, quantity=1
+                        )
+                    ],
+                    db=db,
+                    current_user=customer,
+                )
+                if customer is data["user"]:
+                    user_orders.append(order.id)
+
+            orders = await order_logic.get_all_user_orders_async(
+                latest_first=False,
+                limit=10,
+                page=1,
+                db=db,
+                current_user=data["user"],
+            )
+            assert [order.id for order in orders] == user_orders
+            # order's items are loaded with the orders
+            assert [len(order.order_items) for order in orders] == [1, 1]
+
+    asyncio.run(scenario())
+
+
 # ---------------------------------------------------------------------------------------
 # test_update_order_by_id_by_user
 # ---------------------------------------------------------------------------------------
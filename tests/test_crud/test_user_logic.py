@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import text
 
 from app.crud import auth_logic, user_logic
 from app.models import user_m
@@ -41,6 +44,73 @@ def test_get_all_users(
     assert len(all_users) == 3
 
 
+def explain_last_query(
+    db_session,
+    capture_statements,
+    run_query,
+):
+    """
+    Runs query and returns EXPLAIN plan of its last statement.
+    Sequential and plain index scans are turned off, so plan shows
+    if any index can be used for the filters (tables in tests are tiny).
+    """
+    with capture_statements() as statements:
+        run_query()
+
+    statement, parameters = statements[-1]
+    connection = db_session.connection()
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    connection.execute(text("SET LOCAL enable_indexscan = off"))
+    plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+    return "\n".join(row[0] for row in plan)
+
+
+def test_get_all_users_find_by_email(
+    db_session,
+):
+    for email in ["Artem@gmail.com", "user_1@gmail.com", "user11@gmail.com"]:
+        db_session.add(user_m.User(fullname="User", email=email))
+    db_session.commit()
+
+    def find_users(find_by_email):
+        return user_logic.get_all_users(
+            db=db_session,
+            limit=10,
+            page=1,
+            reverse_sort=False,
+            find_by_email=find_by_email,
+            role=None,
+        )
+
+    # search is case-insensitive
+    assert [user.email for user in find_users("ARTEM")] == ["Artem@gmail.com"]
+    # wildcards are searched as is
+    assert [user.email for user in find_users("r_1")] == ["user_1@gmail.com"]
+
+
+@pytest.mark.postgres
+def test_get_all_users_find_by_email_uses_index(
+    db_session,
+    capture_statements,
+):
+    db_session.add(user_m.User(fullname="User", email="Artem@gmail.com"))
+    db_session.commit()
+
+    plan = explain_last_query(
+        db_session,
+        capture_statements,
+        lambda: user_logic.get_all_users(
+            db=db_session,
+            limit=10,
+            page=1,
+            reverse_sort=False,
+            find_by_email="artem",
+            role=None,
+        ),
+    )
+    assert "ix_users_email_trgm" in plan
+
+
 # ---------------------------------------------------------------------------------------
 # test_get_one_user
 # ---------------------------------------------------------------------------------------
@@ -153,6 +223,51 @@ def test_change_user_by_himself(
     )
 
 
+def test_change_user_by_himself_async(
+    db_session,
+):
+    user: user_m.User = auth_logic.create_user(
+        db=db_session,
+        schema=user_order_s.UserCreate(
+            fullname="User1",
+            email="user1@gmail.com",
+            password="12345678",
+            passwordConfirm="12345678",
+        ),
+    )
+    wrong_old_password = user_order_s.UserChangeByUserHimself(
+        old_password="wrong password",
+        new_password="87654321",
+        new_passwordConfirm="87654321",
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            user_logic.change_user_by_himself_async(
+                email=user.email, schema=wrong_old_password, db=db_session
+            )
+        )
+    assert exc_info.value.detail == "Incorrect old password"
+
+    updated_user = asyncio.run(
+        user_logic.change_user_by_himself_async(
+            email=user.email,
+            schema=user_order_s.UserChangeByUserHimself(
+                old_password="12345678",
+                new_password="87654321",
+                new_passwordConfirm="87654321",
+            ),
+            db=db_session,
+        )
+    )
+    assert (
+        security.verify_password(
+            plain_password="87654321",
+            hashed_password=updated_user.password,
+        )
+        is True
+    )
+
+
 # ---------------------------------------------------------------------------------------
 # test_delete_user
 # ---------------------------------------------------------------------------------------
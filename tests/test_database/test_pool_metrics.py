@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.database.pool_metrics import MeteredQueuePool
+
+# ---------------------------------------------------------------------------------------
+# test_pool_metrics
+# ---------------------------------------------------------------------------------------
+
+
+def test_pool_metrics():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+
+    connection1 = engine.connect()
+    connection2 = engine.connect()
+    connection1.execute(text("SELECT 1"))
+
+    metrics = engine.pool.metrics()
+    assert metrics["checkouts"] == 2
+    assert metrics["checked_out"] == 2
+    assert metrics["overflow"] == 1
+    assert metrics["overflow_checkouts"] == 1
+    assert metrics["overflow_max"] == 1
+
+    # pool is exhausted
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert engine.pool.metrics()["timeouts"] == 1
+
+    connection1.close()
+    connection2.close()
+    metrics = engine.pool.metrics()
+    assert metrics["checked_out"] == 0
+    assert metrics["checkout_wait_max_ms"] >= metrics["checkout_wait_avg_ms"]
+    engine.dispose()
@@ -0,0 +1,51 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core import settings
+from app.database import query_stats
+
+# ---------------------------------------------------------------------------------------
+# test_query_stats
+# ---------------------------------------------------------------------------------------
+
+
+def test_query_stats(monkeypatch, caplog):
+    # parameters are sent as a dict (as by psycopg2), not as a tuple
+    engine = create_engine("sqlite://", paramstyle="named")
+    query_stats.install(engine)
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+
+    with engine.connect() as connection:
+        # statements outside of requests are not counted per request
+        connection.execute(text("SELECT 1"))
+        scope = {"type": "http", "method": "GET", "path": "/books"}
+        with query_stats.track(scope) as request_stats:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT :id"), {"id": 5})
+    assert request_stats["queries"] == 2
+    assert request_stats["time_ms"] > 0
+
+    # every statement is slow
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-9)
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        with engine.connect() as connection:
+            with query_stats.track(scope):
+                connection.execute(text("SELECT :name"), {"name": "secret"})
+    assert "GET /books" in caplog.text
+    assert "{name: str}" in caplog.text
+    assert "secret" not in caplog.text
+    assert query_stats.get_stats()["slow_queries"] >= 1
+    engine.dispose()
+
+
+def test_parameter_shapes():
+    shapes = query_stats.parameter_shapes
+    assert shapes({"id_1": 5, "name": "x"}) == "{id_1: int, name: str}"
+    assert shapes((5, None)) == "(int, NoneType)"
+    assert shapes([{"id": 1}, {"id": 2}], True) == "2 x {id: int}"
+
+
+def test_server_timing():
+    value = query_stats.server_timing({"queries": 3, "time_ms": 1.25}, 10)
+    assert value == 'db;dur=1.2;desc="3 queries", app;dur=10.0'
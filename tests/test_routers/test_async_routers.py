@@ -0,0 +1,156 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.database.dependb import get_async_db
+from app.routers import async_book_r, async_order_r
+
+# async session needs asyncpg and postgres
+pytestmark = pytest.mark.postgres
+
+test_app = FastAPI()
+test_app.include_router(async_book_r.router, prefix="/async")
+test_app.include_router(async_order_r.router, prefix="/async")
+
+
+@pytest.fixture()
+def async_client(async_session_scope, fill_async_db):
+    """
+    Returns test client of async routers and data of `fill_async_db`
+    (5 books). The session is opened in event loop of the client,
+    so requests use it as `get_async_db`.
+    """
+    with TestClient(test_app) as client:
+        with client.portal.wrap_async_context_manager(
+            async_session_scope()
+        ) as db:
+
+            async def get_test_async_db():
+                yield db
+
+            test_app.dependency_overrides[get_async_db] = get_test_async_db
+            data = client.portal.call(fill_async_db, db, 5)
+            try:
+                yield client, data
+            finally:
+                test_app.dependency_overrides.clear()
+
+
+def auth_headers(user, role: str = "user"):
+    token = security.encode_token(
+        data={"email": user.email, "id": str(user.id), "role": role},
+        type="access_token",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ---------------------------------------------------------------------------------------
+# test_get_all_books
+# ---------------------------------------------------------------------------------------
+
+
+def test_get_all_books(async_client):
+    client, data = async_client
+    book_ids = [book.id for book in data["books"]]
+
+    response = client.get("/async/books?latest_first=false&limit=3")
+    assert response.status_code == 200
+    assert [book["id"] for book in response.json()] == book_ids[:3]
+    assert response.json()[0]["author"]["name"] == "Author1"
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        f"/async/books?latest_first=false&limit=3&cursor={cursor}"
+    )
+    assert [book["id"] for book in response.json()] == book_ids[3:]
+    # the last page is not full, there is no next page
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_book_by_id(async_client):
+    client, data = async_client
+    book = data["books"][0]
+
+    response = client.get(f"/async/books/{book.id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == book.name
+
+    response = client.get(f"/async/books/{book.id + 100}")
+    assert response.status_code == 404
+
+
+# ---------------------------------------------------------------------------------------
+# test_create_order
+# ---------------------------------------------------------------------------------------
+
+
+def test_create_order(async_client):
+    client, data = async_client
+    book1, book2 = data["books"][:2]
+    order_data = [
+        {"book_id": book1.id, "quantity": 2},
+        {"book_id": book2.id, "quantity": 1},
+    ]
+
+    response = client.post("/async/orders", json=order_data)
+    # authentication is needed
+    assert response.status_code == 403
+
+    headers = auth_headers(data["user"])
+    response = client.post("/async/orders", json=order_data, headers=headers)
+    assert response.status_code == 201
+    order = response.json()
+    assert order["total_price"] == 16.65
+    assert order["customer"]["id"] == data["user"].id
+    assert sorted(
+        (item["book_id"], item["quantity"]) for item in order["order_items"]
+    ) == [(book1.id, 2), (book2.id, 1)]
+
+    response = client.post("/async/orders", json=[], headers=headers)
+    assert response.status_code == 400
+
+
+# ---------------------------------------------------------------------------------------
+# test_get_orders
+# ---------------------------------------------------------------------------------------
+
+
+def test_get_orders(async_client):
+    client, data = async_client
+    headers = auth_headers(data["user"])
+    order_ids = []
+    for quantity in range(1, 4):
+        response = client.post(
+            "/async/orders",
+            json=[{"book_id": data["books"][0].id, "quantity": quantity}],
+            headers=headers,
+        )
+        order_ids.append(response.json()["id"])
+
+    # orders of the user, the latest first, by pages
+    response = client.get("/async/orders/my/?limit=2", headers=headers)
+    assert [order["id"] for order in response.json()] == order_ids[:0:-1]
+    assert len(response.json()[0]["order_items"]) == 1
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        f"/async/orders/my/?limit=2&cursor={cursor}", headers=headers
+    )
+    assert [order["id"] for order in response.json()] == order_ids[:1]
+
+    # all orders and an order by id are shown only to staff
+    response = client.get("/async/orders", headers=headers)
+    assert response.status_code == 403
+    staff_headers = auth_headers(data["user"], role="staff")
+    response = client.get(
+        "/async/orders?total_min=10&latest_first=false",
+        headers=staff_headers,
+    )
+    assert response.status_code == 200
+    assert [order["id"] for order in response.json()] == order_ids[1:]
+
+    response = client.get(
+        f"/async/orders/{order_ids[0]}", headers=staff_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["total_price"] == 5.55
@@ -0,0 +1,78 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core import settings
+from app.models import order_m, store_m, user_m
+from app.routers import fast_json
+from app.schemas import store_s, user_order_s
+
+# ---------------------------------------------------------------------------------------
+# test_compile_serializer
+# ---------------------------------------------------------------------------------------
+
+
+def test_compile_serializer_book():
+    book = store_m.Book(
+        id=1,
+        name="Book",
+        price=Decimal("10.50"),
+        description="Description",
+        year_of_publication=2022,
+        is_active=True,
+        author=store_m.Author(id=2, name="Author", email="a@gmail.com"),
+        category=None,
+    )
+    serialize = fast_json.compile_serializer(store_s.BookFullShow)
+
+    assert serialize(book) == jsonable_encoder(
+        store_s.BookFullShow.from_orm(book)
+    )
+
+
+def test_compile_serializer_order():
+    order = order_m.Order(
+        id=1,
+        date_placed=datetime(2022, 8, 1, 12, 30),
+        total_price=Decimal("21.00"),
+        paid=False,
+        delivery_date=None,
+        complete=False,
+        customer=user_m.User(id=3, fullname="User", email="u@gmail.com"),
+        order_items=[order_m.OrderItem(id=4, book_id=1, quantity=2)],
+    )
+    serialize = fast_json.compile_serializer(user_order_s.OrderFullShow)
+
+    data = serialize(order)
+    assert data["date_placed"] == date(2022, 8, 1)
+    assert json.loads(
+        fast_json.FastJSONResponse(content=data).body
+    ) == jsonable_encoder(user_order_s.OrderFullShow.from_orm(order))
+
+
+# ---------------------------------------------------------------------------------------
+# test_fast_response
+# ---------------------------------------------------------------------------------------
+
+
+def test_fast_response(monkeypatch):
+    category = store_m.Category(id=1, name="Category", is_active=True)
+    response = Response()
+    response.headers["X-Next-Cursor"] = "next"
+
+    # off by default, items are validated by response_model
+    assert fast_json.fast_response(
+        [category], store_s.CategoryShortShow, response
+    ) == [category]
+
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    fast_response = fast_json.fast_response(
+        [category], store_s.CategoryShortShow, response
+    )
+    assert json.loads(fast_response.body) == [
+        {"id": 1, "name": "Category", "is_active": True}
+    ]
+    assert fast_response.headers["X-Next-Cursor"] == "next"
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.crud import catalog_cache
+from app.routers import response_cache
+
+calls = []
+
+router = APIRouter(route_class=response_cache.CachedRoute)
+
+
+@router.get("/items")
+@response_cache.cached
+def get_items(response: Response, limit: int = 10, page: int = 1):
+    calls.append((limit, page))
+    response.headers["X-Next-Cursor"] = "next"
+    return [{"limit": limit, "page": page}]
+
+
+@router.get("/not-cached")
+def get_not_cached():
+    calls.append("not cached")
+    return {}
+
+
+test_app = FastAPI()
+test_app.include_router(router)
+client = TestClient(test_app)
+
+# ---------------------------------------------------------------------------------------
+# test_cached_response
+# ---------------------------------------------------------------------------------------
+
+
+def test_cached_response():
+    response_cache.invalidate()
+    calls.clear()
+
+    response1 = client.get("/items?limit=5&page=2")
+    response2 = client.get("/items?page=2&limit=5")
+
+    assert calls == [(5, 2)]
+    assert response2.json() == response1.json() == [{"limit": 5, "page": 2}]
+    assert response2.headers["ETag"] == response1.headers["ETag"]
+    assert response2.headers["X-Next-Cursor"] == "next"
+    assert response2.headers["Cache-Control"] == "public, no-cache"
+
+    client.get("/not-cached")
+    client.get("/not-cached")
+    assert calls == [(5, 2), "not cached", "not cached"]
+
+
+# ---------------------------------------------------------------------------------------
+# test_not_modified
+# ---------------------------------------------------------------------------------------
+
+
+def test_not_modified():
+    response_cache.invalidate()
+    etag = client.get("/items").headers["ETag"]
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+# ---------------------------------------------------------------------------------------
+# test_invalidate
+# ---------------------------------------------------------------------------------------
+
+
+def test_invalidate():
+    response_cache.invalidate()
+    calls.clear()
+    client.get("/items")
+
+    # catalog was changed
+    catalog_cache.drop("books")
+    client.get("/items")
+
+    assert calls == [(10, 1), (10, 1)]